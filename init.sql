@@ -54,7 +54,6 @@ CREATE TABLE IF NOT EXISTS registrations (
     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
 );
 
-
 CREATE TABLE IF NOT EXISTS event_categories (
     event_id INT,
     category_id INT,
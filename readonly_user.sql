@@ -0,0 +1,21 @@
+-- Usuario de solo lectura para las consultas SQL generadas por el endpoint dinámico de
+-- estadísticas (DB_READONLY_USER en la API SQL).
+--
+-- Solo tiene SELECT sobre las tablas que describe el prompt del modelo y, en `users`, sobre
+-- todas las columnas excepto `password`: una consulta generada que intente leer los hashes
+-- (incluido `SELECT *` o `u.*`) falla en MySQL con un error de permisos.
+--
+-- docker compose lo ejecuta al crear la base de datos. En una base de datos existente:
+--   docker compose exec -T mysql mysql -uroot -prootpassword stellargather_db < readonly_user.sql
+-- Cambia la contraseña aquí y en DB_READONLY_PASSWORD fuera del entorno local.
+
+CREATE USER IF NOT EXISTS 'stellargather_readonly'@'%' IDENTIFIED BY 'readonly_password';
+
+GRANT SELECT (id, username, email, full_name, gender, country, phone_number, birth_date, created_at, updated_at)
+    ON users TO 'stellargather_readonly'@'%';
+GRANT SELECT ON organizers TO 'stellargather_readonly'@'%';
+GRANT SELECT ON categories TO 'stellargather_readonly'@'%';
+GRANT SELECT ON events TO 'stellargather_readonly'@'%';
+GRANT SELECT ON registrations TO 'stellargather_readonly'@'%';
+GRANT SELECT ON event_categories TO 'stellargather_readonly'@'%';
+GRANT SELECT ON feedbacks TO 'stellargather_readonly'@'%';
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+from database import execute_query
+from registrations import register_users_for_event_batch
+
+# Configuración de la cola de admisión para eventos de alta demanda
+ADMISSION_BATCH_WINDOW = float(os.getenv("ADMISSION_BATCH_WINDOW", "0.05"))  # Segundos acumulando solicitudes por lote
+ADMISSION_DEFAULT_BATCH_SIZE = int(os.getenv("ADMISSION_DEFAULT_BATCH_SIZE", "200"))
+ADMISSION_TICKET_TTL = float(os.getenv("ADMISSION_TICKET_TTL", "900"))  # Segundos que se conserva un ticket resuelto
+ADMISSION_MAX_TICKETS = int(os.getenv("ADMISSION_MAX_TICKETS", "100000"))
+HOT_EVENTS_REFRESH = float(os.getenv("HOT_EVENTS_REFRESH", "5"))  # Segundos entre lecturas de la tabla hot_events
+
+class HotEventRegistry:
+    """Conjunto de eventos marcados como de alta demanda, leído de `hot_events` y cacheado unos segundos."""
+
+    def __init__(self, refresh_interval=HOT_EVENTS_REFRESH):
+        self.refresh_interval = refresh_interval
+        self._batch_sizes = {}
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        self._loaded_at = 0.0
+
+    async def get_batch_size(self, event_id):
+        """Devuelve el tamaño de lote si el evento es de alta demanda, o None en caso contrario."""
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            rows = await run_in_threadpool(execute_query, "SELECT event_id, batch_size FROM hot_events")
+            self._batch_sizes = {row["event_id"]: row["batch_size"] for row in rows}
+            self._loaded_at = time.monotonic()
+        return self._batch_sizes.get(event_id)
+
+class AdmissionQueue:
+    """
+    Cola de admisión por evento: las inscripciones a eventos de alta demanda reciben un
+    ticket inmediatamente y un worker asíncrono por evento las confirma por lotes, de modo
+    que MySQL ve una transacción con un INSERT de varias filas por lote en lugar de una
+    transacción compitiendo por el bloqueo del evento por cada solicitud.
+
+    Los tickets viven en memoria del proceso: con varios workers de uvicorn, el estado de un
+    ticket solo puede consultarse en el proceso que lo emitió.
+    """
+
+    def __init__(self, batch_window=ADMISSION_BATCH_WINDOW, ticket_ttl=ADMISSION_TICKET_TTL, max_tickets=ADMISSION_MAX_TICKETS):
+        self.batch_window = batch_window
+        self.ticket_ttl = ticket_ttl
+        self.max_tickets = max_tickets
+        self._queues = {}
+        self._workers = {}
+        self._tickets = OrderedDict()
+        self._resolved = OrderedDict()  # ticket_id -> resuelto_en, en orden de resolución (los candidatos a descartar)
+        self._pending_by_user = {}
+        self._enqueued = {}  # Tickets emitidos por evento
+        self._processed = {}  # Tickets resueltos por evento
+
+    def enqueue(self, event_id, user_id, batch_size):
+        """Encola una solicitud de inscripción y devuelve su ticket (reutiliza uno pendiente del mismo usuario)."""
+        pending_ticket_id = self._pending_by_user.get((event_id, user_id))
+        if pending_ticket_id is not None:
+            return self.get_ticket(pending_ticket_id)
+
+        self._prune()
+        sequence = self._enqueued.get(event_id, 0) + 1
+        self._enqueued[event_id] = sequence
+        ticket = {
+            "ticket_id": uuid.uuid4().hex,
+            "event_id": event_id,
+            "user_id": user_id,
+            "status": "pending",
+            "sequence": sequence,
+            "detail": None,
+            "registration": None,
+            "resolved_at": None,
+        }
+        self._tickets[ticket["ticket_id"]] = ticket
+        self._pending_by_user[(event_id, user_id)] = ticket["ticket_id"]
+
+        if event_id not in self._queues:
+            self._queues[event_id] = asyncio.Queue()
+        self._queues[event_id].put_nowait(ticket["ticket_id"])
+        if event_id not in self._workers or self._workers[event_id].done():
+            self._workers[event_id] = asyncio.create_task(self._run_worker(event_id, batch_size))
+        return self.get_ticket(ticket["ticket_id"])
+
+    def get_ticket(self, ticket_id):
+        """Estado público de un ticket, con su posición actual en la cola si sigue pendiente."""
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None:
+            return None
+        position = None
+        if ticket["status"] == "pending":
+            position = max(ticket["sequence"] - self._processed.get(ticket["event_id"], 0), 1)
+        return {
+            "ticket_id": ticket["ticket_id"],
+            "event_id": ticket["event_id"],
+            "user_id": ticket["user_id"],
+            "status": ticket["status"],
+            "position": position,
+            "detail": ticket["detail"],
+            "registration": ticket["registration"],
+        }
+
+    async def _run_worker(self, event_id, batch_size):
+        queue = self._queues[event_id]
+        while not queue.empty():
+            # Se espera una ventana corta para que el lote agrupe la ráfaga de solicitudes
+            await asyncio.sleep(self.batch_window)
+            batch = []
+            while not queue.empty() and len(batch) < batch_size:
+                batch.append(queue.get_nowait())
+            try:
+                results = await run_in_threadpool(
+                    register_users_for_event_batch, event_id, [self._tickets[ticket_id]["user_id"] for ticket_id in batch]
+                )
+            except Exception as exc:
+                detail = getattr(exc, "detail", str(exc))
+                results = [{"status": "rejected", "status_code": 500, "detail": detail} for _ in batch]
+            for ticket_id, result in zip(batch, results):
+                self._resolve(ticket_id, result)
+
+    def _resolve(self, ticket_id, result):
+        ticket = self._tickets[ticket_id]
+        ticket["status"] = result["status"]
+        ticket["detail"] = result.get("detail")
+        ticket["registration"] = result.get("registration")
+        ticket["resolved_at"] = time.monotonic()
+        self._processed[ticket["event_id"]] = max(self._processed.get(ticket["event_id"], 0), ticket["sequence"])
+        self._pending_by_user.pop((ticket["event_id"], ticket["user_id"]), None)
+        self._resolved[ticket_id] = ticket["resolved_at"]
+
+    def _prune(self):
+        """
+        Descarta los tickets resueltos más antiguos si caducaron o si se superó el límite.
+
+        Se recorren solo los resueltos, en orden de resolución: un ticket pendiente emitido
+        antes no impide descartar los que se resolvieron detrás de él.
+        """
+        now = time.monotonic()
+        while self._resolved:
+            ticket_id, resolved_at = next(iter(self._resolved.items()))
+            if now - resolved_at <= self.ticket_ttl and len(self._tickets) < self.max_tickets:
+                break
+            self._resolved.popitem(last=False)
+            del self._tickets[ticket_id]
+
+    async def close(self):
+        """Cancela los workers en curso y espera a que terminen (al apagar la aplicación)."""
+        workers = [worker for worker in self._workers.values() if not worker.done()]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+
+hot_events = HotEventRegistry()
+admission_queue = AdmissionQueue()
@@ -0,0 +1,88 @@
+import os
+import aiomysql
+from pymysql import Error
+from fastapi import HTTPException
+from database import DIRECTION, POOL_RECYCLE
+
+# Tamaño del pool asíncrono: una sola conexión atiende una consulta a la vez, pero el
+# event loop puede mantener tantas consultas en vuelo como conexiones haya en el pool
+ASYNC_POOL_MIN_SIZE = int(os.getenv("DB_ASYNC_POOL_MIN_SIZE", "1"))
+ASYNC_POOL_MAX_SIZE = int(os.getenv("DB_ASYNC_POOL_MAX_SIZE", "100"))
+
+_async_pool = None
+
+async def get_async_pool():
+    """Devuelve el pool asíncrono de conexiones MySQL, creándolo en el primer uso."""
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = await aiomysql.create_pool(
+            host=os.getenv("DB_HOST", DIRECTION),
+            user=os.getenv("DB_USER", "user"),
+            password=os.getenv("DB_PASSWORD", "password"),
+            db=os.getenv("DB_NAME", "stellargather"),
+            minsize=ASYNC_POOL_MIN_SIZE,
+            maxsize=ASYNC_POOL_MAX_SIZE,
+            pool_recycle=int(POOL_RECYCLE),
+            autocommit=True,
+        )
+    return _async_pool
+
+async def close_async_pool():
+    """Cierra el pool asíncrono (al apagar la aplicación)."""
+    global _async_pool
+    if _async_pool is not None:
+        _async_pool.close()
+        await _async_pool.wait_closed()
+        _async_pool = None
+
+# Función asíncrona para ejecutar una consulta SQL (SELECT)
+async def execute_query_async(query, params=None):
+    """
+    Ejecuta una consulta SQL SELECT sin bloquear el event loop y devuelve los resultados.
+
+    Args:
+        query (str): La consulta SQL a ejecutar.
+        params (tuple, optional): Parámetros para la consulta SQL.
+
+    Returns:
+        list[dict]: Lista de filas obtenidas como resultado de la consulta.
+
+    Raises:
+        HTTPException: Si ocurre un error al ejecutar la consulta.
+    """
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            try:
+                await cursor.execute(query, params)
+                results = await cursor.fetchall()
+                return list(results)
+            except Error as err:
+                raise HTTPException(status_code=500, detail=f"Error executing query: {err}")
+
+# Función asíncrona para ejecutar una consulta SQL (INSERT, UPDATE, DELETE)
+async def execute_non_query_async(query, params=None):
+    """
+    Ejecuta una consulta SQL INSERT, UPDATE o DELETE sin bloquear el event loop.
+
+    Args:
+        query (str): La consulta SQL a ejecutar.
+        params (tuple, optional): Parámetros para la consulta SQL.
+
+    Returns:
+        int: Número de filas afectadas.
+
+    Raises:
+        HTTPException: Si ocurre un error al ejecutar la consulta.
+    """
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            try:
+                await conn.begin()
+                await cursor.execute(query, params)
+                await conn.commit()
+                return cursor.rowcount
+            except Error as err:
+                await conn.rollback()
+                raise HTTPException(status_code=500, detail=f"Error executing non-query: {err}")
@@ -0,0 +1,88 @@
+"""
+Compara la lectura de un resultado grande como filas (diccionarios + `pd.DataFrame`) con la
+lectura columnar (`execute_query_columnar`), en tiempo y memoria.
+
+Cada modo se ejecuta en un subproceso propio para que el pico de memoria (`ru_maxrss`) de
+uno no contamine al otro. Usa la misma configuración de base de datos que la API
+(`DB_HOST`, `DB_USER`, ...).
+
+Uso (desde sql_api/):
+    python benchmarks/columnar_fetch.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Genera N filas sin tablas auxiliares cruzando subconsultas de dígitos (10^6 = 1.000.000)
+DIGITS = "(SELECT 0 AS d UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4 " \
+         "UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9)"
+
+def build_query(rows):
+    tables = ", ".join(f"{DIGITS} AS d{i}" for i in range(6))
+    number = " + ".join(f"d{i}.d * {10 ** i}" for i in range(6))
+    return f"""
+    SELECT n AS id,
+           n % 1000 AS organizer_id,
+           n * 0.5 AS rating,
+           CONCAT('event-', n % 5000) AS city,
+           DATE_ADD('2024-01-01 00:00:00', INTERVAL n SECOND) AS created_at
+    FROM (SELECT {number} AS n FROM {tables}) AS numbers
+    WHERE n < {int(rows)}
+    """
+
+def run_mode(mode, rows):
+    from database import execute_query, execute_query_columnar
+
+    query = build_query(rows)
+    tracemalloc.start()
+    started = time.perf_counter()
+    if mode == "rows":
+        import pandas as pd
+
+        frame = pd.DataFrame(execute_query(query))
+    else:
+        frame = execute_query_columnar(query, as_frame=True)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mode": mode,
+        "rows": len(frame),
+        "seconds": round(elapsed, 2),
+        "python_peak_mb": round(peak / 2**20, 1),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "frame_mb": round(frame.memory_usage(deep=True).sum() / 2**20, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["rows", "columnar"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.rows)))
+        return
+
+    results = []
+    for mode in ("rows", "columnar"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--rows", str(args.rows), "--mode", mode],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<10}{'rows':>10}{'seconds':>10}{'py peak MB':>12}{'max RSS MB':>12}{'frame MB':>10}")
+    for result in results:
+        print(f"{result['mode']:<10}{result['rows']:>10}{result['seconds']:>10}"
+              f"{result['python_peak_mb']:>12}{result['max_rss_mb']:>12}{result['frame_mb']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Mide el arranque de la API: tiempo de importación de `main` (lo que paga cada worker de
+uvicorn y cada reinicio de `--reload`) y memoria residente, con el endpoint dinámico de
+estadísticas activado y desactivado (`ENABLE_DYNAMIC_STATISTICS`).
+
+Cada medición se hace en un proceso nuevo y se informa la mediana de varias repeticiones,
+junto con los módulos pesados que quedaron cargados. No necesita base de datos ni
+configuración: los procesos hijos usan un `SESSION_SECRET` de prueba si no hay uno definido.
+
+Uso (desde sql_api/):
+    python benchmarks/startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+SQL_API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("openai", "pandas", "numpy", "matplotlib")
+
+def measure():
+    sys.path.insert(0, SQL_API_DIR)
+    started = time.perf_counter()
+    import main  # noqa: F401
+    elapsed = time.perf_counter() - started
+    return {
+        "import_ms": round(elapsed * 1000, 1),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+def run(enabled, repeat):
+    # Importar main exige SESSION_SECRET (sessions.py); para medir basta uno de prueba
+    env = {"SESSION_SECRET": "startup-benchmark", **os.environ, "ENABLE_DYNAMIC_STATISTICS": "1" if enabled else "0"}
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure"], env=env, cwd=SQL_API_DIR,
+            check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "dynamic_statistics": "on" if enabled else "off",
+        "import_ms": statistics.median(sample["import_ms"] for sample in samples),
+        "max_rss_mb": statistics.median(sample["max_rss_mb"] for sample in samples),
+        "heavy_modules": ", ".join(samples[-1]["heavy_modules"]) or "-",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure()))
+        return
+
+    print(f"{'dynamic statistics':<20}{'import ms':>12}{'max RSS MB':>12}  heavy modules loaded")
+    for enabled in (True, False):
+        result = run(enabled, args.repeat)
+        print(f"{result['dynamic_statistics']:<20}{result['import_ms']:>12.1f}{result['max_rss_mb']:>12.1f}  {result['heavy_modules']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Escrituras por lotes (importaciones y panel de administración).
+
+Cada función valida todo el lote con unas pocas consultas por bloques, inserta las filas
+aceptadas con INSERT de varias filas (`executemany`) y actualiza las tablas de resumen,
+todo en una sola transacción. Devuelve un resultado por elemento, en el orden recibido:
+los elementos rechazados no impiden insertar el resto.
+
+La validación previa usa las mismas comparaciones que MySQL (colación de las columnas y
+hash de la clave única de eventos), pero quien decide es el índice único: si un bloque
+choca con él (p. ej. por una inserción concurrente), ese bloque se reintenta fila a fila
+y cada fila rechazada recibe su resultado, en lugar de abortar el lote.
+"""
+import os
+from mysql.connector import IntegrityError
+from database import transaction, duplicate_key, missing_reference
+from summaries import apply_event_deltas, apply_category_deltas
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))  # Filas por sentencia INSERT / consulta IN
+
+# Misma expresión que la columna events.name_description_hash (migración 0007)
+EVENT_HASH_SQL = "UNHEX(SHA2(CONCAT(LOWER({name}), CHAR(0), LOWER({description})), 256))"
+
+# Detalle del 404 cuando una clave foránea apunta a una fila inexistente, por tabla referenciada
+MISSING_REFERENCE_DETAILS = {"organizers": "Organizer not found", "events": "Event not found", "categories": "Category not found"}
+
+def _chunks(items, size=BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _rejected(status_code, detail):
+    return {"status": "rejected", "status_code": status_code, "detail": detail}
+
+def _created(row_id=None):
+    return {"status": "created", "status_code": 201, "id": row_id}
+
+def _existing_values(cursor, query, values):
+    """Ejecuta `query` (con {placeholders}) por bloques de `values` y devuelve el conjunto de resultados."""
+    found = set()
+    for chunk in _chunks(values):
+        if chunk and isinstance(chunk[0], tuple):
+            placeholders = ", ".join(["(" + ", ".join(["%s"] * len(chunk[0])) + ")"] * len(chunk))
+            params = tuple(value for row in chunk for value in row)
+        else:
+            placeholders = ", ".join(["%s"] * len(chunk))
+            params = tuple(chunk)
+        cursor.execute(query.format(placeholders=placeholders), params)
+        for row in cursor.fetchall():
+            values_in_row = tuple(row.values())
+            found.add(values_in_row[0] if len(values_in_row) == 1 else values_in_row)
+    return found
+
+def _batch_rows(cursor, query, items):
+    """
+    Ejecuta `query` por bloques sobre una tabla derivada `batch` con una fila por elemento
+    (`position` y las claves de `items`), para que MySQL compare con sus propias reglas.
+
+    Args:
+        query (str): Consulta con {batch}, p. ej. "SELECT batch.position FROM ({batch}) AS batch JOIN ...".
+        items (list[dict]): Valores de cada elemento, todos con las mismas claves.
+
+    Returns:
+        list[dict]: Las filas devueltas por todos los bloques.
+    """
+    rows = []
+    columns = list(items[0]) if items else []
+    select = "SELECT " + ", ".join(["%s AS position"] + [f"%s AS {column}" for column in columns])
+    for start in range(0, len(items), BULK_CHUNK_SIZE):
+        chunk = items[start:start + BULK_CHUNK_SIZE]
+        params = tuple(value for offset, item in enumerate(chunk) for value in (start + offset, *item.values()))
+        cursor.execute(query.format(batch=" UNION ALL ".join([select] * len(chunk))), params)
+        rows.extend(cursor.fetchall())
+    return rows
+
+def _rejection(err, duplicate_detail):
+    """Resultado de una fila que violó un índice único (400) o una clave foránea (404); None para otros errores."""
+    if duplicate_key(err) is not None:
+        return _rejected(400, duplicate_detail)
+    table = missing_reference(err)
+    if table is not None:
+        return _rejected(404, MISSING_REFERENCE_DETAILS.get(table, "Referenced row not found"))
+    return None
+
+def _insert_rows(cursor, query, rows, duplicate_detail, id_query=None, keys=None):
+    """
+    Inserta las filas por bloques y devuelve un resultado por fila.
+
+    Cada bloque va en un INSERT de varias filas. Si choca con un índice único o una clave
+    foránea, MySQL revierte solo esa sentencia y el bloque se reintenta fila a fila.
+
+    Los ids de un INSERT de varias filas son crecientes, pero no necesariamente consecutivos
+    (`auto_increment_increment`, `innodb_autoinc_lock_mode`). Por eso se releen con `id_query`,
+    que recibe {placeholders} para `keys` (la clave natural única de cada fila) y el primer id.
+    """
+    results = []
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_CHUNK_SIZE]
+        try:
+            cursor.executemany(query, chunk)
+        except IntegrityError as err:
+            if _rejection(err, duplicate_detail) is None:
+                raise
+            results.extend(_insert_each(cursor, query, chunk, duplicate_detail))
+            continue
+        if id_query is None:
+            results.extend(_created() for _ in chunk)
+            continue
+        chunk_keys = keys[start:start + BULK_CHUNK_SIZE]
+        cursor.execute(id_query.format(placeholders=", ".join(["%s"] * len(chunk_keys))), (*chunk_keys, cursor.lastrowid))
+        results.extend(_created(row["id"]) for row in cursor.fetchall())
+    return results
+
+def _insert_each(cursor, query, rows, duplicate_detail):
+    results = []
+    for row in rows:
+        try:
+            cursor.execute(query, row)
+        except IntegrityError as err:
+            rejection = _rejection(err, duplicate_detail)
+            if rejection is None:
+                raise
+            results.append(rejection)
+            continue
+        results.append(_created(cursor.lastrowid or None))
+    return results
+
+def bulk_create_events(events):
+    """
+    Crea un lote de eventos.
+
+    Se rechazan los eventos cuyo par (nombre, descripción) ya existe o se repite en el lote
+    (400) y los que referencian un organizador inexistente (404).
+
+    Args:
+        events (list[dict]): Eventos con los campos del modelo `Event`.
+
+    Returns:
+        list[dict]: Un resultado por evento con `status` ('created' o 'rejected').
+    """
+    results = [None] * len(events)
+    with transaction() as cursor:
+        # Hash de cada evento calculado por MySQL (igual que la columna indexada) y si ya existe uno igual
+        hashes = _batch_rows(cursor, f"""
+        SELECT batch.position, {EVENT_HASH_SQL.format(name="batch.name", description="batch.description")} AS name_description_hash,
+               EXISTS(SELECT 1 FROM events WHERE events.name_description_hash = {EVENT_HASH_SQL.format(name="batch.name", description="batch.description")}) AS found
+        FROM ({{batch}}) AS batch
+        """, [{"name": event["name"], "description": event["description"]} for event in events])
+        event_hashes = {row["position"]: (bytes(row["name_description_hash"]), row["found"]) for row in hashes}
+        organizers = _existing_values(cursor, "SELECT id FROM organizers WHERE id IN ({placeholders})",
+                                      list({event["organizer_id"] for event in events if event["organizer_id"] is not None}))
+        accepted = []
+        seen = set()
+        for index, event in enumerate(events):
+            event_hash, found = event_hashes[index]
+            if found or event_hash in seen:
+                results[index] = _rejected(400, "Event already exists")
+            elif event["organizer_id"] is not None and event["organizer_id"] not in organizers:
+                results[index] = _rejected(404, "Organizer not found")
+            else:
+                seen.add(event_hash)
+                accepted.append(index)
+
+        if accepted:
+            inserted = _insert_rows(cursor, """
+            INSERT INTO events (name, description, location, city, country, date, max_capacity, price, organizer_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, [(events[index]["name"], events[index]["description"], events[index]["location"], events[index]["city"],
+                   events[index]["country"], events[index]["date"], events[index]["max_capacity"], events[index]["price"],
+                   events[index]["organizer_id"]) for index in accepted],
+                "Event already exists",
+                "SELECT id FROM events WHERE name_description_hash IN ({placeholders}) AND id >= %s ORDER BY id",
+                [event_hashes[index][0] for index in accepted])
+            for index, result in zip(accepted, inserted):
+                results[index] = result
+            apply_event_deltas(cursor, [events[index] for index, result in zip(accepted, inserted) if result["status"] == "created"])
+    return results
+
+def bulk_create_event_categories(links):
+    """
+    Vincula un lote de pares (evento, categoría).
+
+    Se rechazan los vínculos con evento o categoría inexistentes (404) y los que ya existen o
+    se repiten en el lote (400).
+
+    Args:
+        links (list[dict]): Pares con `event_id` y `category_id`.
+
+    Returns:
+        list[dict]: Un resultado por vínculo con `status` ('created' o 'rejected').
+    """
+    results = [None] * len(links)
+    with transaction() as cursor:
+        event_ids = _existing_values(cursor, "SELECT id FROM events WHERE id IN ({placeholders})", list({link["event_id"] for link in links}))
+        category_ids = _existing_values(cursor, "SELECT id FROM categories WHERE id IN ({placeholders})", list({link["category_id"] for link in links}))
+        existing = _existing_values(cursor, "SELECT event_id, category_id FROM event_categories WHERE (event_id, category_id) IN ({placeholders})",
+                                    list(dict.fromkeys((link["event_id"], link["category_id"]) for link in links)))
+        accepted = []
+        seen = set(existing)
+        for index, link in enumerate(links):
+            key = (link["event_id"], link["category_id"])
+            if link["event_id"] not in event_ids:
+                results[index] = _rejected(404, "Event not found")
+            elif link["category_id"] not in category_ids:
+                results[index] = _rejected(404, "Category not found")
+            elif key in seen:
+                results[index] = _rejected(400, "Event category already exists")
+            else:
+                seen.add(key)
+                accepted.append(index)
+
+        if accepted:
+            rows = [(links[index]["event_id"], links[index]["category_id"]) for index in accepted]
+            inserted = _insert_rows(cursor, "INSERT INTO event_categories (event_id, category_id) VALUES (%s, %s)", rows,
+                                    "Event category already exists")
+            for index, result in zip(accepted, inserted):
+                results[index] = {**result, "id": None}
+            rows = [row for row, result in zip(rows, inserted) if result["status"] == "created"]
+            apply_category_deltas(cursor, [category_id for _, category_id in rows])
+            # Versión de los eventos afectados para los validadores HTTP de sus categorías
+            touched = list({event_id for event_id, _ in rows})
+            for chunk in _chunks(touched):
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"UPDATE events SET updated_at = CURRENT_TIMESTAMP(6) WHERE id IN ({placeholders})", tuple(chunk))
+    return results
+
+def _bulk_create_unique(cursor, items, table, column, insert_query, insert_rows, duplicate_detail):
+    """
+    Inserta elementos con una única clave natural (`column`, única en `table`): rechaza (400)
+    los que ya existen según la colación de la columna y los repetidos en el lote.
+    """
+    results = [None] * len(items)
+    found = {row["position"] for row in _batch_rows(cursor, f"""
+    SELECT batch.position FROM ({{batch}}) AS batch JOIN {table} ON {table}.{column} = batch.{column}
+    """, [{column: item[column]} for item in items])}
+    accepted = []
+    for index in range(len(items)):
+        if index in found:
+            results[index] = _rejected(400, duplicate_detail)
+        else:
+            accepted.append(index)
+    # Los repetidos dentro del lote (también los que solo coinciden según la colación) los detecta
+    # el índice único al insertar: el bloque se reintenta fila a fila y el segundo se rechaza
+    if accepted:
+        inserted = _insert_rows(cursor, insert_query, [insert_rows[index] for index in accepted], duplicate_detail,
+                                f"SELECT id FROM {table} WHERE {column} IN ({{placeholders}}) AND id >= %s ORDER BY id",
+                                [items[index][column] for index in accepted])
+        for index, result in zip(accepted, inserted):
+            results[index] = result
+    return results
+
+def bulk_create_categories(categories):
+    """
+    Crea un lote de categorías; se rechazan (400) los nombres que ya existen o se repiten en el lote.
+
+    Returns:
+        list[dict]: Un resultado por categoría con `status` ('created' o 'rejected').
+    """
+    with transaction() as cursor:
+        return _bulk_create_unique(cursor, categories, "categories", "name", "INSERT INTO categories (name) VALUES (%s)",
+                                   [(category["name"],) for category in categories], "Category already exists")
+
+def bulk_create_organizers(organizers):
+    """
+    Crea un lote de organizadores; se rechazan (400) los correos que ya existen o se repiten en el lote.
+
+    Returns:
+        list[dict]: Un resultado por organizador con `status` ('created' o 'rejected').
+    """
+    with transaction() as cursor:
+        return _bulk_create_unique(cursor, organizers, "organizers", "email", "INSERT INTO organizers (name, email, phone) VALUES (%s, %s, %s)",
+                                   [(organizer["name"], organizer["email"], organizer["phone"]) for organizer in organizers],
+                                   "Organizer already exists")
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Configuración de la caché de datos de referencia (categorías, organizadores y eventos)
+CACHE_ENABLED = os.getenv("REFERENCE_CACHE_ENABLED", "1") == "1"
+CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "60"))  # Segundos que una entrada se considera válida
+
+class ReferenceCache:
+    """
+    Caché LRU con expiración por entrada para lecturas de datos que cambian poco.
+
+    Las claves son tuplas cuyo primer elemento es el tipo de dato, p. ej. ("event", 12), lo
+    que permite invalidar una entrada concreta o todas las de un tipo. Cada invalidación
+    incrementa una generación: una lectura que empezó antes de la escritura no puede guardar
+    en la caché el valor ya obsoleto.
+
+    La caché vive en la memoria de cada proceso; el TTL acota cuánto tarda otro worker en
+    ver una escritura que no invalidó él mismo.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, enabled=CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()  # clave -> (valor, expira_en)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get_or_load(self, key, loader):
+        """Devuelve el valor cacheado de `key` o lo obtiene con `loader()` y lo guarda."""
+        if not self.enabled:
+            return loader()
+        found, value, generation = self.lookup(key)
+        if found:
+            return value
+        value = loader()
+        self.store(key, value, generation)
+        return value
+
+    async def get_or_load_async(self, key, loader):
+        """Variante de `get_or_load` para cargadores asíncronos (`loader` devuelve un awaitable)."""
+        if not self.enabled:
+            return await loader()
+        found, value, generation = self.lookup(key)
+        if found:
+            return value
+        value = await loader()
+        self.store(key, value, generation)
+        return value
+
+    def lookup(self, key):
+        """
+        Busca `key` sin cargarla, para quien decide después si el valor debe guardarse.
+
+        Returns:
+            tuple[bool, object, int]: Si se encontró, el valor y la generación actual, que se
+                pasa a `store` para descartar el valor si hubo una invalidación entretanto.
+        """
+        if not self.enabled:
+            return False, None, self._generation
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True, entry[0], self._generation
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+            return False, None, self._generation
+
+    def store(self, key, value, generation):
+        """Guarda `value` en `key`, salvo que la caché se haya invalidado desde `lookup`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            # Si hubo una invalidación mientras se cargaba, el valor puede estar obsoleto
+            if generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, *keys):
+        """Elimina las entradas indicadas."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._invalidations += 1
+
+    def invalidate_kind(self, kind):
+        """Elimina todas las entradas de un tipo (primer elemento de la clave)."""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] == kind]:
+                del self._entries[key]
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def set_enabled(self, enabled):
+        """Activa o desactiva la caché; al desactivarla se vacía para no servir datos antiguos al reactivarla."""
+        self.enabled = enabled
+        if not enabled:
+            self.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,72 @@
+"""
+Renderizado de los gráficos del endpoint dinámico de estadísticas.
+
+Cada gráfico se dibuja en un proceso del pool de gráficos con el backend Agg, sobre una
+`Figure` propia (sin el estado global de pyplot) que se libera al terminar. Las imágenes
+se guardan en una caché por (consulta SQL, parámetros del gráfico, hash de los datos): si
+los datos no cambiaron, volver a abrir el panel devuelve la imagen sin renderizarla.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+from cache import ReferenceCache
+from columnar import to_frame
+from process_pool import BoundedProcessPool
+
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+CHART_MAX_PENDING = int(os.getenv("CHART_MAX_PENDING", "32"))  # Gráficos en cola o en curso
+
+chart_pool = BoundedProcessPool("Chart renderer", CHART_WORKERS, CHART_MAX_PENDING)
+chart_cache = ReferenceCache(
+    max_entries=int(os.getenv("CHART_CACHE_MAX_ENTRIES", "128")),
+    ttl=float(os.getenv("CHART_CACHE_TTL", "600")),
+    enabled=os.getenv("CHART_CACHE_ENABLED", "1") == "1",
+)
+
+# Función ejecutada en los procesos del pool: pandas y matplotlib solo se cargan allí
+def _render_png(columns, chart_type, x_axis, y_axis):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Los datos llegan por columnas y se convierten en un DataFrame sin pasar por filas
+    data = to_frame(columns)
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    try:
+        ax = figure.subplots()
+        if chart_type == 'bar':
+            data.plot(kind='bar', ax=ax, x=x_axis, y=y_axis)
+        elif chart_type == 'line':
+            data.plot(kind='line', ax=ax, x=x_axis, y=y_axis)
+        elif chart_type == 'pie':
+            data.set_index(x_axis).plot(kind='pie', ax=ax, y=y_axis)
+
+        buf = io.BytesIO()
+        figure.savefig(buf, format='png')
+        return buf.getvalue()
+    finally:
+        figure.clear()
+
+def data_fingerprint(columns):
+    """Hash estable del resultado (los valores no JSON, como fechas o Decimal, se serializan como texto)."""
+    return hashlib.sha256(json.dumps([columns["names"], columns["values"]], default=str).encode()).hexdigest()
+
+async def render_chart(sql_query, columns, chart_type, x_axis, y_axis):
+    """
+    Devuelve el gráfico de `columns` como PNG en base64, desde la caché o renderizado en el pool.
+
+    Args:
+        sql_query (str): Consulta que produjo los datos (parte de la clave de caché).
+        columns (dict): Resultado en formato columnar (`columnar.empty_columns`).
+        chart_type (str): 'bar', 'line' o 'pie'.
+        x_axis (str): Columna del eje X.
+        y_axis (str): Columna del eje Y.
+    """
+    key = ("chart", sql_query, chart_type, x_axis, y_axis, data_fingerprint(columns))
+    png = await chart_cache.get_or_load_async(key, lambda: chart_pool.run(_render_png, columns, chart_type, x_axis, y_axis))
+    return base64.b64encode(png).decode('utf-8')
+
+def chart_stats():
+    return {"pool": chart_pool.stats(), "cache": chart_cache.stats()}
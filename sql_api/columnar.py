@@ -0,0 +1,75 @@
+"""
+Resultados de consultas en formato columnar para los caminos analíticos.
+
+En lugar de materializar una lista de diccionarios por fila (y después convertirla en un
+DataFrame), las filas se leen como tuplas por bloques y se acumulan directamente por
+columna; al final cada columna se convierte una sola vez en un array de NumPy con el tipo
+que indica MySQL. NumPy y pandas se importan solo al construir los arrays.
+
+Los códigos de tipo son los del protocolo de MySQL, comunes a mysql-connector y a
+PyMySQL/aiomysql (`cursor.description[i][1]`).
+"""
+
+# Códigos de tipo de columna del protocolo de MySQL
+INTEGER_TYPES = {1, 2, 3, 8, 9, 13, 16}  # TINY, SHORT, LONG, LONGLONG, INT24, YEAR, BIT
+FLOAT_TYPES = {0, 4, 5, 246}  # DECIMAL, FLOAT, DOUBLE, NEWDECIMAL
+DATETIME_TYPES = {7, 10, 12}  # TIMESTAMP, DATE, DATETIME
+
+COLUMNAR_BATCH_SIZE = 10000  # Filas por fetchmany
+
+def empty_columns(description):
+    """Estructura columnar vacía para el `cursor.description` de una consulta."""
+    return {
+        "names": [column[0] for column in description],
+        "types": [column[1] for column in description],
+        "values": [[] for _ in description],
+    }
+
+def extend_columns(columns, batch):
+    """Añade un bloque de filas (tuplas) a las listas de cada columna."""
+    if batch:
+        for values, column_values in zip(columns["values"], zip(*batch)):
+            values.extend(column_values)
+
+def fetch_columns(cursor, batch_size=COLUMNAR_BATCH_SIZE):
+    """Lee el resultado pendiente de un cursor DB-API (filas como tuplas) en formato columnar."""
+    columns = empty_columns(cursor.description)
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return columns
+        extend_columns(columns, batch)
+
+def _to_array(values, type_code):
+    import numpy as np
+
+    has_nulls = any(value is None for value in values)
+    if type_code in INTEGER_TYPES and not has_nulls:
+        return np.array(values, dtype=np.int64)
+    if type_code in INTEGER_TYPES or type_code in FLOAT_TYPES:
+        # Los NULL numéricos se representan como NaN
+        return np.array([np.nan if value is None else value for value in values] if has_nulls else values, dtype=np.float64)
+    if type_code in DATETIME_TYPES:
+        return np.array(values, dtype="datetime64[us]")
+    return np.array(values, dtype=object)
+
+def to_arrays(columns):
+    """
+    Convierte una estructura columnar en arrays de NumPy tipados.
+
+    Returns:
+        dict[str, numpy.ndarray]: Un array por columna, en el orden de la consulta.
+    """
+    arrays = {}
+    for name, type_code, values in zip(columns["names"], columns["types"], columns["values"]):
+        arrays[name] = _to_array(values, type_code)
+    return arrays
+
+def to_frame(columns):
+    """Convierte una estructura columnar en un DataFrame de pandas sin pasar por diccionarios por fila."""
+    import pandas as pd
+
+    return pd.DataFrame(to_arrays(columns), copy=False)
+
+def row_count(columns):
+    return len(columns["values"][0]) if columns["values"] else 0
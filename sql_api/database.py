@@ -1,10 +1,22 @@
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import re
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
 from fastapi import HTTPException
+from columnar import fetch_columns, to_arrays, to_frame
 
 DIRECTION = "localhost"
 
+# Configuración del pool de conexiones (variables de entorno)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # Segundos máximos esperando una conexión libre
+POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "1800"))  # Edad máxima (s) de una conexión antes de reciclarla
+POOL_PING_INTERVAL = float(os.getenv("DB_POOL_PING_INTERVAL", "30"))  # Inactividad (s) tras la cual se verifica la conexión
+
 def get_db_connection():
     """Crea una conexión a la base de datos MySQL utilizando variables de entorno."""
     try:
@@ -12,7 +24,8 @@ def get_db_connection():
             host=os.getenv("DB_HOST", DIRECTION),
             user=os.getenv("DB_USER", "user"),
             password=os.getenv("DB_PASSWORD", "password"),
-            database=os.getenv("DB_NAME", "stellargather")
+            database=os.getenv("DB_NAME", "stellargather"),
+            autocommit=True  # Las lecturas no dejan transacciones (ni snapshots) abiertas en el pool
         )
         if connection.is_connected():
             print("Conexión exitosa a MySQL")
@@ -21,12 +34,212 @@ def get_db_connection():
         print(f"Error al conectar a MySQL: {e}")
         return None
 
+class ConnectionPool:
+    """
+    Pool de conexiones MySQL con tamaño máximo, verificación de salud y reciclaje.
+
+    Las conexiones se crean bajo demanda hasta `size`; cuando todas están en uso, las
+    peticiones esperan hasta `timeout` segundos antes de recibir un 503. Una conexión
+    inactiva más de `ping_interval` segundos se verifica con un ping antes de entregarse,
+    y una conexión con más de `recycle` segundos de vida se cierra y se reemplaza.
+    """
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, recycle=POOL_RECYCLE, ping_interval=POOL_PING_INTERVAL):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()  # (conexión, creada_en, último_uso)
+        self._in_use = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "failed_health_checks": 0,
+            "wait_time_total_ms": 0.0,
+            "wait_time_max_ms": 0.0,
+        }
+
+    def _connect(self):
+        connection = get_db_connection()
+        if connection is None:
+            raise HTTPException(status_code=503, detail="Database connection unavailable")
+        with self._lock:
+            self._stats["connections_created"] += 1
+        return connection
+
+    def _is_usable(self, connection, created_at, last_used):
+        now = time.monotonic()
+        if now - created_at > self.recycle:
+            with self._lock:
+                self._stats["connections_recycled"] += 1
+            return False
+        if now - last_used > self.ping_interval:
+            try:
+                connection.ping(reconnect=False)
+            except Error:
+                with self._lock:
+                    self._stats["failed_health_checks"] += 1
+                return False
+        return True
+
+    def acquire(self):
+        """Obtiene una conexión del pool, esperando si es necesario."""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise HTTPException(status_code=503, detail="Database connection pool exhausted")
+        waited_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total_ms"] += waited_ms
+            self._stats["wait_time_max_ms"] = max(self._stats["wait_time_max_ms"], waited_ms)
+
+        try:
+            while True:
+                try:
+                    connection, created_at, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    connection, created_at = self._connect(), time.monotonic()
+                    break
+                if self._is_usable(connection, created_at, last_used):
+                    break
+                _close_quietly(connection)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use[id(connection)] = created_at
+        return connection
+
+    def release(self, connection, discard=False):
+        """Devuelve una conexión al pool; si `discard` es True, la cierra en su lugar."""
+        with self._lock:
+            created_at = self._in_use.pop(id(connection), time.monotonic())
+        if discard:
+            _close_quietly(connection)
+        else:
+            self._idle.put((connection, created_at, time.monotonic()))
+        self._slots.release()
+
+    def stats(self):
+        """Devuelve las métricas del pool, incluidos los tiempos de espera."""
+        with self._lock:
+            stats = dict(self._stats)
+            in_use = len(self._in_use)
+        stats["size"] = self.size
+        stats["in_use"] = in_use
+        stats["idle"] = self._idle.qsize()
+        stats["wait_time_avg_ms"] = stats["wait_time_total_ms"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        return stats
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Error:
+        pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Devuelve el pool de conexiones del proceso, creándolo en el primer uso."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+def get_pool_stats():
+    """Métricas del pool de conexiones para monitorización."""
+    return get_pool().stats()
+
+@contextmanager
+def pooled_connection():
+    """Presta una conexión del pool durante el bloque `with` y la devuelve al salir."""
+    pool = get_pool()
+    conn = pool.acquire()
+    broken = False
+    try:
+        yield conn
+    except Exception:
+        # Solo se verifica la conexión cuando algo falló; una conexión rota no vuelve al pool
+        broken = not conn.is_connected()
+        raise
+    finally:
+        pool.release(conn, discard=broken)
+
+@contextmanager
+def transaction():
+    """
+    Ejecuta el bloque `with` dentro de una única transacción sobre una sola conexión del pool.
+
+    Yields:
+        MySQLCursorDict: Cursor (filas como diccionarios) de la conexión de la transacción.
+
+    Raises:
+        HTTPException: Si ocurre un error de MySQL; la transacción se revierte.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            conn.start_transaction()
+            yield cursor
+            conn.commit()
+        except Error as err:
+            conn.rollback()
+            raise HTTPException(status_code=500, detail=f"Error executing transaction: {err}")
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+def duplicate_key(err):
+    """
+    Índice único que violó una escritura, para traducir el error a una respuesta 400.
+
+    Args:
+        err (mysql.connector.Error): Error de la sentencia INSERT o UPDATE.
+
+    Returns:
+        str | None: Nombre del índice (sin el prefijo de la tabla), o None si el error no es ER_DUP_ENTRY.
+    """
+    if err.errno != errorcode.ER_DUP_ENTRY:
+        return None
+    match = re.search(r"for key '(?:[^'.]+\.)?([^']+)'", err.msg or "")
+    return match.group(1) if match else ""
+
+def missing_reference(err):
+    """
+    Tabla referenciada a la que le falta la fila indicada por una clave foránea, para traducir el error a un 404.
+
+    Args:
+        err (mysql.connector.Error): Error de la sentencia INSERT o UPDATE.
+
+    Returns:
+        str | None: Nombre de la tabla referenciada, o None si el error no es ER_NO_REFERENCED_ROW_2.
+    """
+    if err.errno != errorcode.ER_NO_REFERENCED_ROW_2:
+        return None
+    match = re.search(r"REFERENCES `([^`]+)`", err.msg or "")
+    return match.group(1) if match else ""
+
+@contextmanager
 def get_cursor():
-    """Obtiene un cursor de la conexión a la base de datos."""
-    connection = get_db_connection()
-    if connection:
-        return connection, connection.cursor(dictionary=True)
-    return None, None
+    """Presta un cursor (filas como diccionarios) de una conexión del pool durante el bloque `with`."""
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
 
 # Función para ejecutar una consulta SQL (SELECT)
 def execute_query(query, params=None):
@@ -43,17 +256,43 @@ def execute_query(query, params=None):
     Raises:
         HTTPException: Si ocurre un error al ejecutar la consulta.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)  # Usamos dictionary=True para obtener los resultados como diccionarios
-    try:
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        return results
-    except Error as err:
-        raise HTTPException(status_code=500, detail=f"Error executing query: {err}")
-    finally:
-        cursor.close()
-        conn.close()
+    with get_cursor() as cursor:
+        try:
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+            return results
+        except Error as err:
+            raise HTTPException(status_code=500, detail=f"Error executing query: {err}")
+
+# Función para ejecutar una consulta SQL (SELECT) con resultado columnar para análisis
+def execute_query_columnar(query, params=None, as_frame=False):
+    """
+    Ejecuta una consulta SQL SELECT y devuelve el resultado por columnas.
+
+    Las filas se leen como tuplas por bloques y se acumulan por columna, sin crear un
+    diccionario por fila; cada columna se convierte después en un array de NumPy tipado.
+
+    Args:
+        query (str): La consulta SQL a ejecutar.
+        params (tuple, optional): Parámetros para la consulta SQL.
+        as_frame (bool): Si es True, devuelve un DataFrame de pandas.
+
+    Returns:
+        dict[str, numpy.ndarray] | pandas.DataFrame: Un array por columna, o el DataFrame.
+
+    Raises:
+        HTTPException: Si ocurre un error al ejecutar la consulta.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            columns = fetch_columns(cursor)
+        except Error as err:
+            raise HTTPException(status_code=500, detail=f"Error executing query: {err}")
+        finally:
+            cursor.close()
+    return to_frame(columns) if as_frame else to_arrays(columns)
 
 # Función para ejecutar una consulta SQL (INSERT, UPDATE, DELETE)
 def execute_non_query(query, params=None):
@@ -70,15 +309,15 @@ def execute_non_query(query, params=None):
     Raises:
         HTTPException: Si ocurre un error al ejecutar la consulta.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(query, params)
-        conn.commit()
-        return cursor.rowcount
-    except Error as err:
-        conn.rollback()
-        raise HTTPException(status_code=500, detail=f"Error executing non-query: {err}")
-    finally:
-        cursor.close()
-        conn.close()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+        except Error as err:
+            conn.rollback()
+            raise HTTPException(status_code=500, detail=f"Error executing non-query: {err}")
+        finally:
+            cursor.close()
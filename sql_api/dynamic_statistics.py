@@ -0,0 +1,182 @@
+"""
+Endpoint dinámico de estadísticas (Beta v1.0): preguntas en lenguaje natural respondidas
+con SQL generado por el modelo o con un gráfico.
+
+Solo lo usan los administradores, así que se monta como un router aparte que puede
+desactivarse por despliegue (`ENABLE_DYNAMIC_STATISTICS=0`). Sus dependencias pesadas se
+cargan en el primer uso y no al arrancar la API: el SDK de OpenAI con la primera pregunta y
+pandas/matplotlib solo en los procesos del pool de gráficos (`charts.py`).
+"""
+import os
+from fastapi import APIRouter, HTTPException, Response, status
+from pydantic import BaseModel
+from cache import ReferenceCache
+from charts import chart_pool, chart_stats, render_chart
+from guarded_sql import RESULT_TRUNCATED_HEADER, close_readonly_pool, execute_generated_query
+
+router = APIRouter()
+
+class Question(BaseModel):
+    question: str
+
+class AnswerChatGPT(BaseModel):
+    response_type: str
+    sql_query: str
+    chart_type: str | None = None
+    x_axis: str | None = None
+    y_axis: str | None = None
+    data_source: str | None = None
+    timeframe: str | None = None
+
+class AnswerSQLText(BaseModel):
+    text_response: str | None = None
+    sql_query: str | None = None
+    sql_response: str | None = None
+
+api_key_stellargather = os.getenv("OPENAI_API_KEY", "")  # API Key de OpenAI
+# URL alternativa de la API de OpenAI (p. ej. un servidor local compatible para pruebas)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Cliente asíncrono compartido por todas las peticiones (reutiliza sus conexiones HTTP); el SDK se importa al crearlo
+openai_client = None
+
+def get_openai_client():
+    global openai_client
+    if openai_client is None:
+        from openai import AsyncOpenAI
+
+        openai_client = AsyncOpenAI(api_key=api_key_stellargather, base_url=OPENAI_BASE_URL)
+    return openai_client
+
+def set_openai_client(client):
+    """Sustituye el cliente del modelo (p. ej. por el stub de las pruebas); None vuelve al cliente real."""
+    global openai_client
+    openai_client = client
+
+# Caché de planes (AnswerChatGPT) por pregunta normalizada: las preguntas repetidas del panel no llaman al modelo.
+# Solo se guardan los planes que se ejecutaron sin errores.
+statistics_plan_cache = ReferenceCache(
+    max_entries=int(os.getenv("STATISTICS_PLAN_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.getenv("STATISTICS_PLAN_CACHE_TTL", "3600")),
+    enabled=os.getenv("STATISTICS_PLAN_CACHE_ENABLED", "1") == "1",
+)
+
+def normalize_question(question: str):
+    """Clave de caché de una pregunta: sin mayúsculas, espacios repetidos ni signos de puntuación en los extremos."""
+    return " ".join(question.casefold().split()).strip("¿?¡!.,;: ")
+
+# Función para enviar la pregunta a ChatGPT y obtener la clasificación y detalles
+async def classify_question_with_chatgpt(question: Question):
+    try:
+        schema_context = """
+        Eres un asistente que puede determinar si una pregunta está relacionada con una consulta SQL o un gráfico. MySQL es el sistema de gestión de
+        bases de datos que se utiliza en la base de datos de StellarGather. Si la pregunta requiere SQL, genera la consulta SQL solamente 
+        sin más (sql_query). Si la pregunta requiere un gráfico, determina el tipo de gráfico (por ejemplo, barras, líneas, pasteles, etc.) y 
+        devuelve los parámetros necesarios (sql_query (para obtener los datos necesarios para el gráfico), chart_type: str, x_axis: str, 
+        y_axis: str, data_source: str, timeframe: str). Si la pregunta es sql devuelves en el response_type 'sql' y si es gráfico devuelves 'chart'.
+
+        Debes tener sumo cuidado con las consultas SQL que vas a generar, el campo sql_query debe estar solo la consulta 
+        SQL que responda a la pregunta (No pueden haber puntos al final de la consulta SQL).
+
+        Aquí está el esquema de la base de datos:
+        - users: id, username, email, full_name, gender ('male', 'female'), country, phone_number, birth_date, created_at, updated_at
+        - organizers: id, name, email, phone
+        - categories: id, name
+        - events: id, name, description, location, city, country, date, max_capacity, price, organizer_id
+        - registrations: id, user_id, event_id, status ('registered', 'canceled'), date
+        - event_categories: event_id, category_id
+        - feedbacks: id, user_id, event_id, comment_text, rating_value, timestamp. (Cuando hablen sobre comentarios,
+        es el comment_text, cuando hablen de calificación, es el rating_value)
+
+        Las claves foráneas aseguran las integraciones entre tablas, y se aplican restricciones de unicidad y consistencia de 
+        datos en los atributos clave. La columna password de users no es accesible: nunca uses SELECT * sobre users, enumera las columnas.
+
+        Al nombrar x_axis e y_axis, debe tener los mismos nombres a los que devuelva la consulta SQL.
+        """
+
+        # Solicitar a ChatGPT que determine el tipo de respuesta
+        response = await get_openai_client().beta.chat.completions.parse(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": f"{schema_context}"},
+                {"role": "user", "content": question.question}
+            ],
+            max_tokens=300,
+            temperature=0.5,
+            response_format=AnswerChatGPT,
+        )
+        
+        message = response.choices[0].message
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al procesar la pregunta: {str(e)}")
+
+    # El modelo puede negarse a responder o no devolver un plan con el formato pedido
+    if message.parsed is None:
+        raise HTTPException(status_code=422, detail=f"El modelo no pudo responder la pregunta: {message.refusal or 'respuesta sin plan'}")
+    return message.parsed
+
+# Endpoint principal
+@router.post("/generate-statistics-endpoint", tags=["dynamic_statistics"])
+async def generate_statistics_endpoint(query: Question, response: Response):
+    # Reutilizar el plan de una pregunta equivalente o pedírselo a ChatGPT
+    key = ("plan", normalize_question(query.question))
+    cached, response_chatgpt, generation = statistics_plan_cache.lookup(key)
+    if not cached:
+        response_chatgpt = await classify_question_with_chatgpt(query)
+
+    # Si la respuesta es un SQL, ejecutar la consulta (solo lectura, con límites de tiempo, coste y filas) y devolver los resultados
+    if response_chatgpt.response_type == 'sql':
+        querysql = response_chatgpt.sql_query
+        result, truncated = await execute_generated_query(querysql)
+
+    # Si la respuesta es un gráfico, generar el gráfico y devolver la imagen en base64
+    elif response_chatgpt.response_type == 'chart':
+        querysql = response_chatgpt.sql_query
+        # Los datos del gráfico se leen por columnas: el DataFrame se construye sin diccionarios por fila
+        columns, truncated = await execute_generated_query(querysql, columnar=True)
+
+        # Obtener parámetros del gráfico desde la respuesta de ChatGPT
+        chart_type = response_chatgpt.chart_type
+        x_axis = response_chatgpt.x_axis
+        y_axis = response_chatgpt.y_axis
+
+        # Generar el gráfico en el pool de gráficos (o reutilizar el ya renderizado)
+        image_base64 = await render_chart(querysql, columns, chart_type, x_axis, y_axis)
+        result = {"image_base64": image_base64, "sql_query": querysql}
+
+    else:
+        # Tipo de respuesta desconocido: se devuelve el plan sin guardarlo en la caché
+        return response_chatgpt
+
+    # El plan se guarda solo cuando se ejecutó sin errores: un plan rechazado (422) o que falló
+    # al renderizarse vuelve a pedirse al modelo en la siguiente pregunta
+    if not cached:
+        statistics_plan_cache.store(key, response_chatgpt, generation)
+    if truncated:
+        response.headers[RESULT_TRUNCATED_HEADER] = "true"
+    return result
+
+# Métricas de la caché de planes del endpoint dinámico
+@router.get("/generate-statistics-endpoint/cache/stats", response_model=dict, tags=["dynamic_statistics"])
+def get_statistics_plan_cache_stats():
+    return statistics_plan_cache.stats()
+
+# Métricas del pool de renderizado de gráficos y de su caché de imágenes
+@router.get("/generate-statistics-endpoint/charts/stats", response_model=dict, tags=["dynamic_statistics"])
+def get_chart_stats():
+    return chart_stats()
+
+# Vaciar la caché de planes (p. ej. tras cambiar el esquema o el prompt)
+@router.delete("/generate-statistics-endpoint/cache", status_code=status.HTTP_204_NO_CONTENT, tags=["dynamic_statistics"])
+def clear_statistics_plan_cache():
+    statistics_plan_cache.clear()
+
+async def close_dynamic_statistics():
+    """Libera los recursos del endpoint dinámico al apagar la API."""
+    global openai_client
+    await close_readonly_pool()
+    if openai_client is not None:
+        await openai_client.close()
+        openai_client = None
+    chart_pool.shutdown()
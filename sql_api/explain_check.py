@@ -0,0 +1,229 @@
+"""
+Verificación de planes de ejecución de las consultas del servicio SQL.
+
+Extrae todas las consultas SQL SELECT de `main.py` (también las dinámicas: f-strings con
+listas de columnas y consultas construidas concatenando fragmentos), ejecuta `EXPLAIN` sobre
+cada una contra la base de datos configurada (con las migraciones aplicadas) y falla si
+alguna consulta, al filtrar u ordenar una tabla caliente:
+
+- la recorre completa (`type=ALL`), aunque el plan liste índices posibles que no usa, o
+- estima examinar más de `EXPLAIN_MAX_ROWS` filas (p. ej. un filesort sobre toda la tabla).
+
+Una consulta dinámica que no se puede reconstruir también es un fallo: hay que añadir su
+fragmento de ejemplo en `SAMPLE_FRAGMENTS`. Los umbrales tienen sentido con un volumen de
+datos representativo; por debajo de `EXPLAIN_SCAN_MIN_ROWS` filas el optimizador prefiere
+legítimamente un recorrido completo.
+
+Uso:
+    python explain_check.py             # Sale con código 1 si alguna consulta es una regresión
+    python explain_check.py --verbose   # Muestra además el plan de cada consulta
+"""
+import ast
+import os
+import re
+import sys
+from database import pooled_connection
+from pagination import keyset_predicate
+
+MAIN_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+# Tablas en las que un recorrido completo filtrado se considera una regresión
+HOT_TABLES = {"events", "registrations", "feedbacks", "event_categories", "users"}
+
+# Umbrales de filas estimadas por EXPLAIN
+EXPLAIN_SCAN_MIN_ROWS = int(os.getenv("EXPLAIN_SCAN_MIN_ROWS", "100"))  # Recorrido completo tolerado en tablas pequeñas
+EXPLAIN_MAX_ROWS = int(os.getenv("EXPLAIN_MAX_ROWS", "10000"))  # Filas examinadas por tabla al filtrar u ordenar
+
+# Fragmentos representativos para las partes dinámicas (f-strings) de las consultas
+SAMPLE_FRAGMENTS = {
+    "keyset": "(id > %s)",  # Solo si no se encuentra la llamada a keyset_predicate de la función
+    "placeholders": "%s",
+    "columns": "*",
+}
+
+SAMPLE_DATETIME = "'2024-01-01 00:00:00'"
+
+def extract_queries(path=MAIN_MODULE):
+    """
+    Devuelve las consultas SELECT de un módulo.
+
+    Las f-strings se reconstruyen con `SAMPLE_FRAGMENTS`, el predicado de `keyset_predicate`
+    de la misma función y `select_list(...)` como lista de columnas; las concatenaciones `variable + "..."` se resuelven con las asignaciones de
+    cadenas de la misma función, generando una consulta por cada valor posible.
+
+    Returns:
+        tuple[list[tuple[int, str]], list[int]]: Las consultas como (línea, sql) y las líneas
+            de las consultas dinámicas que no se pudieron reconstruir.
+    """
+    with open(path, encoding="utf-8") as source_file:
+        tree = ast.parse(source_file.read())
+    queries, unresolved = set(), set()
+    scopes = [tree] + [node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    for scope in scopes:
+        fragments = {**SAMPLE_FRAGMENTS, **_keyset_fragments(scope)}
+        assigned = _string_assignments(scope, fragments)
+        for node in _string_expressions(scope):
+            alternatives = _render(node, assigned, fragments)
+            if alternatives is None:
+                if re.search(r"\bSELECT\b", ast.unparse(node), re.IGNORECASE):
+                    unresolved.add(node.lineno)
+                continue
+            for sql in alternatives:
+                if re.match(r"\s*SELECT\b.*\bFROM\b", sql, re.IGNORECASE | re.DOTALL):
+                    queries.add((node.lineno, " ".join(sql.split())))
+    return sorted(queries), sorted(unresolved)
+
+def _is_string_expression(node):
+    return isinstance(node, ast.JoinedStr) or (isinstance(node, ast.Constant) and isinstance(node.value, str)) or (
+        isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add)
+        and any(_is_string_expression(side) for side in (node.left, node.right))
+    )
+
+def _string_expressions(scope):
+    """Expresiones de cadena de un ámbito (sin las funciones anidadas ni las partes de otra expresión)."""
+    pending = list(ast.iter_child_nodes(scope))
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if _is_string_expression(node):
+            yield node
+        else:
+            pending.extend(ast.iter_child_nodes(node))
+
+def _keyset_fragments(scope):
+    """
+    Predicado real de `keyset, params = keyset_predicate((columnas...), ...)` en un ámbito,
+    para que el EXPLAIN use las mismas columnas (y tablas) que la consulta paginada.
+    """
+    for node in ast.walk(scope):
+        if not (isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Tuple) and isinstance(node.value, ast.Call)):
+            continue
+        call, target = node.value, node.targets[0].elts[0]
+        if isinstance(call.func, ast.Name) and call.func.id == "keyset_predicate" and isinstance(target, ast.Name):
+            try:
+                columns = ast.literal_eval(call.args[0])
+                descending = any(keyword.arg == "descending" and ast.literal_eval(keyword.value) for keyword in call.keywords)
+            except ValueError:
+                continue
+            return {target.id: keyset_predicate(columns, [None] * len(columns), descending)[0]}
+    return {}
+
+def _string_assignments(scope, fragments):
+    """Valores posibles de las variables a las que se asigna una cadena en un ámbito."""
+    assigned = {}
+    for node in ast.walk(scope):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if _is_string_expression(node.value):
+                rendered = _render(node.value, assigned, fragments)
+                if rendered is not None:
+                    assigned.setdefault(node.targets[0].id, []).extend(rendered)
+    return assigned
+
+def _render(node, assigned, fragments):
+    """Alternativas de texto de una expresión de cadena, o None si no se puede reconstruir."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.JoinedStr):
+        sql = _render_fstring(node, fragments)
+        return None if sql is None else [sql]
+    if isinstance(node, ast.Name):
+        return assigned.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _render(node.left, assigned, fragments), _render(node.right, assigned, fragments)
+        if left is None or right is None:
+            return None
+        return [first + second for first in left for second in right]
+    return None
+
+def _render_fstring(node, fragments):
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+        elif isinstance(value, ast.FormattedValue) and isinstance(value.value, ast.Name) and value.value.id in fragments:
+            parts.append(fragments[value.value.id])
+        elif isinstance(value, ast.FormattedValue) and _is_select_list(value.value):
+            # select_list(campos, "tabla") -> todas las columnas de la tabla
+            table = value.value.args[1] if len(value.value.args) > 1 else None
+            parts.append(f"{table.value}.*" if isinstance(table, ast.Constant) else "*")
+        else:
+            return None
+    return "".join(parts)
+
+def _is_select_list(node):
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "select_list"
+
+def bind_sample_parameters(sql):
+    """
+    Sustituye cada %s por un literal de ejemplo del tipo adecuado, para que el optimizador
+    pueda considerar los índices (un literal de tipo incorrecto anularía su uso).
+    """
+    def sample(match):
+        context = match.group(1) or ""
+        if re.search(r"\b(LIMIT|OFFSET)\s*$", context, re.IGNORECASE):
+            return "10"
+        if re.search(r"(date|timestamp)\w*\s*(=|>=|<=|<|>)\s*$", context, re.IGNORECASE):
+            return SAMPLE_DATETIME
+        return "'1'"
+    return re.sub(r"([^%]{0,40})%s", lambda match: match.group(1) + sample(match), sql)
+
+def table_aliases(sql):
+    """Mapa alias -> tabla de las cláusulas FROM/JOIN de una consulta."""
+    aliases = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias and alias.upper() not in {"WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "ON", "GROUP", "ORDER", "LIMIT"}:
+            aliases[alias] = table
+    return aliases
+
+def find_regressions(sql, plan_rows):
+    """
+    Filas del plan que filtran u ordenan una tabla caliente recorriéndola completa o
+    examinando demasiadas filas, se usen o no los índices posibles.
+    """
+    aliases = table_aliases(sql)
+    regressions = []
+    for row in plan_rows:
+        extra = row.get("Extra") or ""
+        if aliases.get(row.get("table")) not in HOT_TABLES or not ("Using where" in extra or "Using filesort" in extra):
+            continue
+        rows = row.get("rows") or 0
+        if (row.get("type") == "ALL" and rows > EXPLAIN_SCAN_MIN_ROWS) or rows > EXPLAIN_MAX_ROWS:
+            regressions.append(row)
+    return regressions
+
+def explain(cursor, sql):
+    """Ejecuta EXPLAIN sobre `sql` con parámetros de ejemplo y devuelve (plan, regresiones)."""
+    cursor.execute("EXPLAIN " + bind_sample_parameters(sql))
+    plan = cursor.fetchall()
+    return plan, find_regressions(sql, plan)
+
+def check_queries(verbose=False):
+    """Ejecuta EXPLAIN sobre todas las consultas y devuelve la lista de regresiones."""
+    failures = []
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            queries, unresolved = extract_queries()
+            for line in unresolved:
+                print(f"main.py:{line}: consulta dinámica sin fragmento de ejemplo en SAMPLE_FRAGMENTS")
+                failures.append((line, None, []))
+            for line, sql in queries:
+                plan, regressions = explain(cursor, sql)
+                if verbose or regressions:
+                    print(f"main.py:{line}: {sql}")
+                    for row in plan:
+                        print(f"    {row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')} extra={row.get('Extra')}")
+                if regressions:
+                    failures.append((line, sql, regressions))
+        finally:
+            cursor.close()
+    return failures
+
+if __name__ == "__main__":
+    regressions = check_queries(verbose="--verbose" in sys.argv)
+    if regressions:
+        print(f"{len(regressions)} consulta(s) recorren una tabla completa, examinan demasiadas filas o no se pudieron comprobar")
+        sys.exit(1)
+    print("Todas las consultas usan índices en las tablas calientes")
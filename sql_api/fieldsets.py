@@ -0,0 +1,64 @@
+from functools import lru_cache
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import create_model
+
+FIELDS_DESCRIPTION = "Campos a devolver separados por comas (p. ej. id,name,date,city,price); por defecto, todos"
+
+def parse_fields(fields, model, required=(), excluded=()):
+    """
+    Valida el parámetro `fields` de un listado contra los campos del modelo de respuesta.
+
+    Args:
+        fields (str | None): Lista de campos separados por comas, o None para devolver todos.
+        model: Modelo pydantic de la respuesta completa.
+        required (tuple): Campos que siempre se seleccionan (claves del cursor de paginación, id).
+        excluded (tuple): Campos del modelo que no son columnas (relaciones incluidas aparte).
+
+    Returns:
+        tuple | None: Campos seleccionados en el orden del modelo, o None si no se pidió proyección.
+    """
+    if fields is None:
+        return None
+    allowed = [name for name in model.model_fields if name not in excluded]
+    requested = [value.strip() for value in fields.split(",") if value.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(unknown) or fields}. Available: {', '.join(allowed)}")
+    selected = set(requested) | set(required)
+    return tuple(name for name in allowed if name in selected)
+
+def select_list(field_names, table=None, column_map=None):
+    """
+    Lista de columnas SQL para los campos seleccionados.
+
+    `column_map` traduce los campos cuyo nombre no coincide con la columna (p. ej.
+    "event_date": "events.date"); el resto se califica con `table` si se indica.
+    """
+    column_map = column_map or {}
+    columns = []
+    for name in field_names:
+        column = column_map.get(name, f"{table}.{name}" if table else name)
+        columns.append(column if column.split(".")[-1] == name else f"{column} AS {name}")
+    return ", ".join(columns)
+
+@lru_cache(maxsize=256)
+def projected_model(model, field_names):
+    """Modelo pydantic con solo los campos indicados (mismos tipos y valores por defecto), cacheado por proyección."""
+    definitions = {name: (model.model_fields[name].annotation, model.model_fields[name]) for name in field_names}
+    return create_model(f"{model.__name__}Projection", **definitions)
+
+def projected_response(response: Response, model, rows):
+    """
+    Valida las filas con el modelo proyectado y devuelve la respuesta JSON, conservando las
+    cabeceras ya fijadas en `response` (cursor de paginación, validadores de caché).
+    """
+    content = jsonable_encoder([model(**row) for row in rows])
+    headers = {name: value for name, value in response.headers.items() if name.lower() != "content-length"}
+    return JSONResponse(content=content, headers=headers)
+
+def projected_item_response(model, row):
+    """Como `projected_response` para un único objeto con solo los campos presentes en `row` (p. ej. la respuesta de un PATCH)."""
+    field_names = tuple(name for name in model.model_fields if name in row)
+    return JSONResponse(content=jsonable_encoder(projected_model(model, field_names)(**row)))
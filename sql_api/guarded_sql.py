@@ -0,0 +1,190 @@
+"""
+Ejecución controlada de las consultas SQL generadas por el modelo (endpoint dinámico).
+
+Una consulta generada no es de confianza: puede ser una escritura, un producto cartesiano
+sobre las tablas grandes o devolver millones de filas. Antes de ejecutarla se comprueba que
+sea una única sentencia SELECT, se estima su coste con `EXPLAIN` frente a un presupuesto de
+filas y se ejecuta:
+
+- con el usuario `DB_READONLY_USER` (obligatorio), que solo tiene SELECT sobre las tablas
+  del esquema y, en `users`, sobre todas las columnas salvo `password` (ver
+  `readonly_user.sql`), en una transacción `READ ONLY`,
+- con un límite de tiempo (`max_execution_time`),
+- con un tope de filas inyectado (`LIMIT`), leyendo el resultado por bloques.
+
+Qué datos puede leer una consulta lo decide MySQL con esos permisos, no el texto de la
+consulta. Las consultas rechazadas devuelven un 422 que explica el motivo.
+"""
+import os
+import re
+import aiomysql
+from pymysql import Error
+from fastapi import HTTPException
+from database import DIRECTION, POOL_RECYCLE
+from columnar import empty_columns, extend_columns, row_count
+
+GENERATED_SQL_TIMEOUT_MS = int(os.getenv("GENERATED_SQL_TIMEOUT_MS", "5000"))
+GENERATED_SQL_MAX_ROWS = int(os.getenv("GENERATED_SQL_MAX_ROWS", "5000"))  # Filas devueltas como máximo
+GENERATED_SQL_MAX_EXAMINED_ROWS = int(os.getenv("GENERATED_SQL_MAX_EXAMINED_ROWS", "1000000"))  # Presupuesto estimado por EXPLAIN
+GENERATED_SQL_POOL_SIZE = int(os.getenv("GENERATED_SQL_POOL_SIZE", "4"))
+DB_READONLY_USER = os.getenv("DB_READONLY_USER")
+FETCH_BATCH_SIZE = 500
+RESULT_TRUNCATED_HEADER = "X-Result-Truncated"  # Presente cuando el resultado alcanzó el tope de filas
+
+# Construcciones que una consulta de solo lectura para estadísticas no necesita
+FORBIDDEN_PATTERNS = {
+    r"\bINTO\s+(OUTFILE|DUMPFILE)\b": "writes to files",
+    r"\bINTO\s+@": "assigns user variables",
+    r"\bFOR\s+(UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b": "takes row locks",
+    r"\b(SLEEP|BENCHMARK|GET_LOCK|RELEASE_LOCK|LOAD_FILE)\s*\(": "calls a forbidden function",
+}
+
+# Códigos de error de MySQL con una explicación propia
+ER_DUP_FIELDNAME = 1060
+ER_QUERY_TIMEOUT = 3024
+ER_CANT_EXECUTE_IN_READ_ONLY_TRANSACTION = 1792
+ER_TABLEACCESS_DENIED_ERROR = 1142
+ER_COLUMNACCESS_DENIED_ERROR = 1143
+ACCESS_DENIED_ERRORS = {ER_TABLEACCESS_DENIED_ERROR, ER_COLUMNACCESS_DENIED_ERROR}
+
+_readonly_pool = None
+
+def reject(reason):
+    raise HTTPException(status_code=422, detail=f"Generated query rejected: {reason}")
+
+async def get_readonly_pool():
+    """
+    Pool de conexiones de solo lectura para las consultas generadas, creado en el primer uso.
+
+    Raises:
+        HTTPException: 503 si `DB_READONLY_USER` no está configurado: el usuario de la API
+            puede leer `users.password`, así que nunca se usa para las consultas generadas.
+    """
+    global _readonly_pool
+    if not DB_READONLY_USER:
+        raise HTTPException(status_code=503, detail="Generated queries are disabled: DB_READONLY_USER is not configured")
+    if _readonly_pool is None:
+        _readonly_pool = await aiomysql.create_pool(
+            host=os.getenv("DB_HOST", DIRECTION),
+            user=DB_READONLY_USER,
+            password=os.getenv("DB_READONLY_PASSWORD", ""),
+            db=os.getenv("DB_NAME", "stellargather"),
+            minsize=0,
+            maxsize=GENERATED_SQL_POOL_SIZE,
+            pool_recycle=int(POOL_RECYCLE),
+            autocommit=False,
+            init_command="SET SESSION TRANSACTION READ ONLY",
+        )
+    return _readonly_pool
+
+async def close_readonly_pool():
+    global _readonly_pool
+    if _readonly_pool is not None:
+        _readonly_pool.close()
+        await _readonly_pool.wait_closed()
+        _readonly_pool = None
+
+def validate_generated_sql(sql):
+    """
+    Comprueba que la consulta sea una única sentencia SELECT (o WITH ... SELECT) permitida.
+
+    Returns:
+        str: La consulta sin espacios ni ';' finales.
+    """
+    statement = sql.strip().rstrip(";").strip()
+    if not statement:
+        reject("the query is empty")
+    if ";" in statement:
+        reject("only a single statement is allowed")
+    if not re.match(r"(SELECT|WITH)\b", statement, re.IGNORECASE):
+        reject("only SELECT queries are allowed")
+    for pattern, reason in FORBIDDEN_PATTERNS.items():
+        if re.search(pattern, statement, re.IGNORECASE):
+            reject(f"the query {reason}")
+    return statement
+
+def estimate_examined_rows(plan):
+    """
+    Filas que estima examinar un plan de `EXPLAIN`: dentro de cada SELECT las tablas se
+    combinan en bucles anidados (producto de rows * filtered), y los SELECT se suman.
+    """
+    per_select = {}
+    for row in plan:
+        rows = (row.get("rows") or 1) * (row.get("filtered") or 100) / 100
+        per_select[row.get("id")] = per_select.get(row.get("id"), 1) * max(rows, 1)
+    return int(sum(per_select.values()))
+
+async def execute_generated_query(sql, columnar=False):
+    """
+    Ejecuta una consulta generada con las salvaguardas del módulo.
+
+    Args:
+        sql (str): Consulta generada por el modelo.
+        columnar (bool): Si es True, el resultado se devuelve por columnas (ver `columnar.py`)
+            en lugar de como lista de diccionarios, para los caminos analíticos.
+
+    Returns:
+        tuple[list[dict] | dict, bool]: Las filas (como mucho `GENERATED_SQL_MAX_ROWS`) y si
+            el resultado se truncó.
+
+    Raises:
+        HTTPException: 422 si la consulta se rechaza (con el motivo), 500 ante otros errores.
+    """
+    statement = validate_generated_sql(sql)
+    pool = await get_readonly_pool()
+    async with pool.acquire() as conn:
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute("SET SESSION max_execution_time = %s", (GENERATED_SQL_TIMEOUT_MS,))
+                await conn.begin()
+                try:
+                    await cursor.execute(f"EXPLAIN {statement}")
+                except Error as err:
+                    if err.args and err.args[0] in ACCESS_DENIED_ERRORS:
+                        raise
+                    reject(f"it is not valid SQL ({err.args[-1]})")
+                estimated = estimate_examined_rows(await cursor.fetchall())
+                if estimated > GENERATED_SQL_MAX_EXAMINED_ROWS:
+                    reject(f"it would examine about {estimated} rows, over the budget of {GENERATED_SQL_MAX_EXAMINED_ROWS}")
+
+            # Tope de filas: una más que el máximo para saber si el resultado se truncó
+            capped = f"SELECT * FROM ({statement}) AS generated_query LIMIT {GENERATED_SQL_MAX_ROWS + 1}"
+            if columnar:
+                return await _fetch_columns(conn, capped)
+            rows = []
+            async with conn.cursor(aiomysql.SSDictCursor) as cursor:
+                await cursor.execute(capped)
+                while True:
+                    batch = await cursor.fetchmany(FETCH_BATCH_SIZE)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+            truncated = len(rows) > GENERATED_SQL_MAX_ROWS
+            return rows[:GENERATED_SQL_MAX_ROWS], truncated
+        except Error as err:
+            code = err.args[0] if err.args else None
+            if code == ER_QUERY_TIMEOUT:
+                reject(f"it exceeded the execution time limit of {GENERATED_SQL_TIMEOUT_MS} ms")
+            if code == ER_CANT_EXECUTE_IN_READ_ONLY_TRANSACTION:
+                reject("it tries to modify data")
+            if code in ACCESS_DENIED_ERRORS:
+                reject(f"it reads data that generated queries cannot access, such as users.password ({err.args[-1]})")
+            if code == ER_DUP_FIELDNAME:
+                reject("it returns several columns with the same name (use aliases)")
+            raise HTTPException(status_code=500, detail=f"Error executing query: {err}")
+        finally:
+            await conn.rollback()
+
+async def _fetch_columns(conn, capped):
+    async with conn.cursor(aiomysql.SSCursor) as cursor:
+        await cursor.execute(capped)
+        columns = empty_columns(cursor.description)
+        while True:
+            batch = await cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not batch:
+                break
+            extend_columns(columns, batch)
+    truncated = row_count(columns) > GENERATED_SQL_MAX_ROWS
+    if truncated:
+        columns["values"] = [values[:GENERATED_SQL_MAX_ROWS] for values in columns["values"]]
+    return columns, truncated
@@ -0,0 +1,68 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response, status
+
+# Políticas Cache-Control por tipo de recurso
+CACHE_CONTROL_REFERENCE = "public, max-age=300"  # Categorías y organizadores: cambian muy poco
+CACHE_CONTROL_EVENTS = "public, max-age=60"
+CACHE_CONTROL_REVALIDATE = "public, no-cache"  # Se puede guardar, pero se revalida en cada uso (comentarios)
+
+def make_etag(*markers):
+    """
+    ETag débil a partir de marcas de versión baratas de obtener (ids, updated_at, conteos,
+    parámetros de la consulta), sin serializar ni recorrer el cuerpo de la respuesta.
+    """
+    digest = hashlib.sha1(repr(markers).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def _etag_matches(if_none_match, etag):
+    if if_none_match.strip() == "*":
+        return True
+    # Comparación débil: se ignora el prefijo W/ de ambos lados
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def _not_modified_since(if_modified_since, last_modified):
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    # Una fecha en "-0000" se devuelve sin zona horaria: HTTP-date siempre está en UTC
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    try:
+        return last_modified.replace(microsecond=0) <= since
+    except TypeError:
+        return False
+
+def _as_utc(moment):
+    # MySQL devuelve TIMESTAMP sin zona horaria en la zona de la sesión (UTC en el despliegue)
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+def conditional_response(request: Request, response: Response, etag, last_modified=None, cache_control=CACHE_CONTROL_REVALIDATE):
+    """
+    Añade los validadores y la política de caché a la respuesta y, si la petición es
+    condicional y el recurso no cambió, devuelve una respuesta 304 que el endpoint debe
+    retornar directamente en lugar de consultar las filas completas.
+
+    If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110).
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        last_modified = _as_utc(last_modified)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif last_modified is not None and request.headers.get("if-modified-since"):
+        not_modified = _not_modified_since(request.headers["if-modified-since"], last_modified)
+    else:
+        not_modified = False
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -1,15 +1,32 @@
-from fastapi import FastAPI, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from database import execute_query, execute_non_query
-from passlib.context import CryptContext
+from database import execute_query, execute_non_query, get_pool_stats, transaction, duplicate_key, missing_reference
+from async_database import execute_query_async, close_async_pool
+from registrations import register_user_for_event, cancel_registration, delete_registration_record, discount_user_registrations
+from admission import hot_events, admission_queue, ADMISSION_DEFAULT_BATCH_SIZE
+from migrate import apply_migrations_with_retry
+from cache import reference_cache
+from http_cache import CACHE_CONTROL_EVENTS, CACHE_CONTROL_REFERENCE, CACHE_CONTROL_REVALIDATE, conditional_response, make_etag
+from summaries import apply_event_delta, apply_event_change, apply_category_delta, discount_event_categories, apply_feedback_delta, discount_user_feedbacks
+from bulk import BULK_MAX_ITEMS, bulk_create_events, bulk_create_event_categories, bulk_create_categories, bulk_create_organizers
+from fieldsets import FIELDS_DESCRIPTION, parse_fields, projected_item_response, projected_model, projected_response, select_list
+from patching import apply_patch, reject_nulls
+from pagination import AFTER_DESCRIPTION, NEXT_CURSOR_HEADER, decode_cursor, keyset_predicate, set_next_cursor
+from mysql.connector import IntegrityError, errorcode
+from passwords import password_hasher
+from guarded_sql import RESULT_TRUNCATED_HEADER
+from sessions import admin_session, current_session, issue_token, revocations
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime, date
-from openai import OpenAI
-import pandas as pd
-import matplotlib.pyplot as plt
-import io
-import base64
+from datetime import datetime, date, time
+import calendar
+import os
+
+# El endpoint dinámico de estadísticas (OpenAI, gráficos) puede desactivarse en los despliegues solo CRUD
+ENABLE_DYNAMIC_STATISTICS = os.getenv("ENABLE_DYNAMIC_STATISTICS", "1") == "1"
 
 USER_NOT_FOUND = "User not found"
 EVENT_NOT_FOUND = "Event not found"
@@ -40,10 +57,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, RESULT_TRUNCATED_HEADER],
 )
 
-# Contexto de encriptación de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if ENABLE_DYNAMIC_STATISTICS:
+    from dynamic_statistics import router as dynamic_statistics_router, close_dynamic_statistics
+    app.include_router(dynamic_statistics_router)
+
+@app.on_event("startup")
+def startup():
+    # Aplica las migraciones pendientes del esquema (desactivable con DB_AUTO_MIGRATE=0). Si no se
+    # pueden aplicar, el arranque falla: con un esquema incompleto la API respondería 500 en todas partes
+    if os.getenv("DB_AUTO_MIGRATE", "1") == "1":
+        apply_migrations_with_retry()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await admission_queue.close()
+    await close_async_pool()
+    if ENABLE_DYNAMIC_STATISTICS:
+        await close_dynamic_statistics()
+    password_hasher.shutdown()
+
+# Último instante de un día en events.date (DATETIME sin fracciones de segundo). Los rangos
+# terminan en él, incluido, en lugar de en el día siguiente, que no existe para 9999-12-31
+DAY_LAST_SECOND = time(23, 59, 59)
+
+def parse_day_range(event_date: str):
+    """Convierte 'YYYY-MM-DD' en el rango [inicio del día, último segundo del día] para filtrar por índice."""
+    try:
+        day = datetime.strptime(event_date, "%Y-%m-%d")  # Solo conservamos la fecha, no la hora
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    return day, datetime.combine(day.date(), DAY_LAST_SECOND)
 
 # Modelos de datos para la API
 class User(BaseModel):
@@ -93,6 +139,22 @@ class UserUpdate(BaseModel):
     class Config:
         from_attributes = True
 
+# Actualización parcial (PATCH): solo se escriben los campos enviados
+class UserPatch(UserUpdate):
+    version: Optional[int] = None  # Versión leída por el cliente; si no coincide, 409
+
+class EventPatch(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+    date: Optional[datetime] = None
+    max_capacity: Optional[int] = None
+    price: Optional[float] = None
+    organizer_id: Optional[int] = None
+    version: Optional[int] = None  # Versión leída por el cliente; si no coincide, 409
+
 class Organizer(BaseModel):
     name: str
     email: str
@@ -105,23 +167,6 @@ class EventCategory(BaseModel):
     event_id: int
     category_id: int
 
-class Question(BaseModel):
-    question: str
-
-class AnswerChatGPT(BaseModel):
-    response_type: str
-    sql_query: str
-    chart_type: str | None = None
-    x_axis: str | None = None
-    y_axis: str | None = None
-    data_source: str | None = None
-    timeframe: str | None = None
-
-class AnswerSQLText(BaseModel):
-    text_response: str | None = None
-    sql_query: str | None = None
-    sql_response: str | None = None
-
 class Feedback(BaseModel):
     user_id: int
     event_id: int
@@ -140,6 +185,24 @@ class UserResponse(BaseModel):
     birth_date: Optional[date] = None
     created_at: datetime
     updated_at: datetime
+    version: int | None = None  # Para la concurrencia optimista de PATCH /users/{user_id}
+
+    class Config:
+        from_attributes = True
+
+class CategoryResponse(BaseModel):
+    id : int
+    name: str
+
+    class Config:
+        from_attributes = True
+
+# Datos de un usuario que pueden mostrarse públicamente (autor de un comentario, listados)
+class UserPublicResponse(BaseModel):
+    id: int
+    username: str
+    full_name: str
+    country: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -155,6 +218,8 @@ class EventResponse(BaseModel):
     max_capacity: int 
     price: float
     organizer_id: int
+    version: int | None = None  # Para la concurrencia optimista de PATCH /events/{event_id}
+    categories: List[CategoryResponse] | None = None  # Solo con include=categories
 
     class Config:
         from_attributes = True
@@ -168,6 +233,29 @@ class RegistrationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Evento en el que está inscrito un usuario, junto con los datos de su inscripción
+class UserRegistrationEventResponse(BaseModel):
+    event_id: int
+    name: str
+    description: str
+    location: str
+    event_date: datetime
+    max_capacity: int
+    price: float
+    organizer_id: int | None = None
+    registration_id: int
+    registration_date: datetime
+    status: str
+
+class RegistrationTicketResponse(BaseModel):
+    ticket_id: str
+    event_id: int
+    user_id: int
+    status: str  # 'pending', 'confirmed' o 'rejected'
+    position: int | None = None
+    detail: str | None = None
+    registration: RegistrationResponse | None = None
+
 class OrganizerResponse(BaseModel):
     id : int
     name: str
@@ -177,12 +265,18 @@ class OrganizerResponse(BaseModel):
     class Config:
         from_attributes = True
 
-class CategoryResponse(BaseModel):
-    id : int
-    name: str
+class EventAvailabilityResponse(BaseModel):
+    max_capacity: int
+    registrations_count: int
+    canceled_count: int
+    available_slots: int
 
-    class Config:
-        from_attributes = True
+class EventDetailResponse(BaseModel):
+    event: EventResponse
+    organizer: OrganizerResponse | None = None
+    categories: List[CategoryResponse]
+    availability: EventAvailabilityResponse
+    registration: RegistrationResponse | None = None  # Inscripción activa del usuario indicado, si la tiene
 
 class EventCategoryResponse(BaseModel):
     message: str
@@ -197,43 +291,198 @@ class FeedbackResponse(BaseModel):
     comment_text: str
     rating_value: int
     timestamp: datetime
+    author: UserPublicResponse | None = None  # Solo en los listados que lo resuelven
 
     class Config:
         from_attributes = True
 
+class BulkItemResult(BaseModel):
+    index: int  # Posición del elemento en el lote recibido
+    status: str  # 'created' o 'rejected'
+    status_code: int
+    id: int | None = None
+    detail: str | None = None
+
+class BulkWriteResponse(BaseModel):
+    created: int
+    rejected: int
+    results: List[BulkItemResult]
+
+def check_bulk_size(items):
+    if not items:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large: maximum {BULK_MAX_ITEMS} items per request")
+
+def bulk_response(results):
+    items = [BulkItemResult(index=index, **result) for index, result in enumerate(results)]
+    created = sum(1 for item in items if item.status == "created")
+    return BulkWriteResponse(created=created, rejected=len(items) - created, results=items)
+
+def raise_conflict(err, detail):
+    """Traduce la violación de un índice único a un 400 con `detail`; relanza cualquier otro error de integridad."""
+    if duplicate_key(err) is not None:
+        raise HTTPException(status_code=400, detail=detail)
+    raise err
+
+def raise_event_conflict(err):
+    """Como `raise_conflict` para eventos, que además referencian a un organizador (404 si no existe)."""
+    if missing_reference(err) is not None:
+        raise HTTPException(status_code=404, detail=ORGANIZER_NOT_FOUND)
+    raise_conflict(err, "Event already exists")
+
+def raise_event_category_conflict(err):
+    """Vínculo evento-categoría repetido (400) o con un evento o una categoría que no existen (404)."""
+    table = missing_reference(err)
+    if table is not None:
+        raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND if table == "events" else CATEGORY_NOT_FOUND)
+    raise_conflict(err, "Event category already exists")
+
+def raise_user_conflict(err):
+    """Traduce la violación de los índices únicos de users (username, email) a un 400; relanza cualquier otro error."""
+    key = duplicate_key(err)
+    if key == "username":
+        raise HTTPException(status_code=400, detail="Username already registered")
+    if key == "email":
+        raise HTTPException(status_code=400, detail="Email already registered")
+    raise err
+
+MAX_USER_IDS_PER_REQUEST = 200
+
+def parse_id_list(ids: str):
+    """Convierte una lista de ids separados por comas ("1,2,3") en una lista de enteros sin duplicados."""
+    try:
+        parsed = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ids parameter. Use a comma-separated list of integers.")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="Invalid ids parameter. Use a comma-separated list of integers.")
+    if len(parsed) > MAX_USER_IDS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"Too many ids, the maximum is {MAX_USER_IDS_PER_REQUEST}")
+    return parsed
+
+EVENT_INCLUDES = {"categories"}
+INCLUDE_DESCRIPTION = "Relaciones a incluir en cada evento, separadas por comas (disponible: categories)"
+
+def parse_include(include: Optional[str]):
+    """Valida el parámetro include de los listados de eventos y devuelve el conjunto de relaciones pedidas."""
+    if include is None:
+        return set()
+    requested = {value.strip() for value in include.split(",") if value.strip()}
+    unknown = requested - EVENT_INCLUDES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid include value(s): {', '.join(sorted(unknown))}")
+    return requested
+
+def event_categories_query(event_ids):
+    """Consulta única con las categorías de todos los eventos de una página."""
+    placeholders = ", ".join(["%s"] * len(event_ids))
+    query = f"""
+    SELECT event_categories.event_id, categories.id, categories.name
+    FROM event_categories
+    JOIN categories ON event_categories.category_id = categories.id
+    WHERE event_categories.event_id IN ({placeholders})
+    ORDER BY event_categories.event_id, categories.id
+    """
+    return query, tuple(event_ids)
+
+EVENT_COLUMNS = tuple(name for name in EventResponse.model_fields if name != "categories")
+
+def event_projection(fields: Optional[str], keys=("id",), table=None):
+    """
+    Campos y columnas SQL de un listado de eventos según el parámetro `fields`.
+
+    Siempre se seleccionan el id y las claves del cursor de paginación (`keys`). Sin `fields`
+    se seleccionan todas las columnas de EventResponse.
+    """
+    field_names = parse_fields(fields, EventResponse, required=("id", *keys), excluded=("categories",))
+    return field_names, select_list(field_names or EVENT_COLUMNS, table)
+
+def build_event_responses(response: Response, events, field_names=None, category_rows=None):
+    """
+    Construye la respuesta de una página de eventos, incrustando las categorías si se
+    resolvieron. Con proyección, la validación se hace con el modelo de los campos pedidos.
+    """
+    if category_rows is not None:
+        categories_by_event = {event["id"]: [] for event in events}
+        for row in category_rows:
+            categories_by_event[row["event_id"]].append(CategoryResponse(id=row["id"], name=row["name"]))
+        events = [{**event, "categories": categories_by_event[event["id"]]} for event in events]
+    if field_names is None:
+        return [EventResponse(**event) for event in events]
+    if category_rows is not None:
+        field_names = field_names + ("categories",)
+    return projected_response(response, projected_model(EventResponse, field_names), events)
+
+def event_responses(response: Response, events, include: Optional[str], field_names=None):
+    if "categories" not in parse_include(include) or not events:
+        return build_event_responses(response, events, field_names)
+    query, params = event_categories_query([event["id"] for event in events])
+    return build_event_responses(response, events, field_names, execute_query(query, params))
+
+async def event_responses_async(response: Response, events, include: Optional[str], field_names=None):
+    if "categories" not in parse_include(include) or not events:
+        return build_event_responses(response, events, field_names)
+    query, params = event_categories_query([event["id"] for event in events])
+    return build_event_responses(response, events, field_names, await execute_query_async(query, params))
+
+# Columnas de /users/{user_id}/registration-events cuyo nombre no coincide con el campo de la respuesta
+REGISTRATION_EVENT_COLUMNS = {
+    "event_id": "events.id",
+    "event_date": "events.date",
+    "registration_id": "registrations.id",
+    "registration_date": "registrations.date",
+    "status": "registrations.status",
+}
+
+FEEDBACK_COLUMNS = tuple(name for name in FeedbackResponse.model_fields if name != "author")
+
+def feedback_author(row: dict):
+    """Autor de un comentario a partir de una fila con columnas author_* (None si el usuario ya no existe)."""
+    if row.get("author_username") is None:
+        return None
+    return UserPublicResponse(id=row["user_id"], username=row["author_username"], full_name=row["author_full_name"], country=row["author_country"])
+
+def feedback_with_author(row: dict):
+    """Construye un FeedbackResponse con el autor a partir de una fila con columnas author_*."""
+    return FeedbackResponse(**row, author=feedback_author(row))
+
 # Endpoints para manejo de Usuarios
 
 # Obtener todos los usuarios
-@app.get("/users", response_model=List[UserResponse], tags=["users"])
-def get_users():
+@app.get("/users", response_model=List[UserResponse] | List[UserPublicResponse], tags=["users"])
+def get_users(ids: Optional[str] = Query(None, description="Ids separados por comas; si se indica, solo se devuelven los campos públicos de esos usuarios")):
+    if ids is not None:
+        # Búsqueda por lotes: un único IN (...) para resolver cualquier lista de usuarios en una petición
+        user_ids = parse_id_list(ids)
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        query = f"SELECT id, username, full_name, country FROM users WHERE id IN ({placeholders})"
+        users = execute_query(query, tuple(user_ids))
+        return [UserPublicResponse(**user) for user in users]
+
     query = "SELECT * FROM users"
     users = execute_query(query)
     return [UserResponse(**user) for user in users]
 
 # Crear un nuevo usuario
 @app.post("/users", response_model=UserResponse, tags=["users"])
-def create_user(user: User):
-    # Verificar si el nombre de usuario ya está registrado
-    query_check_username = "SELECT id FROM users WHERE username = %s"
-    existing_username = execute_query(query_check_username, (user.username,))
-    
-    if existing_username:
-        raise HTTPException(status_code=400, detail="Username already registered")
+async def create_user(user: User):
+    # Hashear la contraseña (en el pool de bcrypt) antes de guardarla
+    hashed_password = await password_hasher.hash(user.password)
+    user_id, now = await run_in_threadpool(insert_user, user, hashed_password)
 
-    # Verificar si el correo electrónico ya está registrado
-    query_check_email = "SELECT id FROM users WHERE email = %s"
-    existing_email = execute_query(query_check_email, (user.email,))
-    
-    if existing_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
+    # Devuelve el usuario recién creado
+    return UserResponse(id=user_id, **user.dict(exclude={"password"}), created_at=now, updated_at=now, version=1)
 
-    # Hashear la contraseña antes de guardarla
-    hashed_password = pwd_context.hash(user.password)
+def insert_user(user: User, hashed_password: str):
+    """Inserta un usuario con la contraseña ya hasheada y devuelve su id y su fecha de creación."""
+    # Las marcas de tiempo se fijan aquí para devolver el usuario sin volver a leerlo
+    now = datetime.now().replace(microsecond=0)
 
-    # Insertar el nuevo usuario en la base de datos
+    # Insertar el nuevo usuario; los índices únicos de username y email detectan los duplicados
     query_insert_user = """
-    INSERT INTO users (username, email, password, full_name, gender, country, phone_number, birth_date) 
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    INSERT INTO users (username, email, password, full_name, gender, country, phone_number, birth_date, created_at, updated_at) 
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
     params = (
         user.username,
@@ -243,29 +492,23 @@ def create_user(user: User):
         user.gender,
         user.country,
         user.phone_number,
-        user.birth_date
+        user.birth_date,
+        now,
+        now
     )
-    execute_non_query(query_insert_user, params)
-
-    # Obtener el nuevo usuario por su nombre de usuario o correo (para obtener datos como 'created_at' y 'updated_at')
-    query_get_user = """
-    SELECT id, username, email, full_name, gender, country, phone_number, birth_date, created_at, updated_at
-    FROM users WHERE username = %s OR email = %s
-    """
-    user_data = execute_query(query_get_user, (user.username, user.email))
-
-    if not user_data:
-        raise HTTPException(status_code=400, detail="User creation failed")
-
-    # Devuelve el usuario recién creado
-    return UserResponse(**user_data[0])
+    with transaction() as cursor:
+        try:
+            cursor.execute(query_insert_user, params)
+        except IntegrityError as err:
+            raise_user_conflict(err)
+        return cursor.lastrowid, now
 
 
 # Obtener un usuario por su id
 @app.get("/users/{user_id}", response_model=UserResponse, tags=["users"])
 def get_user_by_id(user_id: int):
     query = """
-    SELECT id, username, email, full_name, gender, country, phone_number, birth_date, created_at, updated_at 
+    SELECT id, username, email, full_name, gender, country, phone_number, birth_date, created_at, updated_at, version 
     FROM users 
     WHERE id = %s
     """
@@ -286,91 +529,75 @@ def is_admin(user_id: int):
         return {"user_id": user_id, "is_admin": False}
 
 # Actualizar un usuario por su id
-@app.put("/users/{user_id}", response_model=UserResponse, tags=["users"])
-def update_user(user_id: int, user: UserUpdate):
-    # Primero obtenemos los datos actuales del usuario para asegurarnos de no sobrescribir campos no proporcionados
-    query_get_user = """
-    SELECT id, username, email, password, full_name, gender, country, phone_number, birth_date, created_at, updated_at
-    FROM users WHERE id = %s
-    """
-    current_user_data = execute_query(query_get_user, (user_id,))
-    
-    if not current_user_data:
-        raise HTTPException(status_code=404, detail=USER_NOT_FOUND)
-
-    current_user = current_user_data[0]
-
-    # Si la contraseña es proporcionada, se debe actualizar
+@app.put("/users/{user_id}", response_model=dict, tags=["users"])
+async def update_user(user_id: int, user: UserUpdate):
+    # Los campos no proporcionados (o vacíos) conservan su valor: el UPDATE solo incluye los demás
+    changes = {name: value for name, value in user.dict(exclude={"password"}).items() if value}
+    # Si la contraseña es proporcionada, se hashea antes de abrir la transacción
     if user.password:
-        # Hasheamos la nueva contraseña antes de guardarla
-        updated_password = pwd_context.hash(user.password)
-    else:
-        # Si no se proporciona contraseña, mantenemos la actual
-        updated_password = current_user['password']
-    
-    # Si no se proporciona un campo opcional, mantenemos el valor actual
-    updated_username = user.username if user.username else current_user['username']
-    updated_email = user.email if user.email else current_user['email']
-    updated_full_name = user.full_name if user.full_name else current_user['full_name']
-    updated_gender = user.gender if user.gender else current_user['gender']
-    updated_country = user.country if user.country else current_user['country']
-    updated_phone_number = user.phone_number if user.phone_number else current_user['phone_number']
-    updated_birth_date = user.birth_date if user.birth_date else current_user['birth_date']
-
-    # Realizamos la actualización de los datos del usuario
-    query = """
-    UPDATE users SET 
-        username = %s, 
-        email = %s, 
-        password = %s, 
-        full_name = %s, 
-        gender = %s, 
-        country = %s, 
-        phone_number = %s, 
-        birth_date = %s
-    WHERE id = %s
-    """
-    params = (
-        updated_username, 
-        updated_email, 
-        updated_password, 
-        updated_full_name, 
-        updated_gender, 
-        updated_country, 
-        updated_phone_number, 
-        updated_birth_date,
-        user_id
-    )
-
-    rows_affected = execute_non_query(query, params)
-
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="User not found or not updated")
-    
-    # Obtener los datos actualizados, incluyendo los campos 'created_at' y 'updated_at'
-    query_get_updated_user = """
-    SELECT id, username, email, full_name, gender, country, phone_number, birth_date, created_at, updated_at
-    FROM users WHERE id = %s
-    """
-    updated_user_data = execute_query(query_get_updated_user, (user_id,))
-    
-    return UserResponse(**updated_user_data[0])
+        changes["password"] = await password_hasher.hash(user.password)
+    changes["updated_at"] = datetime.now().replace(microsecond=0)
+    version = await run_in_threadpool(save_user_patch, user_id, changes, None)
+    if "password" in changes:
+        # Con la contraseña cambiada, las sesiones emitidas antes dejan de ser válidas
+        await run_in_threadpool(revocations.revoke_user, user_id)
+
+    # Como en PATCH, se devuelven el id, la nueva versión y los campos escritos (nunca la contraseña)
+    changes.pop("password", None)
+    return projected_item_response(UserResponse, {"id": user_id, **changes, "version": version})
+
+# Actualizar parcialmente un usuario (solo los campos enviados, sin leerlo antes)
+@app.patch("/users/{user_id}", response_model=dict, tags=["users"])
+async def patch_user(user_id: int, user: UserPatch):
+    changes = user.dict(exclude_unset=True)
+    expected_version = changes.pop("version", None)
+    reject_nulls(changes, ("username", "email", "full_name", "password"))
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    # La contraseña solo se hashea si se envía
+    if "password" in changes:
+        changes["password"] = await password_hasher.hash(changes["password"])
+    changes["updated_at"] = datetime.now().replace(microsecond=0)
+    version = await run_in_threadpool(save_user_patch, user_id, changes, expected_version)
+    if "password" in changes:
+        # Con la contraseña cambiada, las sesiones emitidas antes dejan de ser válidas
+        await run_in_threadpool(revocations.revoke_user, user_id)
+
+    # Se devuelven el id, la nueva versión y los campos modificados (nunca la contraseña)
+    changes.pop("password", None)
+    return projected_item_response(UserResponse, {"id": user_id, **changes, "version": version})
+
+def save_user_patch(user_id: int, changes: dict, expected_version: Optional[int]):
+    with transaction() as cursor:
+        try:
+            return apply_patch(cursor, "users", user_id, changes, expected_version, USER_NOT_FOUND)
+        except IntegrityError as err:
+            raise_user_conflict(err)
 
 # Eliminar un usuario por su id
 @app.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["users"])
 def delete_user(user_id: int):
-    query = "DELETE FROM users WHERE id = %s"
-    rows_affected = execute_non_query(query, (user_id,))
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail=USER_NOT_FOUND)
+    with transaction() as cursor:
+        # Las inscripciones del usuario se borran en cascada: se descuentan antes de los contadores de cada evento
+        discount_user_registrations(cursor, user_id)
+        discount_user_feedbacks(cursor, user_id)
+        cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail=USER_NOT_FOUND)
+    # Los tokens ya emitidos para el usuario dejan de ser válidos
+    revocations.revoke_user(user_id)
 
 # Login de un usuario
 @app.post("/users/login", tags=["users"])
-def login(user: UserLogin):
+async def login(user: UserLogin):
     # Consulta para verificar si el usuario existe y obtener la contraseña almacenada
-    query = "SELECT id, full_name ,password FROM users WHERE username = %s"
+    # La claim de administrador del token se obtiene en la misma consulta
+    query = """
+    SELECT id, full_name, password, EXISTS(SELECT 1 FROM admin_users WHERE admin_users.user_id = users.id) AS is_admin
+    FROM users WHERE username = %s
+    """
     params = (user.username,)
-    result = execute_query(query, params)
+    result = await execute_query_async(query, params)
 
     if not result:
         # Si el usuario no se encuentra, devuelve un error 404
@@ -378,20 +605,47 @@ def login(user: UserLogin):
 
     user_id, full_name, stored_password = result[0]["id"], result[0]["full_name"], result[0]["password"]
 
-    # Verificación de la contraseña ingresada contra la almacenada
-    if not pwd_context.verify(user.password, stored_password):
+    # Verificación de la contraseña ingresada contra la almacenada (en el pool de bcrypt)
+    valid, new_hash = await password_hasher.verify_and_update(user.password, stored_password)
+    if not valid:
         # Si la contraseña no coincide, devuelve un error 401
         raise HTTPException(status_code=401, detail="Contraseña incorrecta")
+    if new_hash:
+        # El hash usa un coste de bcrypt distinto del configurado: se sustituye de forma transparente
+        await run_in_threadpool(rehash_password, user_id, stored_password, new_hash)
 
-    # Retorna un mensaje de éxito, el ID del usuario y su nombre
-    return {"message": "Inicio de sesión exitoso", "user_id": user_id, "full_name": full_name}
+    # Token firmado con la identidad del usuario: las páginas no necesitan volver a consultarla
+    is_admin = bool(result[0]["is_admin"])
+    token, claims = issue_token(user_id, full_name, is_admin)
+
+    # Retorna un mensaje de éxito, el ID del usuario, su nombre y el token de sesión
+    return {"message": "Inicio de sesión exitoso", "user_id": user_id, "full_name": full_name, "is_admin": is_admin,
+            "token": token, "expires_at": claims["exp"]}
+
+def session_response(claims: dict):
+    return {"user_id": claims["sub"], "full_name": claims["name"], "is_admin": claims["adm"], "expires_at": claims["exp"]}
+
+# Identidad de la sesión actual, validada sin consultar la base de datos
+@app.get("/session", response_model=dict, tags=["users"])
+def get_session(claims: dict = Depends(current_session)):
+    return session_response(claims)
+
+# Igual que /session, pero responde 403 si la sesión no es de un administrador
+@app.get("/session/admin", response_model=dict, tags=["users"])
+def get_admin_session(claims: dict = Depends(admin_session)):
+    return session_response(claims)
+
+# Cerrar sesión: el token queda revocado hasta su caducidad
+@app.post("/session/logout", status_code=status.HTTP_204_NO_CONTENT, tags=["users"])
+def logout(claims: dict = Depends(current_session)):
+    revocations.revoke_token(claims["jti"], claims["exp"], claims["sub"])
 
 # Endpoint para validar la contraseña del usuario
 @app.post("/users/validate-password/{user_id}", status_code=status.HTTP_200_OK, tags=["users"])
-def validate_password(user_id: int, password: PasswordValidation):
+async def validate_password(user_id: int, password: PasswordValidation):
     # Obtener la contraseña almacenada del usuario por su ID
     query = "SELECT password FROM users WHERE id = %s"
-    user_data = execute_query(query, (user_id,))
+    user_data = await execute_query_async(query, (user_id,))
 
     if not user_data:
         raise HTTPException(status_code=404, detail=USER_NOT_FOUND)
@@ -399,19 +653,39 @@ def validate_password(user_id: int, password: PasswordValidation):
     stored_password_hash = user_data[0]['password']
     
     # Verificar si la contraseña ingresada coincide con el hash almacenado
-    if pwd_context.verify(password.password, stored_password_hash):
+    valid, new_hash = await password_hasher.verify_and_update(password.password, stored_password_hash)
+    if valid:
+        if new_hash:
+            await run_in_threadpool(rehash_password, user_id, stored_password_hash, new_hash)
         return {"message": "Password is valid"}
     else:
         raise HTTPException(status_code=400, detail="Incorrect password")
 
-# Obtener eventos registrados por un usuario
-@app.get("/users/{user_id}/registration-events", response_model=List[dict], tags=["users"])
-def get_registration_events_by_user(user_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1)):
+def rehash_password(user_id: int, old_hash: str, new_hash: str):
+    """Guarda el hash recalculado solo si la contraseña no cambió entretanto (no altera la versión del usuario)."""
+    execute_non_query("UPDATE users SET password = %s WHERE id = %s AND password = %s", (new_hash, user_id, old_hash))
 
-    if limit is not None:
+# Obtener eventos registrados por un usuario
+@app.get("/users/{user_id}/registration-events", response_model=List[UserRegistrationEventResponse], tags=["users"])
+def get_registration_events_by_user(response: Response, user_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names = parse_fields(fields, UserRegistrationEventResponse, required=("registration_id",))
+    columns = select_list(field_names or tuple(UserRegistrationEventResponse.model_fields), "events", REGISTRATION_EVENT_COLUMNS)
+
+    if after is not None:
+        keyset, keyset_params = keyset_predicate(("registrations.id",), decode_cursor(after, (int,)), descending=True)
+        query = f"""
+        SELECT {columns}
+        FROM registrations
+        JOIN events ON registrations.event_id = events.id
+        WHERE registrations.user_id = %s AND {keyset}
+        ORDER BY registrations.id DESC
+        LIMIT %s
+        """
+        events = execute_query(query, (user_id, *keyset_params, limit))
+    elif limit is not None:
         skip = (page - 1) * limit
-        query = """
-        SELECT events.id AS event_id, events.name, events.description, events.location, events.date as event_date, events.max_capacity, events.price, events.organizer_id, registrations.id AS registration_id, registrations.date AS registration_date, registrations.status
+        query = f"""
+        SELECT {columns}
         FROM registrations
         JOIN events ON registrations.event_id = events.id
         WHERE registrations.user_id = %s
@@ -420,8 +694,8 @@ def get_registration_events_by_user(user_id: int, page: Optional[int] = Query(1,
         """
         events = execute_query(query, (user_id, limit, skip))
     else:
-        query = """
-        SELECT events.id AS event_id, events.name, events.description, events.location, events.date as event_date, events.max_capacity, events.price, events.organizer_id, registrations.id AS registration_id, registrations.date AS registration_date, registrations.status
+        query = f"""
+        SELECT {columns}
         FROM registrations
         JOIN events ON registrations.event_id = events.id
         WHERE registrations.user_id = %s
@@ -430,7 +704,10 @@ def get_registration_events_by_user(user_id: int, page: Optional[int] = Query(1,
         events = execute_query(query, (user_id,))
     if not events:
         raise HTTPException(status_code=404, detail="No events found for this user")
-    return events
+    set_next_cursor(response, events, ("registration_id",), limit)
+    if field_names is not None:
+        return projected_response(response, projected_model(UserRegistrationEventResponse, field_names), events)
+    return [UserRegistrationEventResponse(**event) for event in events]
 
 # Obtener el conteo de eventos registrados por un usuario
 @app.get("/users/{user_id}/registrations-count", response_model=dict, tags=["users"])
@@ -444,254 +721,488 @@ def get_registration_count_by_user(user_id: int):
 # Endpoints para manejo de Eventos
 # Obtener todos los eventos
 @app.get("/events", response_model=List[EventResponse], tags=["events"])
-def get_events(page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1)):
-    
-    if limit is not None:
+async def get_events(request: Request, response: Response, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    # Validadores del listado: número de eventos y última modificación (sobre tablas de resumen e índices)
+    marker_query = """
+    SELECT (SELECT IFNULL(SUM(event_count), 0) FROM event_counts_by_country) AS total,
+           (SELECT MAX(updated_at) FROM events) AS last_modified,
+           (SELECT MAX(updated_at) FROM categories) AS categories_modified,
+           (SELECT COUNT(*) FROM categories) AS categories_total
+    """
+    marker = (await execute_query_async(marker_query))[0]
+    not_modified = conditional_response(request, response, make_etag("events", int(marker["total"]), marker["last_modified"], marker["categories_modified"], marker["categories_total"], page, limit, after, include, fields), marker["last_modified"], CACHE_CONTROL_EVENTS)
+    if not_modified:
+        return not_modified
+
+    field_names, columns = event_projection(fields, ("date", "id"))
+    if after is not None:
+        keyset, keyset_params = keyset_predicate(("date", "id"), decode_cursor(after, (datetime, int)))
+        query = f"""
+        SELECT {columns} FROM events
+        WHERE {keyset}
+        ORDER BY date, id
+        LIMIT %s
+        """
+        events = await execute_query_async(query, (*keyset_params, limit))
+    elif limit is not None:
         skip = (page - 1) * limit
-        query = """
-        SELECT * FROM events
+        query = f"""
+        SELECT {columns} FROM events
+        ORDER BY date, id
         LIMIT %s OFFSET %s
         """
-        events = execute_query(query, (limit, skip))
+        events = await execute_query_async(query, (limit, skip))
     else:
-        query = """
-        SELECT * FROM events
+        query = f"""
+        SELECT {columns} FROM events
+        ORDER BY date, id
         """
-        events = execute_query(query)
+        events = await execute_query_async(query)
     
-    return [EventResponse(**event) for event in events]
+    set_next_cursor(response, events, ("date", "id"), limit)
+    return await event_responses_async(response, events, include, field_names)
 
 # Obtener los eventos más recientes (ordenados por ID en orden descendente)
 @app.get("/events-desc", response_model=List[EventResponse], tags=["events"])
-def get_events_desc(page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1)):
+def get_events_desc(response: Response, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names, columns = event_projection(fields, ("id",))
     skip = (page - 1) * limit
 
-    if limit is not None:
-        query = """
-        SELECT * FROM events
+    if after is not None:
+        keyset, keyset_params = keyset_predicate(("id",), decode_cursor(after, (int,)), descending=True)
+        query = f"""
+        SELECT {columns} FROM events
+        WHERE {keyset}
+        ORDER BY id DESC
+        LIMIT %s
+        """
+        events = execute_query(query, (*keyset_params, limit))
+    elif limit is not None:
+        query = f"""
+        SELECT {columns} FROM events
         ORDER BY id DESC
         LIMIT %s OFFSET %s
         """
         events = execute_query(query, (limit, skip))
     else:
-        query = """
-        SELECT * FROM events
+        query = f"""
+        SELECT {columns} FROM events
         ORDER BY id DESC
         """
         events = execute_query(query)
     
-    return [EventResponse(**event) for event in events]
+    set_next_cursor(response, events, ("id",), limit)
+    return event_responses(response, events, include, field_names)
+
+# Obtener los eventos entre dos fechas (ambas incluidas)
+@app.get("/events/date-range", response_model=List[EventResponse], tags=["events"])
+def get_events_by_date_range(response: Response, date_from: date = Query(..., alias="from"), date_to: date = Query(..., alias="to"), limit: int = Query(12, ge=1, le=500), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names, columns = event_projection(fields, ("date", "id"))
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must be on or after 'from'")
+    range_start = datetime.combine(date_from, datetime.min.time())
+    range_end = datetime.combine(date_to, DAY_LAST_SECOND)
+
+    if after is not None:
+        keyset, keyset_params = keyset_predicate(("date", "id"), decode_cursor(after, (datetime, int)))
+        query = f"SELECT {columns} FROM events WHERE date >= %s AND date <= %s AND {keyset} ORDER BY date, id LIMIT %s"
+        events = execute_query(query, (range_start, range_end, *keyset_params, limit))
+    else:
+        query = f"SELECT {columns} FROM events WHERE date >= %s AND date <= %s ORDER BY date, id LIMIT %s"
+        events = execute_query(query, (range_start, range_end, limit))
+
+    set_next_cursor(response, events, ("date", "id"), limit)
+    return event_responses(response, events, include, field_names)
 
 # Crear un nuevo evento
 @app.post("/events", response_model=EventResponse, status_code=status.HTTP_201_CREATED, tags=["events"])
 def create_event(event: Event):
-    # Verificar si el evento existe
-    query_check_event = "SELECT id FROM events WHERE name = %s AND description = %s"
-    existing_event = execute_query(query_check_event, (event.name, event.description))
-
-    if existing_event:
-        raise HTTPException(status_code=400, detail="Event already exists")
-
+    # El índice único (nombre, descripción) rechaza los eventos repetidos en el propio INSERT
     query = """
     INSERT INTO events (name, description, location, city, country, date, max_capacity, price, organizer_id)
     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
     params = (event.name, event.description, event.location, event.city, event.country, event.date, event.max_capacity, event.price, event.organizer_id)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=400, detail="Event not created")
+    with transaction() as cursor:
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            raise_event_conflict(err)
+        event_id = cursor.lastrowid
+        apply_event_delta(cursor, event.dict(), 1)
     
-    # Obtener el nuevo evento por su nombre y descripción
-    query_get_event = "SELECT * FROM events WHERE name = %s AND description = %s"
-    event_data = execute_query(query_get_event, (event.name, event.description))
-    return EventResponse(**event_data[0])
+    return EventResponse(id=event_id, **event.dict(), version=1)
 
 
+# Crear eventos por lotes (importaciones)
+@app.post("/events/bulk", response_model=BulkWriteResponse, tags=["events"])
+def create_events_bulk(events: List[Event]):
+    check_bulk_size(events)
+    return bulk_response(bulk_create_events([event.dict() for event in events]))
+
 # Obtener un evento por su id
 @app.get("/events/{event_id}", response_model=EventResponse, tags=["events"])
-def get_event_by_id(event_id: int):
+async def get_event_by_id(request: Request, response: Response, event_id: int):
+    # Los validadores salen de la misma fila cacheada (updated_at y version), nunca de otra lectura
     query = "SELECT * FROM events WHERE id = %s"
-    event = execute_query(query, (event_id,))
+    event = await reference_cache.get_or_load_async(("event", event_id), lambda: execute_query_async(query, (event_id,)))
     if not event:
         raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
-    
-    return EventResponse(**event[0])
+    event = event[0]
+    not_modified = conditional_response(request, response, make_etag("event", event_id, event["updated_at"], event["version"]), event["updated_at"], CACHE_CONTROL_EVENTS)
+    if not_modified:
+        return not_modified
+    return EventResponse(**event)
 
 # Actualizar un evento por su id
 @app.put("/events/{event_id}", response_model=EventResponse, tags=["events"])
 def update_event(event_id: int, event: Event):
-    query = "UPDATE events SET name = %s, description = %s, location = %s, date = %s, max_capacity = %s, price = %s, organizer_id = %s WHERE id = %s"
+    query = "UPDATE events SET name = %s, description = %s, location = %s, date = %s, max_capacity = %s, price = %s, organizer_id = %s, version = version + 1 WHERE id = %s"
     params = (event.name, event.description, event.location, event.date, event.max_capacity, event.price, event.organizer_id, event_id)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="Event not found or not updated")
-    
-    # Obtener los datos actualizados del evento
-    query_get_updated_event = "SELECT * FROM events WHERE id = %s"
-    updated_event_data = execute_query(query_get_updated_event, (event_id,))
+    with transaction() as cursor:
+        # Se bloquea la fila para mover el evento de faceta con sus valores anteriores
+        cursor.execute("SELECT city, country, organizer_id, date, version FROM events WHERE id = %s FOR UPDATE", (event_id,))
+        old_event = cursor.fetchone()
+        if old_event is None:
+            raise HTTPException(status_code=404, detail="Event not found or not updated")
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            raise_event_conflict(err)
+        apply_event_change(cursor, old_event, {"country": old_event["country"], "organizer_id": event.organizer_id, "date": event.date})
+    reference_cache.invalidate(("event", event_id))
     
-    return EventResponse(**updated_event_data[0])
+    # La actualización no modifica la ciudad ni el país: se devuelven los valores almacenados
+    return EventResponse(id=event_id, **event.dict(exclude={"city", "country"}), city=old_event["city"], country=old_event["country"],
+                         version=old_event["version"] + 1)
+
+# Actualizar parcialmente un evento (solo los campos enviados)
+@app.patch("/events/{event_id}", response_model=dict, tags=["events"])
+def patch_event(event_id: int, event: EventPatch):
+    changes = event.dict(exclude_unset=True)
+    expected_version = changes.pop("version", None)
+    reject_nulls(changes, tuple(name for name in changes if name != "organizer_id"))
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    with transaction() as cursor:
+        old_event = None
+        if changes.keys() & {"country", "organizer_id", "date"}:
+            # Mover el evento de faceta requiere sus valores anteriores: solo entonces se lee (y bloquea) la fila
+            cursor.execute("SELECT country, organizer_id, date FROM events WHERE id = %s FOR UPDATE", (event_id,))
+            old_event = cursor.fetchone()
+            if old_event is None:
+                raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
+        try:
+            version = apply_patch(cursor, "events", event_id, changes, expected_version, EVENT_NOT_FOUND)
+        except IntegrityError as err:
+            raise_event_conflict(err)
+        if old_event is not None:
+            apply_event_change(cursor, old_event, {**old_event, **changes})
+    reference_cache.invalidate(("event", event_id))
+
+    return projected_item_response(EventResponse, {"id": event_id, **changes, "version": version})
 
 # Eliminar un evento por su id
 @app.delete("/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["events"])
 def delete_event(event_id: int):
-    query = "DELETE FROM events WHERE id = %s"
-    rows_affected = execute_non_query(query, (event_id,))
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
+    with transaction() as cursor:
+        cursor.execute("SELECT country, organizer_id, date FROM events WHERE id = %s FOR UPDATE", (event_id,))
+        event = cursor.fetchone()
+        if event is None:
+            raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
+        # Los vínculos con categorías se borran en cascada: se descuentan antes de sus conteos
+        discount_event_categories(cursor, event_id)
+        apply_event_delta(cursor, event, -1)
+        cursor.execute("DELETE FROM events WHERE id = %s", (event_id,))
+    reference_cache.invalidate(("event", event_id), ("event_categories", event_id))
 
 # Obtener las inscripciones de un evento
 @app.get("/events/{event_id}/registrations", response_model=dict, tags=["events"])
-def get_event_registrations(event_id: int):
-    query_registrations = """
-    SELECT registrations.id, registrations.user_id, registrations.event_id, registrations.status, users.username, users.email, users.full_name
-    FROM registrations
-    JOIN users ON registrations.user_id = users.id
-    WHERE registrations.event_id = %s AND registrations.status = 'registered'
+def get_event_registrations(event_id: int, include_registrations: bool = Query(True, description="Incluir el listado de inscritos (si es False solo se devuelven los contadores)")):
+    query_event = """
+    SELECT events.max_capacity, IFNULL(event_registration_stats.registered_count, 0) AS registrations_count
+    FROM events
+    LEFT JOIN event_registration_stats ON event_registration_stats.event_id = events.id
+    WHERE events.id = %s
     """
-    registrations = execute_query(query_registrations, (event_id,))
-    
-    query_event = "SELECT max_capacity FROM events WHERE id = %s"
     event = execute_query(query_event, (event_id,))
     if not event:
         raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
     
-    max_capacity = event[0]['max_capacity']
-    available_slots = max_capacity - len(registrations) if registrations else max_capacity
+    registrations = []
+    if include_registrations:
+        query_registrations = """
+        SELECT registrations.id, registrations.user_id, registrations.event_id, registrations.status, users.username, users.email, users.full_name
+        FROM registrations
+        JOIN users ON registrations.user_id = users.id
+        WHERE registrations.event_id = %s AND registrations.status = 'registered'
+        """
+        registrations = execute_query(query_registrations, (event_id,))
+    
+    registrations_count = event[0]['registrations_count']
     
     return {
         "event_id": event_id,
-        "registrations_count": len(registrations),
-        "available_slots": available_slots,
+        "registrations_count": registrations_count,
+        "available_slots": max(event[0]['max_capacity'] - registrations_count, 0),
         "registrations": registrations
     }
 
+# Obtener la disponibilidad de plazas de un evento (desde los contadores, sin leer inscripciones)
+@app.get("/events/{event_id}/availability", response_model=dict, tags=["events"])
+def get_event_availability(event_id: int):
+    query = """
+    SELECT events.max_capacity,
+        IFNULL(event_registration_stats.registered_count, 0) AS registrations_count,
+        IFNULL(event_registration_stats.canceled_count, 0) AS canceled_count
+    FROM events
+    LEFT JOIN event_registration_stats ON event_registration_stats.event_id = events.id
+    WHERE events.id = %s
+    """
+    event = execute_query(query, (event_id,))
+    if not event:
+        raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
+    
+    return {
+        "event_id": event_id,
+        "max_capacity": event[0]["max_capacity"],
+        "registrations_count": event[0]["registrations_count"],
+        "canceled_count": event[0]["canceled_count"],
+        "available_slots": max(event[0]["max_capacity"] - event[0]["registrations_count"], 0)
+    }
+
+# Obtener en una sola petición todo lo que muestra la página de detalle de un evento
+@app.get("/events/{event_id}/detail", response_model=EventDetailResponse, tags=["events"])
+def get_event_detail(event_id: int, user_id: Optional[int] = Query(None, description="Usuario cuyo estado de inscripción se incluye")):
+    # Evento, organizador, contadores e inscripción del usuario en una fila; las categorías en una
+    # segunda consulta. Ambas sobre la misma conexión y la misma instantánea de lectura.
+    query_event = """
+    SELECT events.*,
+        organizers.name AS organizer_name, organizers.email AS organizer_email, organizers.phone AS organizer_phone,
+        IFNULL(event_registration_stats.registered_count, 0) AS registrations_count,
+        IFNULL(event_registration_stats.canceled_count, 0) AS canceled_count,
+        registrations.date AS registration_date, registrations.status AS registration_status
+    FROM events
+    LEFT JOIN organizers ON organizers.id = events.organizer_id
+    LEFT JOIN event_registration_stats ON event_registration_stats.event_id = events.id
+    LEFT JOIN registrations ON registrations.event_id = events.id AND registrations.user_id = %s AND registrations.status = 'registered'
+    WHERE events.id = %s
+    LIMIT 1
+    """
+    query_categories = """
+    SELECT categories.id, categories.name
+    FROM event_categories
+    JOIN categories ON event_categories.category_id = categories.id
+    WHERE event_categories.event_id = %s
+    """
+    with transaction() as cursor:
+        cursor.execute(query_event, (user_id, event_id))
+        row = cursor.fetchone()
+        if row is None:
+            raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
+        cursor.execute(query_categories, (event_id,))
+        categories = cursor.fetchall()
+
+    organizer = None
+    if row["organizer_name"] is not None:
+        organizer = OrganizerResponse(id=row["organizer_id"], name=row["organizer_name"], email=row["organizer_email"], phone=row["organizer_phone"])
+    registration = None
+    if row["registration_status"] is not None:
+        registration = RegistrationResponse(user_id=user_id, event_id=event_id, date=row["registration_date"], status=row["registration_status"])
+
+    return EventDetailResponse(
+        event=EventResponse(**row),
+        organizer=organizer,
+        categories=[CategoryResponse(**category) for category in categories],
+        availability=EventAvailabilityResponse(
+            max_capacity=row["max_capacity"],
+            registrations_count=row["registrations_count"],
+            canceled_count=row["canceled_count"],
+            available_slots=max(row["max_capacity"] - row["registrations_count"], 0)
+        ),
+        registration=registration
+    )
+
 #Obtener los feedbacks de un evento
 @app.get("/events/{event_id}/feedbacks", response_model=List[FeedbackResponse], tags=["events"])
-def get_event_feedbacks(event_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(20, ge=1)):
-    
-    if limit is not None:
+async def get_event_feedbacks(request: Request, response: Response, event_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(20, ge=1), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names = parse_fields(fields, FeedbackResponse, required=("id", "timestamp"))
+    # Las escrituras en feedbacks actualizan event_feedback_stats: su fila, junto con la última
+    # modificación de los autores de la página, hace de versión de la respuesta
+    marker_query = """
+    SELECT event_feedback_stats.comment_count, event_feedback_stats.updated_at,
+        (SELECT MAX(users.updated_at) FROM feedbacks JOIN users ON users.id = feedbacks.user_id WHERE feedbacks.event_id = %s) AS authors_modified
+    FROM event_feedback_stats
+    WHERE event_feedback_stats.event_id = %s
+    """
+    marker = await execute_query_async(marker_query, (event_id, event_id))
+    if marker and marker[0]["comment_count"] > 0:
+        marker = marker[0]
+        last_modified = max(marker["updated_at"], marker["authors_modified"] or marker["updated_at"])
+        not_modified = conditional_response(request, response, make_etag("feedbacks", event_id, marker["comment_count"], marker["updated_at"], marker["authors_modified"], page, limit, after, fields), last_modified, CACHE_CONTROL_REVALIDATE)
+        if not_modified:
+            return not_modified
+
+    # Los datos públicos del autor se obtienen en la misma consulta (sin una petición por comentario)
+    with_author = field_names is None or "author" in field_names
+    columns = [name for name in field_names or FEEDBACK_COLUMNS if name != "author"]
+    if with_author and "user_id" not in columns:
+        columns.append("user_id")
+    select_feedbacks = f"SELECT {select_list(columns, 'feedbacks')} FROM feedbacks"
+    if with_author:
+        select_feedbacks = f"""
+        SELECT {select_list(columns, 'feedbacks')}, users.username AS author_username, users.full_name AS author_full_name, users.country AS author_country
+        FROM feedbacks
+        LEFT JOIN users ON users.id = feedbacks.user_id
+        """
+    if after is not None:
+        keyset, keyset_params = keyset_predicate(("feedbacks.timestamp", "feedbacks.id"), decode_cursor(after, (datetime, int)), descending=True)
+        query = select_feedbacks + f"""
+        WHERE feedbacks.event_id = %s AND {keyset}
+        ORDER BY feedbacks.timestamp DESC, feedbacks.id DESC
+        LIMIT %s
+        """
+        feedbacks = await execute_query_async(query, (event_id, *keyset_params, limit))
+    elif limit is not None:
         skip = (page - 1) * limit
-        query = """
-        SELECT * 
-        FROM feedbacks 
-        WHERE event_id = %s
-        ORDER BY timestamp DESC
+        query = select_feedbacks + """
+        WHERE feedbacks.event_id = %s
+        ORDER BY feedbacks.timestamp DESC, feedbacks.id DESC
         LIMIT %s OFFSET %s
         """
-        feedbacks = execute_query(query, (event_id, limit, skip))
+        feedbacks = await execute_query_async(query, (event_id, limit, skip))
     else:
-        query = """
-        SELECT * 
-        FROM feedbacks 
-        WHERE event_id = %s
-        ORDER BY timestamp DESC
+        query = select_feedbacks + """
+        WHERE feedbacks.event_id = %s
+        ORDER BY feedbacks.timestamp DESC, feedbacks.id DESC
         """
-        feedbacks = execute_query(query, (event_id,))
+        feedbacks = await execute_query_async(query, (event_id,))
     if not feedbacks:
         raise HTTPException(status_code=404, detail="No feedbacks found for this event")
-    return feedbacks
+    set_next_cursor(response, feedbacks, ("timestamp", "id"), limit)
+    if field_names is None:
+        return [feedback_with_author(feedback) for feedback in feedbacks]
+    if with_author:
+        feedbacks = [{**feedback, "author": feedback_author(feedback)} for feedback in feedbacks]
+    return projected_response(response, projected_model(FeedbackResponse, field_names), feedbacks)
 
 # Obtener los próximos eventos con plazas disponibles
 @app.get("/upcoming-events", response_model=List[EventResponse], tags=["events"])
-def get_upcoming_events(limit: int = Query(10, ge=1), skip: int = Query(0, ge=0)):
-    query = """
-    SELECT e.* 
+async def get_upcoming_events(response: Response, limit: int = Query(10, ge=1), skip: int = Query(0, ge=0), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names, columns = event_projection(fields, (), table="e")
+    query = f"""
+    SELECT {columns}
     FROM events e
-    LEFT JOIN (
-        SELECT event_id, COUNT(*) as registrations_count
-        FROM registrations
-        GROUP BY event_id
-    ) r ON e.id = r.event_id
-    WHERE e.date >= NOW() AND (e.max_capacity > IFNULL(r.registrations_count, 0))
+    LEFT JOIN event_registration_stats s ON e.id = s.event_id
+    WHERE e.date >= NOW() AND (e.max_capacity > IFNULL(s.registered_count, 0))
     ORDER BY e.date ASC
     LIMIT %s OFFSET %s
     """
     
     # Ejecutar la consulta con los parámetros limit y skip
-    events = execute_query(query, (limit, skip))
+    events = await execute_query_async(query, (limit, skip))
     
     if not events:
         raise HTTPException(status_code=404, detail="No upcoming events with available slots found")
     
-    return [EventResponse(**event) for event in events]
+    return await event_responses_async(response, events, include, field_names)
 
 
 # Obtener el conteo total de eventos
 @app.get("/events-count", response_model=dict, tags=["events"])
 def get_event_count():
-    query = "SELECT COUNT(*) AS event_count FROM events"
+    query = "SELECT IFNULL(SUM(event_count), 0) AS event_count FROM event_counts_by_country"
     result = execute_query(query)
-    return {"event_count": result[0]["event_count"]}
+    return {"event_count": int(result[0]["event_count"])}
 
 # Obtener el conteo total de eventos un día específico
 @app.get("/events/count/by-date/{event_date}", response_model=dict, tags=["events"])
 def get_event_count_by_specific_day(event_date: str):
-    try:
-        date = datetime.strptime(event_date, "%Y-%m-%d").date()  # Solo conservamos la fecha, no la hora
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    day_start, day_end = parse_day_range(event_date)
     
-    query = "SELECT COUNT(*) AS event_count FROM events WHERE DATE(date) = %s"
-    result = execute_query(query, (date,))
-    return {"event_count": result[0]["event_count"]}
+    query = "SELECT event_count FROM event_counts_by_day WHERE event_day = %s"
+    result = execute_query(query, (day_start.date(),))
+    return {"event_count": result[0]["event_count"] if result else 0}
 
 # Obtener los eventos por fecha específica
 @app.get("/events/date/{event_date}", response_model=List[EventResponse], tags=["events"])
-def get_events_by_date(event_date: str, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(12, ge=1)):
-    try:
-        date = datetime.strptime(event_date, "%Y-%m-%d").date()  # Solo conservamos la fecha, no la hora
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+def get_events_by_date(response: Response, event_date: str, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(12, ge=1), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names, columns = event_projection(fields, ())
+    day_start, day_end = parse_day_range(event_date)
     
     if limit is not None:
         skip = (page - 1) * limit
-        query = "SELECT * FROM events WHERE DATE(date) = %s LIMIT %s OFFSET %s"
-        events = execute_query(query, (date, limit, skip))
+        query = f"SELECT {columns} FROM events WHERE date >= %s AND date <= %s ORDER BY date, id LIMIT %s OFFSET %s"
+        events = execute_query(query, (day_start, day_end, limit, skip))
     else:
-        query = "SELECT * FROM events WHERE DATE(date) = %s"
-        events = execute_query(query, (date,))
+        query = f"SELECT {columns} FROM events WHERE date >= %s AND date <= %s ORDER BY date, id"
+        events = execute_query(query, (day_start, day_end))
     
     if not events:
         raise HTTPException(status_code=404, detail="No events found for this date")
     
-    return [EventResponse(**event) for event in events]
+    return event_responses(response, events, include, field_names)
+
+# Obtener el conteo de eventos por día de un mes (calendario)
+@app.get("/events/calendar/{year}/{month}", response_model=List[dict], tags=["events"])
+def get_event_calendar(year: int, month: int):
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        raise HTTPException(status_code=400, detail="Invalid month. Use /events/calendar/YYYY/MM.")
+    # Primer y último día del mes (sin calcular el mes siguiente, que no existe para 9999-12)
+    month_start = date(year, month, 1)
+    month_last = date(year, month, calendar.monthrange(year, month)[1])
+
+    # Lectura por rango sobre la tabla de resumen por día: una fila por día con eventos
+    query = """
+    SELECT event_day AS event_date, event_count
+    FROM event_counts_by_day
+    WHERE event_day BETWEEN %s AND %s AND event_count > 0
+    ORDER BY event_day ASC
+    """
+    return execute_query(query, (month_start, month_last))
 
 # Obtener el conteo de eventos por fecha
 @app.get("/events/count/by-date", response_model=List[dict], tags=["events"])
 def get_event_count_by_date():
     query = """
-    SELECT DATE(date) AS event_date, COUNT(*) AS event_count
-    FROM events
-    GROUP BY event_date
-    ORDER BY event_date ASC
+    SELECT event_day AS event_date, event_count
+    FROM event_counts_by_day
+    WHERE event_count > 0
+    ORDER BY event_day ASC
     """
     results = execute_query(query)
     return results
 
 # Obtener eventos por país específico
 @app.get("/events/country/{country}", response_model=List[EventResponse], tags=["events"])
-def get_events_by_country(country: str, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1)):
-
-    if limit is not None:
+def get_events_by_country(response: Response, country: str, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names, columns = event_projection(fields, ("date", "id"))
+
+    if after is not None:
+        keyset, keyset_params = keyset_predicate(("date", "id"), decode_cursor(after, (datetime, int)))
+        query = f"SELECT {columns} FROM events WHERE country = %s AND {keyset} ORDER BY date, id LIMIT %s"
+        events = execute_query(query, (country, *keyset_params, limit))
+    elif limit is not None:
         skip = (page - 1) * limit
-        query = "SELECT * FROM events WHERE country = %s LIMIT %s OFFSET %s"
+        query = f"SELECT {columns} FROM events WHERE country = %s ORDER BY date, id LIMIT %s OFFSET %s"
         events = execute_query(query, (country, limit, skip))
     else:
-        query = "SELECT * FROM events WHERE country = %s"
+        query = f"SELECT {columns} FROM events WHERE country = %s ORDER BY date, id"
         events = execute_query(query, (country,))
 
     if not events:
         raise HTTPException(status_code=404, detail="No events found for this country")
-    return [EventResponse(**event) for event in events]
+    set_next_cursor(response, events, ("date", "id"), limit)
+    return event_responses(response, events, include, field_names)
 
 # Obtener el conteo de eventos por país
 @app.get("/events/count/by-country", response_model=List[dict], tags=["events"])
 def get_event_count_by_country():
     query = """
-    SELECT country, COUNT(*) AS event_count
-    FROM events
-    GROUP BY country
+    SELECT country, event_count
+    FROM event_counts_by_country
+    WHERE event_count > 0
     ORDER BY country ASC
     """
     results = execute_query(query)
@@ -700,35 +1211,41 @@ def get_event_count_by_country():
 # Obtener el conteo de eventos por país específico
 @app.get("/events/count/by-country/{country}", response_model=dict, tags=["events"])
 def get_event_count_by_specific_country(country: str):
-    query = "SELECT COUNT(*) AS event_count FROM events WHERE country = %s"
+    query = "SELECT event_count FROM event_counts_by_country WHERE country = %s"
     result = execute_query(query, (country,))
-    return {"country": country, "event_count": result[0]["event_count"]}
+    return {"country": country, "event_count": result[0]["event_count"] if result else 0}
 
 # Obtener los eventos por organizador de eventos
 @app.get("/events/organizer/{organizer_id}", response_model=List[EventResponse], tags=["events"])
-def get_events_by_organizer(organizer_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1)):
+def get_events_by_organizer(response: Response, organizer_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+        field_names, columns = event_projection(fields, ("date", "id"))
         
-        if limit is not None:
+        if after is not None:
+            keyset, keyset_params = keyset_predicate(("date", "id"), decode_cursor(after, (datetime, int)))
+            query = f"SELECT {columns} FROM events WHERE organizer_id = %s AND {keyset} ORDER BY date, id LIMIT %s"
+            events = execute_query(query, (organizer_id, *keyset_params, limit))
+        elif limit is not None:
             skip = (page - 1) * limit
-            query = "SELECT * FROM events WHERE organizer_id = %s LIMIT %s OFFSET %s"
+            query = f"SELECT {columns} FROM events WHERE organizer_id = %s ORDER BY date, id LIMIT %s OFFSET %s"
             events = execute_query(query, (organizer_id, limit, skip))
         else:
-            query = "SELECT * FROM events WHERE organizer_id = %s"
+            query = f"SELECT {columns} FROM events WHERE organizer_id = %s ORDER BY date, id"
             events = execute_query(query, (organizer_id,))
         
         if not events:
             raise HTTPException(status_code=404, detail="No events found for this organizer")
         
-        return [EventResponse(**event) for event in events]
+        set_next_cursor(response, events, ("date", "id"), limit)
+        return event_responses(response, events, include, field_names)
 
 # Obtener el conteo de eventos por organizador
 @app.get("/events/count/by-organizer", response_model=List[dict], tags=["events"])
 def get_event_count_by_organizer():
     query = """
-    SELECT organizers.id, organizers.name AS organizer_name, COUNT(events.id) AS event_count
-    FROM events
-    JOIN organizers ON events.organizer_id = organizers.id
-    GROUP BY organizers.id
+    SELECT organizers.id, organizers.name AS organizer_name, event_counts_by_organizer.event_count
+    FROM event_counts_by_organizer
+    JOIN organizers ON event_counts_by_organizer.organizer_id = organizers.id
+    WHERE event_counts_by_organizer.event_count > 0
     ORDER BY organizer_name ASC
     """
     results = execute_query(query)
@@ -737,57 +1254,62 @@ def get_event_count_by_organizer():
 # Obtener el conteo de eventos por organizador específico
 @app.get("/events/count/by-organizer/{organizer_id}", response_model=dict, tags=["events"])
 def get_event_count_by_specific_organizer(organizer_id: int):
-    query = "SELECT COUNT(*) AS event_count FROM events WHERE organizer_id = %s"
+    query = "SELECT event_count FROM event_counts_by_organizer WHERE organizer_id = %s"
     result = execute_query(query, (organizer_id,))
-    return {"organizer_id": organizer_id, "event_count": result[0]["event_count"]}
+    return {"organizer_id": organizer_id, "event_count": result[0]["event_count"] if result else 0}
 
 
 # Endpoints para manejo de Registros
 # Obtener todos los registros
 @app.get("/registrations", response_model=List[RegistrationResponse], tags=["registrations"])
-def get_registrations():
-    query = "SELECT * FROM registrations"
+def get_registrations(response: Response, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names = parse_fields(fields, RegistrationResponse)
+    query = f"SELECT {select_list(field_names or tuple(RegistrationResponse.model_fields))} FROM registrations"
     registrations = execute_query(query)
+    if field_names is not None:
+        return projected_response(response, projected_model(RegistrationResponse, field_names), registrations)
     return [RegistrationResponse(**registration) for registration in registrations]
 
 # Crear un nuevo registro
-@app.post("/registrations", response_model=RegistrationResponse, status_code=status.HTTP_201_CREATED, tags=["registrations"])
-def create_registration(registration: Registration):
-    current_date = datetime.now()
-    
-    # Verificar si el evento existe
-    query_event = "SELECT date FROM events WHERE id = %s"
-    event = execute_query(query_event, (registration.event_id,))
+@app.post("/registrations", response_model=RegistrationResponse, status_code=status.HTTP_201_CREATED, tags=["registrations"],
+          responses={202: {"model": RegistrationTicketResponse, "description": "Evento de alta demanda: inscripción encolada"}})
+async def create_registration(registration: Registration):
+    # Los eventos de alta demanda pasan por la cola de admisión: se devuelve un ticket y se confirma por lotes
+    batch_size = await hot_events.get_batch_size(registration.event_id)
+    if batch_size is not None:
+        ticket = admission_queue.enqueue(registration.event_id, registration.user_id, batch_size)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(ticket))
+
+    # Validación (fecha, duplicados, cancelaciones, capacidad) e inserción en una sola transacción
+    new_registration = await run_in_threadpool(register_user_for_event, registration.user_id, registration.event_id)
+    return RegistrationResponse(**new_registration)
+
+# Consultar el estado de un ticket de la cola de admisión
+@app.get("/registrations/tickets/{ticket_id}", response_model=RegistrationTicketResponse, tags=["registrations"])
+def get_registration_ticket(ticket_id: str):
+    ticket = admission_queue.get_ticket(ticket_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return RegistrationTicketResponse(**ticket)
+
+# Marcar un evento como de alta demanda (inscripciones por cola de admisión)
+@app.put("/events/{event_id}/hot", response_model=dict, tags=["registrations"])
+def mark_event_hot(event_id: int, batch_size: int = Query(ADMISSION_DEFAULT_BATCH_SIZE, ge=1, le=5000)):
+    event = execute_query("SELECT id FROM events WHERE id = %s", (event_id,))
     if not event:
         raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
-    
-    event_date = event[0]["date"]
-    if event_date < current_date:
-        raise HTTPException(status_code=400, detail="Cannot register for past events")
-    
-    # Verificar si ya existe un registro con el mismo evento_id y usuario_id en estado "registered"
-    query_check_registered = "SELECT COUNT(*) AS count FROM registrations WHERE user_id = %s AND event_id = %s AND status = 'registered'"
-    result_check_registered = execute_query(query_check_registered, (registration.user_id, registration.event_id))
-    
-    if result_check_registered[0]['count'] > 0:
-        raise HTTPException(status_code=400, detail="User is already registered for this event")
-    
-    # Verificar si ya ha cancelado el registro dos veces
-    query_check_canceled = "SELECT COUNT(*) AS count FROM registrations WHERE user_id = %s AND event_id = %s AND status = 'canceled'"
-    result_check_canceled = execute_query(query_check_canceled, (registration.user_id, registration.event_id))
-
-    if result_check_canceled[0]['count'] >= 2:
-        raise HTTPException(status_code=400, detail="Ha cancelado su inscripción para este evento dos veces y no puede registrarse nuevamente. Comuníquese con el servicio de asistencia para obtener ayuda.")
-    
-    # Realizar la inserción del registro de inscripción
-    query = "INSERT INTO registrations (user_id, event_id, status) VALUES (%s, %s, 'registered')"
-    params = (registration.user_id, registration.event_id)
-    rows_affected = execute_non_query(query, params)
-    
+    query = "INSERT INTO hot_events (event_id, batch_size) VALUES (%s, %s) ON DUPLICATE KEY UPDATE batch_size = VALUES(batch_size)"
+    execute_non_query(query, (event_id, batch_size))
+    hot_events.invalidate()
+    return {"event_id": event_id, "hot": True, "batch_size": batch_size}
+
+# Quitar la marca de alta demanda de un evento
+@app.delete("/events/{event_id}/hot", status_code=status.HTTP_204_NO_CONTENT, tags=["registrations"])
+def unmark_event_hot(event_id: int):
+    rows_affected = execute_non_query("DELETE FROM hot_events WHERE event_id = %s", (event_id,))
     if rows_affected == 0:
-        raise HTTPException(status_code=400, detail="Registration not created")
-    
-    return RegistrationResponse(user_id=registration.user_id, event_id=registration.event_id, status='registered', date=current_date)
+        raise HTTPException(status_code=404, detail="Event is not marked as hot")
+    hot_events.invalidate()
 
 # Obtener un registro por su id
 @app.get("/registrations/{registration_id}", response_model=RegistrationResponse, tags=["registrations"])
@@ -801,39 +1323,9 @@ def get_registration_by_id(registration_id: int):
 # Actualizar un registro
 @app.put("/registrations/{registration_id}", response_model=RegistrationResponse, tags=["registrations"])
 def update_registration(registration_id: int):
-    # Verifica el estado actual de la inscripción
-    query = "SELECT * FROM registrations WHERE id = %s"
-    current_registration = execute_query(query, (registration_id,))
-    if not current_registration:
-        raise HTTPException(status_code=404, detail=REGISTRATION_NOT_FOUND)
-    
-    current_registration = current_registration[0]
-    
-    # Verifica si el evento ya pasó
-    query_event = "SELECT date FROM events WHERE id = %s"
-    event = execute_query(query_event, (current_registration["event_id"],))
-    if not event:
-        raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
-    
-    event_date = event[0]["date"]
-    if event_date < datetime.now():
-        raise HTTPException(status_code=400, detail="Cannot update registration for past events")
-    
-    # Solo permite cambiar de "registered" a "canceled"
-    if current_registration["status"] != "registered":
-        raise HTTPException(status_code=400, detail="Only registered registrations can be canceled")
-
-    # Actualiza el estado a "canceled"
-    query = "UPDATE registrations SET status = %s WHERE id = %s"
-    params = ("canceled", registration_id)
-    rows_affected = execute_non_query(query, params)
-    
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="Registration not found or not updated")
-
-    # Retorna la inscripción actualizada
-    current_registration["status"] = "canceled"
-    return RegistrationResponse(**current_registration)
+    # Cancela la inscripción y actualiza los contadores del evento en una sola transacción
+    canceled_registration = cancel_registration(registration_id)
+    return RegistrationResponse(**canceled_registration)
 
 # Verificar el registro de un usuario para un evento específico
 @app.get("/registrations/check/{user_id}/{event_id}", response_model=RegistrationResponse, tags=["registrations"])
@@ -847,16 +1339,18 @@ def check_registration(user_id: int, event_id: int):
 # Eliminar un registro por su id
 @app.delete("/registrations/{registration_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["registrations"])
 def delete_registration(registration_id: int):
-    query = "DELETE FROM registrations WHERE id = %s"
-    rows_affected = execute_non_query(query, (registration_id,))
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail=REGISTRATION_NOT_FOUND)
+    delete_registration_record(registration_id)
     
     
 # Endpoints para manejo de Organizadores
 # Obtener todos los organizadores
 @app.get("/organizers", response_model=List[OrganizerResponse], tags=["organizers"])
-def get_organizers():
+def get_organizers(request: Request, response: Response):
+    marker = execute_query("SELECT COUNT(*) AS total, MAX(updated_at) AS last_modified FROM organizers")[0]
+    not_modified = conditional_response(request, response, make_etag("organizers", marker["total"], marker["last_modified"]), marker["last_modified"], CACHE_CONTROL_REFERENCE)
+    if not_modified:
+        return not_modified
+
     query = "SELECT * FROM organizers"
     organizers = execute_query(query)
     return [OrganizerResponse(**organizer) for organizer in organizers]
@@ -864,108 +1358,132 @@ def get_organizers():
 # Crear un nuevo organizador
 @app.post("/organizers", response_model=OrganizerResponse, status_code=status.HTTP_201_CREATED, tags=["organizers"])
 def create_organizer(organizer: Organizer):
-    # Verificar si el organizador ya existe
-    query_check_organizer = "SELECT id FROM organizers WHERE name = %s AND email = %s"
-    existing_organizer = execute_query(query_check_organizer, (organizer.name, organizer.email))
-
-    if existing_organizer:
-        raise HTTPException(status_code=400, detail="Organizer already exists")
-
+    # El índice único de email rechaza los organizadores repetidos en el propio INSERT
     query = "INSERT INTO organizers (name, email, phone) VALUES (%s, %s, %s)"
     params = (organizer.name, organizer.email, organizer.phone)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=400, detail="Organizer not created")
-    
-    # Obtener el nuevo organizador por su nombre y correo
-    query_get_organizer = "SELECT * FROM organizers WHERE name = %s AND email = %s"
-    organizer_data = execute_query(query_get_organizer, (organizer.name, organizer.email))
-    return OrganizerResponse(**organizer_data[0])
+    with transaction() as cursor:
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            raise_conflict(err, "Organizer already exists")
+        organizer_id = cursor.lastrowid
+    return OrganizerResponse(id=organizer_id, **organizer.dict())
+
 
+# Crear organizadores por lotes
+@app.post("/organizers/bulk", response_model=BulkWriteResponse, tags=["organizers"])
+def create_organizers_bulk(organizers: List[Organizer]):
+    check_bulk_size(organizers)
+    return bulk_response(bulk_create_organizers([organizer.dict() for organizer in organizers]))
 
 # Obtener un organizador por su id
 @app.get("/organizers/{organizer_id}", response_model=OrganizerResponse, tags=["organizers"])
-def get_organizer_by_id(organizer_id: int):
+def get_organizer_by_id(request: Request, response: Response, organizer_id: int):
     query = "SELECT * FROM organizers WHERE id = %s"
-    organizer = execute_query(query, (organizer_id,))
+    organizer = reference_cache.get_or_load(("organizer", organizer_id), lambda: execute_query(query, (organizer_id,)))
     if not organizer:
         raise HTTPException(status_code=404, detail=ORGANIZER_NOT_FOUND)
-    return OrganizerResponse(**organizer[0])
+    organizer = organizer[0]
+    not_modified = conditional_response(request, response, make_etag("organizer", organizer_id, organizer["updated_at"]), organizer["updated_at"], CACHE_CONTROL_REFERENCE)
+    if not_modified:
+        return not_modified
+    return OrganizerResponse(**organizer)
 
 # Actualizar un organizador por su id
 @app.put("/organizers/{organizer_id}", response_model=OrganizerResponse, tags=["organizers"])
 def update_organizer(organizer_id: int, organizer: Organizer):
     query = "UPDATE organizers SET name = %s, email = %s, phone = %s WHERE id = %s"
     params = (organizer.name, organizer.email, organizer.phone, organizer_id)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="Organizer not found or not updated")
-    
-    # Obtener los datos actualizados del organizador
-    query_get_updated_organizer = "SELECT * FROM organizers WHERE id = %s"
-    updated_organizer = execute_query(query_get_updated_organizer, (organizer_id,))
-    return OrganizerResponse(**updated_organizer[0])
+    with transaction() as cursor:
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            raise_conflict(err, "Organizer already exists")
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Organizer not found or not updated")
+    reference_cache.invalidate(("organizer", organizer_id))
+    return OrganizerResponse(id=organizer_id, **organizer.dict())
 
 # Eliminar un organizador por su id
 @app.delete("/organizers/{organizer_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["organizers"])
 def delete_organizer(organizer_id: int):
     query = "DELETE FROM organizers WHERE id = %s"
-    rows_affected = execute_non_query(query, (organizer_id,))
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail=ORGANIZER_NOT_FOUND)
+    with transaction() as cursor:
+        # La acción en cascada de la clave foránea no actualiza updated_at: se marca aquí la versión de sus eventos
+        cursor.execute("UPDATE events SET updated_at = CURRENT_TIMESTAMP(6) WHERE organizer_id = %s", (organizer_id,))
+        cursor.execute(query, (organizer_id,))
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail=ORGANIZER_NOT_FOUND)
+    # La clave foránea deja organizer_id a NULL en sus eventos: los eventos cacheados quedan obsoletos
+    reference_cache.invalidate(("organizer", organizer_id))
+    reference_cache.invalidate_kind("event")
 
     
 # Endpoints para manejo de Categorías
 # Obtener todas las categorías
 @app.get("/categories", response_model=List[CategoryResponse], tags=["categories"])
-def get_categories():
+def get_categories(request: Request, response: Response):
+    # Conteo y última modificación se calculan de las filas cacheadas: el ETag describe el cuerpo que se sirve
     query = "SELECT * FROM categories ORDER BY id"
-    categories = execute_query(query)
+    categories = reference_cache.get_or_load(("categories",), lambda: execute_query(query))
+    last_modified = max((category["updated_at"] for category in categories), default=None)
+    not_modified = conditional_response(request, response, make_etag("categories", len(categories), last_modified), last_modified, CACHE_CONTROL_REFERENCE)
+    if not_modified:
+        return not_modified
     return [CategoryResponse(**category) for category in categories]
 
 # Crear una nueva categoría
 @app.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED, tags=["categories"])
 def create_category(category: Category):
-    # Verificar si la categoría ya existe
-    query_check_category = "SELECT id FROM categories WHERE name = %s"
-    existing_category = execute_query(query_check_category, (category.name,))
-
-    if existing_category:
-        raise HTTPException(status_code=400, detail="Category already exists")
-    
+    # El índice único de name rechaza las categorías repetidas en el propio INSERT
     query = "INSERT INTO categories (name) VALUES (%s)"
     params = (category.name,)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=400, detail="Category not created")
-    
-    # Obtener la nueva categoría por su nombre
-    query_get_category = "SELECT * FROM categories WHERE name = %s"
-    category = execute_query(query_get_category, (category.name,))
-    return CategoryResponse(**category[0])
+    with transaction() as cursor:
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            raise_conflict(err, "Category already exists")
+        category_id = cursor.lastrowid
+    reference_cache.invalidate(("categories",))
+    return CategoryResponse(id=category_id, name=category.name)
+
+# Crear categorías por lotes
+@app.post("/categories/bulk", response_model=BulkWriteResponse, tags=["categories"])
+def create_categories_bulk(categories: List[Category]):
+    check_bulk_size(categories)
+    results = bulk_create_categories([category.dict() for category in categories])
+    reference_cache.invalidate(("categories",))
+    return bulk_response(results)
 
 # Obtener una categoría por su id
 @app.get("/categories/{category_id}", response_model=CategoryResponse, tags=["categories"])
-def get_category_by_id(category_id: int):
+def get_category_by_id(request: Request, response: Response, category_id: int):
+    # La fila es pequeña: se lee una vez y los validadores salen de ella
     query = "SELECT * FROM categories WHERE id = %s"
     category = execute_query(query, (category_id,))
     if not category:
         raise HTTPException(status_code=404, detail=CATEGORY_NOT_FOUND)
-    return CategoryResponse(**category[0])
+    category = category[0]
+    not_modified = conditional_response(request, response, make_etag("category", category_id, category["updated_at"]), category["updated_at"], CACHE_CONTROL_REFERENCE)
+    if not_modified:
+        return not_modified
+    return CategoryResponse(**category)
 
 # Actualizar una categoría por su id
 @app.put("/categories/{category_id}", response_model=CategoryResponse, tags=["categories"])
 def update_category(category_id: int, category: Category):
     query = "UPDATE categories SET name = %s WHERE id = %s"
     params = (category.name, category_id)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="Category not found or not updated")
-    
-    # Obtener los datos actualizados de la categoría
-    query_get_updated_category = "SELECT * FROM categories WHERE id = %s"
-    category = execute_query(query_get_updated_category, (category_id,))
-    return CategoryResponse(**category[0])
+    with transaction() as cursor:
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            raise_conflict(err, "Category already exists")
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Category not found or not updated")
+    reference_cache.invalidate(("categories",))
+    reference_cache.invalidate_kind("event_categories")
+    return CategoryResponse(id=category_id, name=category.name)
 
 # Eliminar una categoría por su id
 @app.delete("/categories/{category_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["categories"])
@@ -974,15 +1492,16 @@ def delete_category(category_id: int):
     rows_affected = execute_non_query(query, (category_id,))
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail=CATEGORY_NOT_FOUND)
+    reference_cache.invalidate(("categories",))
+    reference_cache.invalidate_kind("event_categories")
 
 # Obtener el conteo de eventos por categoría
 @app.get("/categories/events/count", response_model=List[dict], tags=["categories"])
 def get_event_count_by_category():
     query = """
-    SELECT categories.id, categories.name, COUNT(event_categories.event_id) AS event_count
+    SELECT categories.id, categories.name, IFNULL(event_counts_by_category.event_count, 0) AS event_count
     FROM categories
-    LEFT JOIN event_categories ON categories.id = event_categories.category_id
-    GROUP BY categories.id, categories.name
+    LEFT JOIN event_counts_by_category ON categories.id = event_counts_by_category.category_id
     ORDER BY categories.name ASC
     """
     results = execute_query(query)
@@ -991,15 +1510,10 @@ def get_event_count_by_category():
 # Obtener el conteo de eventos en una categoría específica
 @app.get("/categories/{category_id}/events-count", response_model=dict, tags=["categories"])
 def get_event_count_by_category_id(category_id: int):
-    query = """
-    SELECT COUNT(*) AS event_count
-    FROM event_categories
-    WHERE category_id = %s
-    """
+    # Como el COUNT(*) original, una categoría sin eventos (o inexistente) cuenta 0
+    query = "SELECT event_count FROM event_counts_by_category WHERE category_id = %s"
     result = execute_query(query, (category_id,))
-    if not result:
-        raise HTTPException(status_code=404, detail="Category not found or no events found for this category")
-    return {"category_id": category_id, "event_count": result[0]["event_count"]}
+    return {"category_id": category_id, "event_count": result[0]["event_count"] if result else 0}
 
 # Endpoints para manejo de Categorías de Eventos
 # Obtener todas las categorías de eventos
@@ -1012,92 +1526,137 @@ def get_event_categories():
 # Crear una nueva categoría de evento
 @app.post("/event_categories", response_model=EventCategoryResponse, status_code=status.HTTP_201_CREATED, tags=["event_categories"])
 def create_event_category(event_category: EventCategory):
-    # Verificar si la categoría de evento ya existe
-    query_check_event_category = "SELECT * FROM event_categories WHERE event_id = %s AND category_id = %s"
-    existing_event_category = execute_query(query_check_event_category, (event_category.event_id, event_category.category_id))
-
-    if existing_event_category:
-        raise HTTPException(status_code=400, detail="Event category already exists")
-    
+    # Los vínculos repetidos y los eventos o categorías inexistentes los detecta el propio INSERT
     query = "INSERT INTO event_categories (event_id, category_id) VALUES (%s, %s)"
     params = (event_category.event_id, event_category.category_id)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=400, detail="Event category not created")
+    with transaction() as cursor:
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            raise_event_category_conflict(err)
+        apply_category_delta(cursor, event_category.category_id, 1)
+        cursor.execute("UPDATE events SET updated_at = CURRENT_TIMESTAMP(6) WHERE id = %s", (event_category.event_id,))
+    reference_cache.invalidate(("event_categories", event_category.event_id))
     return EventCategoryResponse(message="Event category created")
 
+# Vincular categorías a eventos por lotes (p. ej. todas las categorías de un evento nuevo)
+@app.post("/event_categories/bulk", response_model=BulkWriteResponse, tags=["event_categories"])
+def create_event_categories_bulk(event_categories: List[EventCategory]):
+    check_bulk_size(event_categories)
+    results = bulk_create_event_categories([event_category.dict() for event_category in event_categories])
+    reference_cache.invalidate(*{("event_categories", event_category.event_id) for event_category in event_categories})
+    return bulk_response(results)
+
 # Obtener categorías por evento
 @app.get("/events/{event_id}/categories", response_model=List[CategoryResponse], tags=["event_categories"])
-def get_categories_by_event(event_id: int):
+def get_categories_by_event(request: Request, response: Response, event_id: int):
+    # Vincular o desvincular categorías actualiza events.updated_at; renombrarlas, categories.updated_at.
+    # Ambas marcas se leen en la misma consulta que el cuerpo y se cachean con él
     query = """
-    SELECT categories.id, categories.name
-    FROM event_categories
+    SELECT events.updated_at AS event_modified, categories.id, categories.name, categories.updated_at
+    FROM events
+    JOIN event_categories ON event_categories.event_id = events.id
     JOIN categories ON event_categories.category_id = categories.id
-    WHERE event_categories.event_id = %s
+    WHERE events.id = %s
+    ORDER BY categories.id
     """
-    categories = execute_query(query, (event_id,))
+    categories = reference_cache.get_or_load(("event_categories", event_id), lambda: execute_query(query, (event_id,)))
     if not categories:
         raise HTTPException(status_code=404, detail="No categories found for this event")
+    event_modified = categories[0]["event_modified"]
+    last_modified = max(event_modified, *(category["updated_at"] for category in categories))
+    not_modified = conditional_response(request, response, make_etag("event_categories", event_id, event_modified, [(category["id"], category["updated_at"]) for category in categories]), last_modified, CACHE_CONTROL_REFERENCE)
+    if not_modified:
+        return not_modified
     return [CategoryResponse(**category) for category in categories]
 
 # Obtener eventos por categoría
 @app.get("/categories/{category_id}/events", response_model=List[EventResponse], tags=["event_categories"])
-def get_events_by_category(category_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1)):
+def get_events_by_category(response: Response, category_id: int, page: Optional[int] = Query(1, ge=1), limit: Optional[int] = Query(10, ge=1), after: Optional[str] = Query(None, description=AFTER_DESCRIPTION), include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names, columns = event_projection(fields, ("date", "id"), table="events")
     
-    if limit is not None:
+    if after is not None:
+        keyset, keyset_params = keyset_predicate(("events.date", "events.id"), decode_cursor(after, (datetime, int)))
+        query = f"""
+        SELECT {columns}
+        FROM event_categories
+        JOIN events ON event_categories.event_id = events.id
+        WHERE event_categories.category_id = %s AND {keyset}
+        ORDER BY events.date, events.id
+        LIMIT %s
+        """
+        events = execute_query(query, (category_id, *keyset_params, limit))
+    elif limit is not None:
         skip = (page - 1) * limit
-        query = """
-        SELECT events.id, events.name, events.description, events.location, events.city, events.country, events.date, events.max_capacity, events.price, events.organizer_id
+        query = f"""
+        SELECT {columns}
         FROM event_categories
         JOIN events ON event_categories.event_id = events.id
         WHERE event_categories.category_id = %s
+        ORDER BY events.date, events.id
         LIMIT %s OFFSET %s
         """
         events = execute_query(query, (category_id, limit, skip))
     else:
-        query = """
-        SELECT events.id, events.name, events.description, events.location, events.city, events.country, events.date, events.max_capacity, events.price, events.organizer_id
+        query = f"""
+        SELECT {columns}
         FROM event_categories
         JOIN events ON event_categories.event_id = events.id
         WHERE event_categories.category_id = %s
+        ORDER BY events.date, events.id
         """
         events = execute_query(query, (category_id,))
 
     if not events:
         raise HTTPException(status_code=404, detail="No events found for this category")
-    return [EventResponse(**event) for event in events]
+    set_next_cursor(response, events, ("date", "id"), limit)
+    return event_responses(response, events, include, field_names)
 
 # Eliminar una categoría de evento
 @app.delete("/event_categories/{event_id}/{category_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["event_categories"])
 def delete_event_category(event_id: int, category_id: int):
     query = "DELETE FROM event_categories WHERE event_id = %s AND category_id = %s"
-    rows_affected = execute_non_query(query, (event_id, category_id))
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="Event category not found")
+    with transaction() as cursor:
+        cursor.execute(query, (event_id, category_id))
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Event category not found")
+        apply_category_delta(cursor, category_id, -1)
+        cursor.execute("UPDATE events SET updated_at = CURRENT_TIMESTAMP(6) WHERE id = %s", (event_id,))
+    reference_cache.invalidate(("event_categories", event_id))
     
 # Endpoints para manejo de Feedbacks
 
 # Obtener todos los feedbacks
 @app.get("/feedbacks", response_model=List[FeedbackResponse], tags=["feedbacks"])
-def get_feedbacks():
-    query = "SELECT * FROM feedbacks"
+def get_feedbacks(response: Response, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    field_names = parse_fields(fields, FeedbackResponse, required=("id",), excluded=("author",))
+    query = f"SELECT {select_list(field_names or FEEDBACK_COLUMNS)} FROM feedbacks"
     feedbacks = execute_query(query)
+    if field_names is not None:
+        return projected_response(response, projected_model(FeedbackResponse, field_names), feedbacks)
     return [FeedbackResponse(**feedback) for feedback in feedbacks]
 
 # Crear un nuevo feedback
 @app.post("/feedbacks", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED, tags=["feedbacks"])
 def create_feedback(feedback: Feedback):
+    # La fecha se fija aquí para devolver el feedback sin volver a leerlo
+    now = datetime.now().replace(microsecond=0)
     query = """
-    INSERT INTO feedbacks (user_id, event_id, comment_text, rating_value)
-    VALUES (%s, %s, %s, %s)
+    INSERT INTO feedbacks (user_id, event_id, comment_text, rating_value, timestamp)
+    VALUES (%s, %s, %s, %s, %s)
     """
-    params = (feedback.user_id, feedback.event_id, feedback.comment_text, feedback.rating_value)
-    execute_non_query(query, params)
-
-    # Obtener el nuevo feedback por su user_id y event_id
-    query_get_feedback = "SELECT * FROM feedbacks WHERE user_id = %s AND event_id = %s ORDER BY timestamp DESC LIMIT 1"
-    feedback_data = execute_query(query_get_feedback, (feedback.user_id, feedback.event_id))
-    return FeedbackResponse(**feedback_data[0])
+    params = (feedback.user_id, feedback.event_id, feedback.comment_text, feedback.rating_value, now)
+    with transaction() as cursor:
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            if err.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+                raise HTTPException(status_code=404, detail="User or event not found")
+            raise
+        feedback_id = cursor.lastrowid
+        apply_feedback_delta(cursor, feedback.event_id, feedback.rating_value, 1)
+
+    return FeedbackResponse(id=feedback_id, **feedback.dict(), timestamp=now)
 
 # Obtener un feedback por su id
 @app.get("/feedbacks/{feedback_id}", response_model=FeedbackResponse, tags=["feedbacks"])
@@ -1116,134 +1675,80 @@ def update_feedback(feedback_id: int, feedback: Feedback):
     WHERE id = %s
     """
     params = (feedback.user_id, feedback.event_id, feedback.comment_text, feedback.rating_value, feedback_id)
-    rows_affected = execute_non_query(query, params)
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="Feedback not found or not updated")
-
-    # Obtener los datos actualizados del feedback
-    query_get_updated_feedback = "SELECT * FROM feedbacks WHERE id = %s"
-    updated_feedback = execute_query(query_get_updated_feedback, (feedback_id,))
-    return FeedbackResponse(**updated_feedback[0])
+    with transaction() as cursor:
+        cursor.execute("SELECT event_id, rating_value, timestamp FROM feedbacks WHERE id = %s FOR UPDATE", (feedback_id,))
+        old_feedback = cursor.fetchone()
+        if old_feedback is None:
+            raise HTTPException(status_code=404, detail="Feedback not found or not updated")
+        try:
+            cursor.execute(query, params)
+        except IntegrityError as err:
+            if err.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+                raise HTTPException(status_code=404, detail="User or event not found")
+            raise
+        apply_feedback_delta(cursor, old_feedback["event_id"], old_feedback["rating_value"], -1)
+        apply_feedback_delta(cursor, feedback.event_id, feedback.rating_value, 1)
+
+    # La fecha del feedback no cambia al editarlo
+    return FeedbackResponse(id=feedback_id, **feedback.dict(), timestamp=old_feedback["timestamp"])
 
 # Eliminar un feedback por su id
 @app.delete("/feedbacks/{feedback_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["feedbacks"])
 def delete_feedback(feedback_id: int):
-    query = "DELETE FROM feedbacks WHERE id = %s"
-    rows_affected = execute_non_query(query, (feedback_id,))
-    if rows_affected == 0:
-        raise HTTPException(status_code=404, detail=FEEDBACK_NOT_FOUND)
+    with transaction() as cursor:
+        cursor.execute("SELECT event_id, rating_value FROM feedbacks WHERE id = %s FOR UPDATE", (feedback_id,))
+        feedback = cursor.fetchone()
+        if feedback is None:
+            raise HTTPException(status_code=404, detail=FEEDBACK_NOT_FOUND)
+        cursor.execute("DELETE FROM feedbacks WHERE id = %s", (feedback_id,))
+        apply_feedback_delta(cursor, feedback["event_id"], feedback["rating_value"], -1)
 
 # Endpoint para obtener estadísticas generales
 @app.get("/general-statistics", response_model=dict, tags=["statistics"])
 def get_general_statistics():
-    queries = {
-        "total_comments": "SELECT COUNT(*) AS total_comments FROM feedbacks",
-        "avg_rating": "SELECT AVG(rating_value) AS avg_rating FROM feedbacks",
-        "total_registrations": "SELECT COUNT(*) AS total_registrations FROM registrations"
+    # Totales leídos de las tablas de resumen en lugar de recorrer feedbacks y registrations
+    query = """
+    SELECT
+        (SELECT IFNULL(SUM(comment_count), 0) FROM event_feedback_stats) AS total_comments,
+        (SELECT IFNULL(SUM(rating_sum), 0) FROM event_feedback_stats) AS rating_sum,
+        (SELECT IFNULL(SUM(rating_count), 0) FROM event_feedback_stats) AS rating_count,
+        (SELECT IFNULL(SUM(registered_count + canceled_count), 0) FROM event_registration_stats) AS total_registrations
+    """
+    result = execute_query(query)[0]
+    rating_count = int(result["rating_count"])
+    return {
+        "total_comments": int(result["total_comments"]),
+        "avg_rating": float(result["rating_sum"]) / rating_count if rating_count else 0.0,
+        "total_registrations": int(result["total_registrations"]),
     }
-    
-    results = {}
-    for key, query in queries.items():
-        result = execute_query(query)
-        if key == "avg_rating":
-            results[key] = float(result[0][key])
-        else:
-            results[key] = result[0][key]
-    
-    return results
 
-# Endpoint dinámico para API SQL(Beta v1.0)
-api_key_stellargather = "" # Pones la API Key de OpenAI
-
-# Función para enviar la pregunta a ChatGPT y obtener la clasificación y detalles
-def classify_question_with_chatgpt(question: Question):
-    try:
-        schema_context = """
-        Eres un asistente que puede determinar si una pregunta está relacionada con una consulta SQL o un gráfico. MySQL es el sistema de gestión de
-        bases de datos que se utiliza en la base de datos de StellarGather. Si la pregunta requiere SQL, genera la consulta SQL solamente 
-        sin más (sql_query). Si la pregunta requiere un gráfico, determina el tipo de gráfico (por ejemplo, barras, líneas, pasteles, etc.) y 
-        devuelve los parámetros necesarios (sql_query (para obtener los datos necesarios para el gráfico), chart_type: str, x_axis: str, 
-        y_axis: str, data_source: str, timeframe: str). Si la pregunta es sql devuelves en el response_type 'sql' y si es gráfico devuelves 'chart'.
-
-        Debes tener sumo cuidado con las consultas SQL que vas a generar, el campo sql_query debe estar solo la consulta 
-        SQL que responda a la pregunta (No pueden haber puntos al final de la consulta SQL).
-
-        Aquí está el esquema de la base de datos:
-        - users: id, username, email, password, full_name, gender ('male', 'female'), country, phone_number, birth_date, created_at, updated_at
-        - organizers: id, name, email, phone
-        - categories: id, name
-        - events: id, name, description, location, city, country, date, max_capacity, price, organizer_id
-        - registrations: id, user_id, event_id, status ('registered', 'canceled'), date
-        - event_categories: event_id, category_id
-        - feedbacks: id, user_id, event_id, comment_text, rating_value, timestamp. (Cuando hablen sobre comentarios,
-        es el comment_text, cuando hablen de calificación, es el rating_value)
-
-        Las claves foráneas aseguran las integraciones entre tablas, y se aplican restricciones de unicidad y consistencia de 
-        datos en los atributos clave. Nunca vayas a devolver el password de cuanda vayas a mostrar información de la tabla users.
-
-        Al nombrar x_axis e y_axis, debe tener los mismos nombres a los que devuelva la consulta SQL.
-        """
-
-        # Solicitar a ChatGPT que determine el tipo de respuesta
-        client = OpenAI(api_key=api_key_stellargather)
-        response = client.beta.chat.completions.parse(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": f"{schema_context}"},
-                {"role": "user", "content": question.question}
-            ],
-            max_tokens=300,
-            temperature=0.5,
-            response_format=AnswerChatGPT,
-        )
-        
-        return response.choices[0].message.parsed
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al procesar la pregunta: {str(e)}")
-
-# Función para generar gráficos
-def generate_graph(data: pd.DataFrame, chart_type: str, x_axis: str, y_axis: str) -> str:
-    ax = plt.subplots()
-
-    if chart_type == 'bar':
-        data.plot(kind='bar', ax=ax, x=x_axis, y=y_axis)
-    elif chart_type == 'line':
-        data.plot(kind='line', ax=ax, x=x_axis, y=y_axis)
-    elif chart_type == 'pie':
-        data.set_index(x_axis).plot(kind='pie', ax=ax, y=y_axis)
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    image_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    return image_base64
-
-# Endpoint principal
-@app.post("/generate-statistics-endpoint", tags=["dynamic_statistics"])
-async def generate_statistics_endpoint(query: Question):
-    # Clasificar la pregunta con ChatGPT
-    response_chatgpt = classify_question_with_chatgpt(query)
-    
-    # Si la respuesta es un SQL, ejecutar la consulta y devolver los resultados
-    if response_chatgpt.response_type == 'sql':
-        querysql = response_chatgpt.sql_query
-        result = execute_query(querysql)
-        return result
-    
-    # Si la respuesta es un gráfico, generar el gráfico y devolver la imagen en base64
-    elif response_chatgpt.response_type == 'chart':
-        query = response_chatgpt.sql_query
-        result = execute_query(query)
-
-        # Obtener parámetros del gráfico desde la respuesta de ChatGPT
-        data = pd.DataFrame(result)
-        chart_type = response_chatgpt.chart_type
-        x_axis = response_chatgpt.x_axis
-        y_axis = response_chatgpt.y_axis
-
-        # Generar el gráfico y devolver la imagen en base64
-        image_base64 = generate_graph(data, chart_type, x_axis, y_axis)
-        return {"image_base64": image_base64, "sql_query": query}
-
-    return response_chatgpt
\ No newline at end of file
+# Endpoint para obtener las métricas del pool de conexiones a MySQL
+@app.get("/database/pool-stats", response_model=dict, tags=["statistics"])
+def get_database_pool_stats():
+    return get_pool_stats()
+
+# Endpoint para obtener las métricas del pool de hash de contraseñas
+@app.get("/password-hashing/stats", response_model=dict, tags=["statistics"])
+def get_password_hashing_stats():
+    return password_hasher.stats()
+
+# Endpoint para obtener el tamaño de la lista de revocación de sesiones
+@app.get("/session/revocations/stats", response_model=dict, tags=["statistics"])
+def get_session_revocation_stats():
+    return revocations.stats()
+
+# Endpoint para obtener las estadísticas de la caché de datos de referencia
+@app.get("/cache/stats", response_model=dict, tags=["statistics"])
+def get_cache_stats():
+    return reference_cache.stats()
+
+# Activar o desactivar la caché de datos de referencia (depuración)
+@app.put("/cache/enabled", response_model=dict, tags=["statistics"])
+def set_cache_enabled(enabled: bool = Query(..., description="False desactiva la caché y la vacía")):
+    reference_cache.set_enabled(enabled)
+    return reference_cache.stats()
+
+# Vaciar la caché de datos de referencia
+@app.delete("/cache", status_code=status.HTTP_204_NO_CONTENT, tags=["statistics"])
+def clear_cache():
+    reference_cache.clear()
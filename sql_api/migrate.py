@@ -0,0 +1,193 @@
+"""
+Ejecutor de migraciones versionadas del esquema MySQL del servicio SQL.
+
+Cada archivo `migrations/NNNN_descripcion.sql` se aplica una sola vez, en orden, y queda
+registrado en la tabla `schema_migrations`. `init.sql` sigue definiendo el esquema base.
+
+MySQL confirma cada sentencia DDL por separado, así que una migración no se puede revertir a
+medias: cada sentencia aplicada se registra en `schema_migration_statements` y, si una falla,
+la siguiente ejecución continúa desde ella en lugar de repetir las anteriores (lo que fallaría
+con "Duplicate column" o "Duplicate key name" para siempre).
+
+Uso:
+    python migrate.py           # Aplica las migraciones pendientes
+    python migrate.py status    # Muestra las migraciones aplicadas y pendientes
+"""
+import os
+import sys
+import time
+from mysql.connector import Error
+from database import get_db_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_LOCK = "stellargather_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+# Reintentos al arrancar, mientras MySQL todavía no acepta conexiones (p. ej. primer arranque con docker compose)
+MIGRATION_RETRIES = int(os.getenv("DB_STARTUP_RETRIES", "10"))
+MIGRATION_RETRY_DELAY = float(os.getenv("DB_STARTUP_RETRY_DELAY", "1"))  # Segundos antes del primer reintento; se duplica en cada uno
+MIGRATION_RETRY_MAX_DELAY = 30
+
+# Comprobaciones previas de las migraciones que dependen de los datos: si la consulta devuelve filas,
+# la migración no se aplica y el error lista los datos que hay que corregir antes
+MIGRATION_PRECHECKS = {
+    "0007_event_unique_key": (
+        """
+        SELECT GROUP_CONCAT(id ORDER BY id) AS ids, MIN(name) AS name
+        FROM events
+        GROUP BY UNHEX(SHA2(CONCAT(LOWER(name), CHAR(0), LOWER(description)), 256))
+        HAVING COUNT(*) > 1
+        """,
+        "hay eventos duplicados (mismo nombre y descripción sin distinguir mayúsculas); renombra, "
+        "modifica o elimina los sobrantes y vuelve a aplicar las migraciones",
+    ),
+}
+
+class DatabaseUnavailable(RuntimeError):
+    """MySQL no acepta conexiones o el bloqueo de migraciones está ocupado: el error es transitorio."""
+
+def list_migrations():
+    """Devuelve las migraciones disponibles como lista ordenada de (versión, ruta)."""
+    files = sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql"))
+    return [(name[:-4], os.path.join(MIGRATIONS_DIR, name)) for name in files]
+
+def split_statements(sql):
+    """Separa un archivo de migración en sentencias (separadas por ';'), ignorando comentarios '--'."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+def _applied_versions(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(255) PRIMARY KEY,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+def _applied_statements(cursor, version):
+    """Números (desde 0) de las sentencias ya aplicadas de una migración que quedó a medias."""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migration_statements (
+        version VARCHAR(255) NOT NULL,
+        statement_number INT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (version, statement_number)
+    )
+    """)
+    cursor.execute("SELECT statement_number FROM schema_migration_statements WHERE version = %s", (version,))
+    return {row[0] for row in cursor.fetchall()}
+
+def apply_migrations():
+    """
+    Aplica en orden las migraciones pendientes.
+
+    Un bloqueo con nombre (GET_LOCK) evita que varios workers las apliquen a la vez.
+
+    Returns:
+        list[str]: Versiones aplicadas en esta ejecución.
+
+    Raises:
+        DatabaseUnavailable: Si no hay conexión o no se obtiene el bloqueo.
+        RuntimeError: Si falla una migración.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise DatabaseUnavailable("No se pudo conectar a MySQL para aplicar las migraciones")
+    cursor = conn.cursor()
+    applied_now = []
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, MIGRATION_LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            raise DatabaseUnavailable("No se pudo obtener el bloqueo de migraciones")
+        try:
+            applied = _applied_versions(cursor)
+            for version, path in list_migrations():
+                if version in applied:
+                    continue
+                done = _applied_statements(cursor, version)
+                if not done:
+                    _run_precheck(cursor, version)
+                with open(path, encoding="utf-8") as migration_file:
+                    statements = split_statements(migration_file.read())
+                for number, statement in enumerate(statements):
+                    if number in done:
+                        continue
+                    try:
+                        cursor.execute(statement)
+                        if cursor.with_rows:
+                            cursor.fetchall()
+                    except Error as err:
+                        raise RuntimeError(f"La migración {version} falló en la sentencia {number + 1}: {err}") from err
+                    cursor.execute("INSERT INTO schema_migration_statements (version, statement_number) VALUES (%s, %s)", (version, number))
+                cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+                cursor.execute("DELETE FROM schema_migration_statements WHERE version = %s", (version,))
+                applied_now.append(version)
+                print(f"Migración aplicada: {version}")
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    return applied_now
+
+def _run_precheck(cursor, version):
+    if version not in MIGRATION_PRECHECKS:
+        return
+    query, problem = MIGRATION_PRECHECKS[version]
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    if rows:
+        report = "; ".join(f"ids {ids} ({name!r})" for ids, name in rows[:20])
+        more = f" y {len(rows) - 20} grupos más" if len(rows) > 20 else ""
+        raise RuntimeError(f"La migración {version} no se aplicó: {problem}. Afectados: {report}{more}")
+
+def apply_migrations_with_retry(retries=MIGRATION_RETRIES, delay=MIGRATION_RETRY_DELAY):
+    """
+    Aplica las migraciones reintentando con espera exponencial mientras MySQL no esté disponible.
+
+    Una migración que falla no se reintenta: el error no es transitorio.
+
+    Raises:
+        RuntimeError: Si MySQL sigue sin estar disponible tras los reintentos o falla una migración.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return apply_migrations()
+        except DatabaseUnavailable as err:
+            if attempt == retries:
+                raise RuntimeError(f"{err} tras {retries} reintentos") from err
+            wait = min(delay * 2 ** attempt, MIGRATION_RETRY_MAX_DELAY)
+            print(f"{err}; reintento {attempt + 1}/{retries} en {wait:.0f} s")
+            time.sleep(wait)
+
+def migration_status():
+    """Devuelve un diccionario con las versiones aplicadas y pendientes."""
+    conn = get_db_connection()
+    if conn is None:
+        raise RuntimeError("No se pudo conectar a MySQL")
+    cursor = conn.cursor()
+    try:
+        applied = _applied_versions(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+    versions = [version for version, _ in list_migrations()]
+    return {
+        "applied": [version for version in versions if version in applied],
+        "pending": [version for version in versions if version not in applied],
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        status = migration_status()
+        for version in status["applied"]:
+            print(f"[aplicada]  {version}")
+        for version in status["pending"]:
+            print(f"[pendiente] {version}")
+    else:
+        applied_versions = apply_migrations()
+        if not applied_versions:
+            print("No hay migraciones pendientes")
@@ -0,0 +1,7 @@
+-- Tabla de eventos de alta demanda (cola de admisión)
+CREATE TABLE IF NOT EXISTS hot_events (
+    event_id INT PRIMARY KEY,
+    batch_size INT NOT NULL DEFAULT 200 CHECK (batch_size > 0),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+);
@@ -0,0 +1,19 @@
+-- Índices para los filtros y ordenaciones de los endpoints más consultados
+
+-- /events, /events/date/{event_date}, /upcoming-events: rango y orden por fecha
+CREATE INDEX idx_events_date ON events (date);
+
+-- /events/country/{country} y conteos por país (orden por date, id dentro del país)
+CREATE INDEX idx_events_country_date ON events (country, date);
+
+-- /events/organizer/{organizer_id} y conteos por organizador (sustituye al índice de la clave foránea)
+CREATE INDEX idx_events_organizer_date ON events (organizer_id, date);
+
+-- Comprobaciones de inscripción de un usuario a un evento (/registrations/check, inscripción)
+CREATE INDEX idx_registrations_user_event_status ON registrations (user_id, event_id, status);
+
+-- Plazas ocupadas de un evento (conteo de inscripciones 'registered')
+CREATE INDEX idx_registrations_event_status ON registrations (event_id, status);
+
+-- /events/{event_id}/feedbacks ordenado por timestamp
+CREATE INDEX idx_feedbacks_event_timestamp ON feedbacks (event_id, timestamp);
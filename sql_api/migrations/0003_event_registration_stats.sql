@@ -0,0 +1,17 @@
+-- Contadores de inscripciones por evento, mantenidos en la misma transacción que las escrituras en registrations
+CREATE TABLE IF NOT EXISTS event_registration_stats (
+    event_id INT PRIMARY KEY,
+    registered_count INT NOT NULL DEFAULT 0,
+    canceled_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+);
+
+-- Carga inicial a partir de las inscripciones existentes
+INSERT INTO event_registration_stats (event_id, registered_count, canceled_count)
+SELECT event_id, SUM(status = 'registered'), SUM(status = 'canceled')
+FROM registrations
+WHERE event_id IS NOT NULL
+GROUP BY event_id
+ON DUPLICATE KEY UPDATE
+    registered_count = VALUES(registered_count),
+    canceled_count = VALUES(canceled_count);
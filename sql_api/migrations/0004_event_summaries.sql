@@ -0,0 +1,58 @@
+-- Tablas de resumen para los endpoints de conteo y facetas, mantenidas en la misma
+-- transacción que las escrituras en events, event_categories y feedbacks (ver summaries.py)
+CREATE TABLE IF NOT EXISTS event_counts_by_country (
+    country VARCHAR(100) PRIMARY KEY,
+    event_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS event_counts_by_organizer (
+    organizer_id INT PRIMARY KEY,
+    event_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (organizer_id) REFERENCES organizers(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS event_counts_by_day (
+    event_day DATE PRIMARY KEY,
+    event_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS event_counts_by_category (
+    category_id INT PRIMARY KEY,
+    event_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS event_feedback_stats (
+    event_id INT PRIMARY KEY,
+    comment_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+);
+
+-- Carga inicial a partir de las tablas base
+INSERT INTO event_counts_by_country (country, event_count)
+SELECT country, COUNT(*) FROM events GROUP BY country
+ON DUPLICATE KEY UPDATE event_count = VALUES(event_count);
+
+INSERT INTO event_counts_by_organizer (organizer_id, event_count)
+SELECT organizer_id, COUNT(*) FROM events WHERE organizer_id IS NOT NULL GROUP BY organizer_id
+ON DUPLICATE KEY UPDATE event_count = VALUES(event_count);
+
+INSERT INTO event_counts_by_day (event_day, event_count)
+SELECT DATE(date) AS event_day, COUNT(*) FROM events GROUP BY event_day
+ON DUPLICATE KEY UPDATE event_count = VALUES(event_count);
+
+INSERT INTO event_counts_by_category (category_id, event_count)
+SELECT category_id, COUNT(*) FROM event_categories GROUP BY category_id
+ON DUPLICATE KEY UPDATE event_count = VALUES(event_count);
+
+INSERT INTO event_feedback_stats (event_id, comment_count, rating_sum, rating_count)
+SELECT event_id, COUNT(*), IFNULL(SUM(rating_value), 0), COUNT(rating_value)
+FROM feedbacks
+WHERE event_id IS NOT NULL
+GROUP BY event_id
+ON DUPLICATE KEY UPDATE
+    comment_count = VALUES(comment_count),
+    rating_sum = VALUES(rating_sum),
+    rating_count = VALUES(rating_count);
@@ -0,0 +1,17 @@
+-- Marcas de modificación para los validadores HTTP (ETag / Last-Modified) de las lecturas.
+-- Los índices permiten obtener el MAX(updated_at) de una tabla sin recorrerla.
+ALTER TABLE events
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_events_updated_at (updated_at);
+
+ALTER TABLE organizers
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_organizers_updated_at (updated_at);
+
+ALTER TABLE categories
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_categories_updated_at (updated_at);
+
+-- Última escritura sobre los comentarios de cada evento (la actualizan las escrituras en feedbacks)
+ALTER TABLE event_feedback_stats
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6);
@@ -0,0 +1,7 @@
+-- Número de versión de usuarios y eventos para la concurrencia optimista de PATCH:
+-- cada escritura lo incrementa y un PATCH con `version` solo se aplica si coincide.
+ALTER TABLE users
+    ADD COLUMN version INT UNSIGNED NOT NULL DEFAULT 1;
+
+ALTER TABLE events
+    ADD COLUMN version INT UNSIGNED NOT NULL DEFAULT 1;
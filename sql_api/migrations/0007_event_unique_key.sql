@@ -0,0 +1,10 @@
+-- Clave única de eventos (nombre, descripción) para que POST/PUT /events detecten los duplicados
+-- con el propio INSERT/UPDATE (error 1062) en lugar de una consulta previa.
+-- description es TEXT: se indexa un hash de ambos campos, en minúsculas como la comparación de la
+-- colación. Depende de los datos: si ya existen eventos duplicados, migrate.py lo detecta antes del
+-- ALTER, lista los ids afectados y no la aplica hasta que se resuelvan. Por eso va después de las
+-- migraciones que no dependen de los datos.
+ALTER TABLE events
+    ADD COLUMN name_description_hash BINARY(32)
+        AS (UNHEX(SHA2(CONCAT(LOWER(name), CHAR(0), LOWER(description)), 256))) STORED INVISIBLE,
+    ADD UNIQUE INDEX uq_events_name_description (name_description_hash);
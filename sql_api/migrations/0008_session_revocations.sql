@@ -0,0 +1,13 @@
+-- Revocaciones de sesiones (cierre de sesión, contraseña cambiada, usuario borrado), compartidas
+-- por todos los workers y conservadas tras un reinicio. Una fila con `jti` revoca un token; una
+-- fila sin `jti` revoca los tokens del usuario emitidos hasta `revoked_at`. Los instantes son
+-- segundos epoch, como las claims `iat`/`exp`; las filas caducadas se borran al revocar otras.
+-- Sin clave foránea a users: borrar el usuario no debe borrar la revocación de sus tokens.
+CREATE TABLE IF NOT EXISTS session_revocations (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    jti VARCHAR(64) NULL,
+    user_id INT NULL,
+    revoked_at DOUBLE NOT NULL,
+    expires_at DOUBLE NOT NULL,
+    INDEX idx_session_revocations_expires_at (expires_at)
+);
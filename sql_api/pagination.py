@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Descripción común del parámetro `after` de los listados paginados por cursor
+AFTER_DESCRIPTION = f"Cursor opaco devuelto en la cabecera {NEXT_CURSOR_HEADER} de la página anterior"
+
+def encode_cursor(values):
+    """Codifica los valores de la clave de ordenación de la última fila en un cursor opaco."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor, types):
+    """
+    Decodifica un cursor opaco en los valores de la clave de ordenación.
+
+    Args:
+        cursor (str): Cursor recibido en `?after=`.
+        types (tuple): Tipo esperado de cada valor (`datetime` o `int`).
+
+    Raises:
+        HTTPException: 400 si el cursor no es válido.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("Unexpected cursor shape")
+        return tuple(datetime.fromisoformat(value) if kind is datetime else kind(value) for kind, value in zip(types, payload))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def keyset_predicate(columns, values, descending=False):
+    """
+    Construye el predicado "después de esta clave" para paginación por cursor.
+
+    Se expande a `a > %s OR (a = %s AND b > %s)` en lugar de usar un constructor de fila,
+    de modo que MySQL lo resuelva como un rango sobre el índice de (a, b).
+
+    Returns:
+        tuple[str, tuple]: El fragmento SQL y sus parámetros.
+    """
+    operator = "<" if descending else ">"
+    clauses = []
+    params = []
+    for position, column in enumerate(columns):
+        conditions = [f"{previous} = %s" for previous in columns[:position]] + [f"{column} {operator} %s"]
+        clauses.append("(" + " AND ".join(conditions) + ")")
+        params.extend(values[:position + 1])
+    return "(" + " OR ".join(clauses) + ")", tuple(params)
+
+def set_next_cursor(response, rows, keys, limit):
+    """Añade la cabecera X-Next-Cursor si la página está completa (puede haber más filas)."""
+    if limit is not None and len(rows) == limit:
+        last_row = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([last_row[key] for key in keys])
@@ -0,0 +1,68 @@
+"""
+Hash y verificación de contraseñas (bcrypt) fuera del threadpool de la API.
+
+bcrypt consume deliberadamente 100-300 ms de CPU por operación: ejecutado en línea, una
+ráfaga de logins ocupa los hilos que también atienden las lecturas baratas. Aquí cada
+operación se envía a un pool de procesos dedicado (sin competir por el GIL) con su propio
+límite de concurrencia (número de procesos) y de cola (operaciones pendientes); cuando la
+cola está llena se responde 503 en lugar de acumular esperas.
+
+El coste de bcrypt se configura con `BCRYPT_ROUNDS`; al iniciar sesión, los hashes con un
+coste distinto se recalculan y se guardan (`verify_and_update`).
+"""
+import os
+from passlib.context import CryptContext
+from process_pool import BoundedProcessPool
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "256"))  # Operaciones en cola o en curso
+
+# Contexto de encriptación de contraseñas. Con min_rounds = max_rounds = rounds, cualquier hash
+# con otro coste se considera obsoleto y se regenera en el siguiente login correcto.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# Funciones ejecutadas en los procesos del pool (deben poder importarse desde este módulo)
+def _hash(password):
+    return pwd_context.hash(password)
+
+def _verify_and_update(password, hashed_password):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+class PasswordHasher:
+    """Operaciones de bcrypt sobre un `BoundedProcessPool` propio, con el conteo de hashes regenerados."""
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING):
+        self.pool = BoundedProcessPool("Password service", workers, max_pending)
+        self._rehashed = 0
+
+    async def hash(self, password):
+        """Devuelve el hash bcrypt de `password`."""
+        return await self.pool.run(_hash, password)
+
+    async def verify_and_update(self, password, hashed_password):
+        """
+        Verifica `password` contra `hashed_password`.
+
+        Returns:
+            tuple[bool, str | None]: Si la contraseña es correcta y, si el hash usa un coste
+                distinto del configurado, el nuevo hash que debe guardarse.
+        """
+        valid, new_hash = await self.pool.run(_verify_and_update, password, hashed_password)
+        if valid and new_hash:
+            self._rehashed += 1
+        return valid, new_hash
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+    def stats(self):
+        return {**self.pool.stats(), "bcrypt_rounds": BCRYPT_ROUNDS, "rehashed": self._rehashed}
+
+password_hasher = PasswordHasher()
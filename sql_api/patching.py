@@ -0,0 +1,50 @@
+"""
+Actualizaciones parciales (PATCH) con concurrencia optimista.
+
+El UPDATE se construye solo con los campos recibidos e incrementa la columna `version` de la
+fila. Si el cliente envía la versión que leyó, la condición `version = %s` del propio UPDATE
+rechaza la escritura cuando otra edición se adelantó, sin leer la fila antes de escribir.
+"""
+from fastapi import HTTPException
+
+def reject_nulls(changes, non_nullable):
+    """Rechaza (400) los campos obligatorios enviados explícitamente como null."""
+    nulls = [name for name in non_nullable if name in changes and changes[name] is None]
+    if nulls:
+        raise HTTPException(status_code=400, detail=f"Fields cannot be null: {', '.join(nulls)}")
+
+def apply_patch(cursor, table, row_id, changes, expected_version=None, not_found="Not found"):
+    """
+    Aplica un UPDATE parcial sobre `table` con una sola sentencia.
+
+    `LAST_INSERT_ID(version + 1)` hace que el propio UPDATE devuelva la nueva versión en
+    `cursor.lastrowid`. Solo si no se actualizó ninguna fila se consulta la versión actual
+    para distinguir entre fila inexistente (404) y versión obsoleta (409).
+
+    Args:
+        cursor: Cursor de la transacción en curso.
+        table (str): Tabla con columnas `id` y `version`.
+        row_id (int): Id de la fila.
+        changes (dict): Columnas a modificar y sus nuevos valores (nombres ya validados por el modelo).
+        expected_version (int, optional): Versión que leyó el cliente.
+        not_found (str): Mensaje del 404.
+
+    Returns:
+        int: Nueva versión de la fila.
+    """
+    assignments = [f"{column} = %s" for column in changes] + ["version = LAST_INSERT_ID(version + 1)"]
+    params = list(changes.values())
+    query = f"UPDATE {table} SET {', '.join(assignments)} WHERE id = %s"
+    params.append(row_id)
+    if expected_version is not None:
+        query += " AND version = %s"
+        params.append(expected_version)
+    cursor.execute(query, tuple(params))
+
+    if cursor.rowcount == 0:
+        cursor.execute(f"SELECT version FROM {table} WHERE id = %s", (row_id,))
+        current = cursor.fetchone()
+        if current is None:
+            raise HTTPException(status_code=404, detail=not_found)
+        raise HTTPException(status_code=409, detail=f"Version conflict: current version is {current['version']}")
+    return cursor.lastrowid
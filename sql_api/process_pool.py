@@ -0,0 +1,85 @@
+"""
+Pool de procesos acotado para trabajo de CPU que no debe ejecutarse en el event loop ni en
+el threadpool de la API (bcrypt, renderizado de gráficos).
+
+Limita la concurrencia (número de procesos) y la cola (operaciones pendientes): cuando la
+cola está llena se responde 503 en lugar de acumular esperas. Las funciones enviadas deben
+poder importarse desde su módulo, ya que los procesos se arrancan con `spawn` para no
+duplicar en los hijos las conexiones ni los hilos del proceso de la API.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+
+class BoundedProcessPool:
+    """
+    Ejecuta funciones en un pool de procesos creado en el primer uso y lleva sus métricas.
+
+    Se usa solo desde el event loop (endpoints `async`), por lo que los contadores no
+    necesitan bloqueo.
+    """
+
+    def __init__(self, name, workers, max_pending):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._peak_pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def run(self, function, *args):
+        """Ejecuta `function(*args)` en el pool y devuelve su resultado (503 si la cola está llena)."""
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(status_code=503, detail=f"{self.name} busy, retry later", headers={"Retry-After": "1"})
+        self._pending += 1
+        self._submitted += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        started = time.monotonic()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), function, *args)
+            self._completed += 1
+            return result
+        except BrokenProcessPool:
+            # Un proceso murió (p. ej. por memoria): el pool queda inutilizable y se recrea en el siguiente uso
+            self._failed += 1
+            self._executor = None
+            raise HTTPException(status_code=503, detail=f"{self.name} unavailable, retry later", headers={"Retry-After": "1"})
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            self._busy_seconds += time.monotonic() - started
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        finished = self._completed + self._failed
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "peak_pending": self._peak_pending,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "avg_latency_ms": round(self._busy_seconds / finished * 1000, 2) if finished else 0.0,
+        }
@@ -0,0 +1,239 @@
+from datetime import datetime
+from fastapi import HTTPException
+from mysql.connector import errorcode, IntegrityError
+from database import transaction
+
+EVENT_NOT_FOUND = "Event not found"
+REGISTRATION_NOT_FOUND = "Registration not found"
+MAX_CANCELLATIONS = 2
+
+def lock_event(cursor, event_id):
+    """
+    Bloquea la fila del evento y la de sus contadores (SELECT ... FOR UPDATE) hasta el final
+    de la transacción.
+
+    Todas las inscripciones de un mismo evento se serializan sobre este bloqueo, de modo que
+    el contador de plazas ocupadas no puede cambiar entre la validación y la inserción.
+    """
+    cursor.execute("""
+    SELECT events.id, events.date, events.max_capacity, IFNULL(event_registration_stats.registered_count, 0) AS registered_count
+    FROM events
+    LEFT JOIN event_registration_stats ON event_registration_stats.event_id = events.id
+    WHERE events.id = %s
+    FOR UPDATE
+    """, (event_id,))
+    event = cursor.fetchone()
+    if not event:
+        raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
+    return event
+
+def adjust_registration_counters(cursor, event_id, registered_delta=0, canceled_delta=0):
+    """Actualiza los contadores de inscripciones de un evento dentro de la transacción en curso."""
+    cursor.execute("""
+    INSERT INTO event_registration_stats (event_id, registered_count, canceled_count)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        registered_count = registered_count + VALUES(registered_count),
+        canceled_count = canceled_count + VALUES(canceled_count)
+    """, (event_id, registered_delta, canceled_delta))
+
+def check_registration_allowed(event, registered_count, user_registered, user_canceled, now):
+    """
+    Valida una inscripción contra el estado bloqueado del evento.
+
+    Raises:
+        HTTPException: 400 si el evento ya pasó o se superó el límite de cancelaciones,
+            409 si el usuario ya está inscrito o no quedan plazas.
+    """
+    if event["date"] < now:
+        raise HTTPException(status_code=400, detail="Cannot register for past events")
+    if user_registered > 0:
+        raise HTTPException(status_code=409, detail="User is already registered for this event")
+    if user_canceled >= MAX_CANCELLATIONS:
+        raise HTTPException(status_code=400, detail="Ha cancelado su inscripción para este evento dos veces y no puede registrarse nuevamente. Comuníquese con el servicio de asistencia para obtener ayuda.")
+    if registered_count >= event["max_capacity"]:
+        raise HTTPException(status_code=409, detail="Event is full, no available slots left")
+
+def register_user_for_event(user_id, event_id):
+    """
+    Inscribe a un usuario en un evento en una sola transacción sobre una sola conexión.
+
+    Bloquea el evento junto con su contador de plazas ocupadas, obtiene el historial del
+    usuario para ese evento, valida fecha, duplicados, límite de cancelaciones y capacidad,
+    inserta la inscripción e incrementa el contador.
+
+    Returns:
+        dict: La inscripción creada (id, user_id, event_id, date, status).
+    """
+    now = datetime.now()
+    with transaction() as cursor:
+        event = lock_event(cursor, event_id)
+        cursor.execute("""
+        SELECT
+            COALESCE(SUM(status = 'registered'), 0) AS user_registered,
+            COALESCE(SUM(status = 'canceled'), 0) AS user_canceled
+        FROM registrations
+        WHERE user_id = %s AND event_id = %s
+        """, (user_id, event_id))
+        history = cursor.fetchone()
+        check_registration_allowed(event, event["registered_count"], history["user_registered"], history["user_canceled"], now)
+
+        try:
+            cursor.execute(
+                "INSERT INTO registrations (user_id, event_id, date, status) VALUES (%s, %s, %s, 'registered')",
+                (user_id, event_id, now)
+            )
+        except IntegrityError as err:
+            if err.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+                raise HTTPException(status_code=404, detail="User not found")
+            raise
+        registration_id = cursor.lastrowid
+        adjust_registration_counters(cursor, event_id, registered_delta=1)
+
+        return {"id": registration_id, "user_id": user_id, "event_id": event_id, "date": now, "status": "registered"}
+
+def register_users_for_event_batch(event_id, user_ids):
+    """
+    Concede plazas de un evento a un lote de usuarios en una sola transacción.
+
+    Bloquea el evento una vez, obtiene el historial de todos los usuarios del lote con una
+    sola consulta, valida cada solicitud en orden de llegada (consumiendo capacidad) e
+    inserta todas las inscripciones aceptadas con un único INSERT de varias filas.
+
+    Args:
+        event_id (int): Evento al que pertenece el lote.
+        user_ids (list[int]): Usuarios en orden de admisión.
+
+    Returns:
+        list[dict]: Un resultado por usuario, en el mismo orden, con `status`
+            ('confirmed' o 'rejected') y la inscripción o el error correspondiente.
+    """
+    now = datetime.now()
+    results = [None] * len(user_ids)
+    with transaction() as cursor:
+        try:
+            event = lock_event(cursor, event_id)
+        except HTTPException as exc:
+            return [{"status": "rejected", "status_code": exc.status_code, "detail": exc.detail} for _ in user_ids]
+
+        unique_users = list(dict.fromkeys(user_ids))
+        placeholders = ", ".join(["%s"] * len(unique_users))
+        cursor.execute(f"""
+        SELECT users.id AS user_id,
+            COALESCE(SUM(registrations.status = 'registered'), 0) AS user_registered,
+            COALESCE(SUM(registrations.status = 'canceled'), 0) AS user_canceled
+        FROM users
+        LEFT JOIN registrations ON registrations.user_id = users.id AND registrations.event_id = %s
+        WHERE users.id IN ({placeholders})
+        GROUP BY users.id
+        """, (event_id, *unique_users))
+        history = {row["user_id"]: row for row in cursor.fetchall()}
+        registered_count = event["registered_count"]
+
+        accepted = []
+        for index, user_id in enumerate(user_ids):
+            user_history = history.get(user_id)
+            if user_history is None:
+                results[index] = {"status": "rejected", "status_code": 404, "detail": "User not found"}
+                continue
+            try:
+                check_registration_allowed(event, registered_count, user_history["user_registered"], user_history["user_canceled"], now)
+            except HTTPException as exc:
+                results[index] = {"status": "rejected", "status_code": exc.status_code, "detail": exc.detail}
+                continue
+            # Un mismo usuario repetido en el lote cuenta como ya inscrito
+            user_history["user_registered"] = 1
+            registered_count += 1
+            accepted.append(index)
+
+        if accepted:
+            cursor.executemany(
+                "INSERT INTO registrations (user_id, event_id, date, status) VALUES (%s, %s, %s, 'registered')",
+                [(user_ids[index], event_id, now) for index in accepted]
+            )
+            # Los ids de un INSERT de varias filas no tienen por qué ser consecutivos: se releen.
+            # Cada usuario aceptado aparece una sola vez y el evento sigue bloqueado, así que
+            # (event_id, user_id, id >= primer id) identifica la inscripción recién creada
+            accepted_users = [user_ids[index] for index in accepted]
+            placeholders = ", ".join(["%s"] * len(accepted_users))
+            cursor.execute(f"""
+            SELECT id, user_id FROM registrations
+            WHERE event_id = %s AND user_id IN ({placeholders}) AND id >= %s
+            """, (event_id, *accepted_users, cursor.lastrowid))
+            registration_ids = {row["user_id"]: row["id"] for row in cursor.fetchall()}
+            for index in accepted:
+                results[index] = {
+                    "status": "confirmed",
+                    "registration": {"id": registration_ids[user_ids[index]], "user_id": user_ids[index], "event_id": event_id, "date": now, "status": "registered"}
+                }
+            adjust_registration_counters(cursor, event_id, registered_delta=len(accepted))
+    return results
+
+def cancel_registration(registration_id):
+    """
+    Cancela una inscripción ('registered' -> 'canceled') y actualiza los contadores del
+    evento en la misma transacción.
+
+    Returns:
+        dict: La inscripción cancelada.
+    """
+    with transaction() as cursor:
+        cursor.execute("""
+        SELECT registrations.*, events.date AS event_date
+        FROM registrations
+        LEFT JOIN events ON registrations.event_id = events.id
+        WHERE registrations.id = %s
+        FOR UPDATE
+        """, (registration_id,))
+        registration = cursor.fetchone()
+        if not registration:
+            raise HTTPException(status_code=404, detail=REGISTRATION_NOT_FOUND)
+
+        # Verifica si el evento ya pasó
+        event_date = registration.pop("event_date")
+        if event_date is None:
+            raise HTTPException(status_code=404, detail=EVENT_NOT_FOUND)
+        if event_date < datetime.now():
+            raise HTTPException(status_code=400, detail="Cannot update registration for past events")
+
+        # Solo permite cambiar de "registered" a "canceled"
+        if registration["status"] != "registered":
+            raise HTTPException(status_code=400, detail="Only registered registrations can be canceled")
+
+        cursor.execute("UPDATE registrations SET status = 'canceled' WHERE id = %s", (registration_id,))
+        adjust_registration_counters(cursor, registration["event_id"], registered_delta=-1, canceled_delta=1)
+
+        registration["status"] = "canceled"
+        return registration
+
+def delete_registration_record(registration_id):
+    """Elimina una inscripción y descuenta su estado de los contadores del evento."""
+    with transaction() as cursor:
+        cursor.execute("SELECT event_id, status FROM registrations WHERE id = %s FOR UPDATE", (registration_id,))
+        registration = cursor.fetchone()
+        if not registration:
+            raise HTTPException(status_code=404, detail=REGISTRATION_NOT_FOUND)
+
+        cursor.execute("DELETE FROM registrations WHERE id = %s", (registration_id,))
+        if registration["event_id"] is not None:
+            if registration["status"] == "registered":
+                adjust_registration_counters(cursor, registration["event_id"], registered_delta=-1)
+            else:
+                adjust_registration_counters(cursor, registration["event_id"], canceled_delta=-1)
+
+def discount_user_registrations(cursor, user_id):
+    """
+    Descuenta de los contadores de cada evento las inscripciones de un usuario, antes de
+    que el borrado del usuario las elimine en cascada.
+    """
+    cursor.execute("""
+    UPDATE event_registration_stats
+    JOIN (
+        SELECT event_id, SUM(status = 'registered') AS registered, SUM(status = 'canceled') AS canceled
+        FROM registrations
+        WHERE user_id = %s AND event_id IS NOT NULL
+        GROUP BY event_id
+    ) user_registrations ON user_registrations.event_id = event_registration_stats.event_id
+    SET event_registration_stats.registered_count = event_registration_stats.registered_count - user_registrations.registered,
+        event_registration_stats.canceled_count = event_registration_stats.canceled_count - user_registrations.canceled
+    """, (user_id,))
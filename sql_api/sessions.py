@@ -0,0 +1,161 @@
+"""
+Tokens de sesión firmados (HMAC-SHA256) que emite el login.
+
+El token lleva la identidad del usuario (id, nombre para mostrar y si es administrador) y
+su caducidad, de modo que validar una sesión no requiere consultar la base de datos en cada
+petición: basta con comprobar la firma, la caducidad y una pequeña lista de revocación, que
+se guarda en la tabla `session_revocations` y cada proceso relee cada pocos segundos.
+
+Formato: `<payload base64url>.<firma base64url>`, donde el payload es JSON con
+`sub` (id), `name`, `adm`, `iat`, `exp` y `jti` (id único del token).
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+from fastapi import Header, HTTPException, Depends
+from database import execute_query, execute_non_query
+
+SESSION_TTL = int(os.getenv("SESSION_TTL", "28800"))  # Segundos de validez de un token (8 h)
+SESSION_REVOCATIONS_REFRESH = float(os.getenv("SESSION_REVOCATIONS_REFRESH", "5"))  # Segundos entre lecturas de session_revocations
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    # Un secreto aleatorio solo vale para este proceso: cada worker o reinicio invalidaría todas las
+    # sesiones, así que solo se admite en desarrollo (APP_ENV=development)
+    if os.getenv("APP_ENV") != "development":
+        raise RuntimeError("SESSION_SECRET is not set; define it (e.g. in .env) or set APP_ENV=development")
+    print("SESSION_SECRET no está definido: se usa un secreto aleatorio temporal (APP_ENV=development)")
+    SESSION_SECRET = secrets.token_urlsafe(32)
+_SECRET_KEY = SESSION_SECRET.encode()
+
+def _b64encode(data: bytes):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(data: str):
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str):
+    return _b64encode(hmac.new(_SECRET_KEY, payload.encode(), hashlib.sha256).digest())
+
+class RevocationList:
+    """
+    Tokens revocados antes de caducar (cierre de sesión) y usuarios cuyos tokens anteriores
+    a una fecha dejan de valer (contraseña cambiada, usuario borrado).
+
+    Las revocaciones se escriben en `session_revocations`, de modo que valen en todos los
+    workers y sobreviven a un reinicio. Cada proceso guarda una copia en memoria que relee
+    como mucho cada `refresh_interval` segundos (como los eventos de alta demanda): otro
+    worker tarda a lo sumo ese intervalo en rechazar un token revocado. Solo se guardan
+    entradas hasta la caducidad máxima de un token, por lo que la tabla se mantiene pequeña.
+    """
+
+    def __init__(self, refresh_interval=SESSION_REVOCATIONS_REFRESH):
+        self.refresh_interval = refresh_interval
+        self._tokens = {}  # jti -> exp
+        self._users = {}  # user_id -> instante a partir del cual se emitieron los tokens válidos
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def revoke_token(self, jti, exp, user_id=None):
+        self._store(jti, user_id, time.time(), exp)
+        with self._lock:
+            self._tokens[jti] = exp
+            self._loaded_at = None  # Una relectura concurrente pudo empezar antes de la escritura
+
+    def revoke_user(self, user_id):
+        now = time.time()
+        self._store(None, user_id, now, now + SESSION_TTL)
+        with self._lock:
+            self._users[user_id] = max(self._users.get(user_id, 0), now)
+            self._loaded_at = None
+
+    def is_revoked(self, claims):
+        self._refresh()
+        with self._lock:
+            if claims["jti"] in self._tokens:
+                return True
+            not_before = self._users.get(claims["sub"])
+            return not_before is not None and claims["iat"] <= not_before
+
+    def _store(self, jti, user_id, revoked_at, expires_at):
+        # Las filas caducadas se borran al escribir una nueva (índice por expires_at)
+        execute_non_query("DELETE FROM session_revocations WHERE expires_at <= %s", (revoked_at,))
+        execute_non_query("""
+        INSERT INTO session_revocations (jti, user_id, revoked_at, expires_at) VALUES (%s, %s, %s, %s)
+        """, (jti, user_id, revoked_at, expires_at))
+
+    def _refresh(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at <= self.refresh_interval:
+            return
+        try:
+            rows = execute_query("SELECT jti, user_id, revoked_at, expires_at FROM session_revocations WHERE expires_at > %s", (time.time(),))
+        except HTTPException as exc:
+            # Sin base de datos se sigue usando la última copia leída y se reintenta en la próxima validación
+            print(f"No se pudieron leer las revocaciones de sesión: {exc.detail}")
+            return
+        tokens, users = {}, {}
+        for row in rows:
+            if row["jti"] is not None:
+                tokens[row["jti"]] = row["expires_at"]
+            else:
+                users[row["user_id"]] = max(users.get(row["user_id"], 0), row["revoked_at"])
+        with self._lock:
+            self._tokens, self._users = tokens, users
+            self._loaded_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {"revoked_tokens": len(self._tokens), "revoked_users": len(self._users), "refresh_interval_seconds": self.refresh_interval}
+
+revocations = RevocationList()
+
+def issue_token(user_id, full_name, is_admin):
+    """
+    Emite un token de sesión.
+
+    Returns:
+        tuple[str, dict]: El token y sus claims.
+    """
+    now = time.time()
+    claims = {"sub": user_id, "name": full_name, "adm": bool(is_admin), "iat": now, "exp": int(now) + SESSION_TTL, "jti": secrets.token_urlsafe(12)}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}", claims
+
+def decode_token(token):
+    """
+    Valida un token y devuelve sus claims.
+
+    Raises:
+        HTTPException: 401 si el token está mal formado, la firma no coincide, ha caducado o fue revocado.
+    """
+    payload, _, signature = token.partition(".")
+    # Se comparan bytes: compare_digest rechaza (TypeError) las cadenas con caracteres no ASCII
+    if not signature or not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+        raise HTTPException(status_code=401, detail="Invalid session token")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid session token")
+    if claims["exp"] <= time.time():
+        raise HTTPException(status_code=401, detail="Session expired")
+    if revocations.is_revoked(claims):
+        raise HTTPException(status_code=401, detail="Session revoked")
+    return claims
+
+def current_session(authorization: Optional[str] = Header(None)):
+    """Dependencia: claims de la sesión del encabezado `Authorization: Bearer <token>` (401 si falta o no es válida)."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Missing session token", headers={"WWW-Authenticate": "Bearer"})
+    return decode_token(token.strip())
+
+def admin_session(claims: dict = Depends(current_session)):
+    """Dependencia: como `current_session`, pero exige la claim de administrador (403 si no la tiene)."""
+    if not claims["adm"]:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return claims
@@ -0,0 +1,218 @@
+"""
+Tablas de resumen para los endpoints de conteo y facetas.
+
+Los endpoints de escritura mantienen estas tablas de forma incremental, en la misma
+transacción que la escritura sobre las tablas base. Este módulo también permite
+reconstruirlas por completo y verificar su consistencia.
+
+Uso:
+    python summaries.py check     # Compara las tablas de resumen con las tablas base
+    python summaries.py rebuild   # Reconstruye todas las tablas de resumen
+"""
+import sys
+from collections import Counter
+from database import transaction, pooled_connection
+
+# Definición de cada tabla de resumen: clave, columnas de valor y consulta de recálculo completo
+SUMMARY_TABLES = {
+    "event_counts_by_country": {
+        "key": ("country",),
+        "values": ("event_count",),
+        "source": "SELECT country, COUNT(*) AS event_count FROM events GROUP BY country",
+    },
+    "event_counts_by_organizer": {
+        "key": ("organizer_id",),
+        "values": ("event_count",),
+        "source": "SELECT organizer_id, COUNT(*) AS event_count FROM events WHERE organizer_id IS NOT NULL GROUP BY organizer_id",
+    },
+    "event_counts_by_day": {
+        "key": ("event_day",),
+        "values": ("event_count",),
+        "source": "SELECT DATE(date) AS event_day, COUNT(*) AS event_count FROM events GROUP BY event_day",
+    },
+    "event_counts_by_category": {
+        "key": ("category_id",),
+        "values": ("event_count",),
+        "source": "SELECT category_id, COUNT(*) AS event_count FROM event_categories GROUP BY category_id",
+    },
+    "event_feedback_stats": {
+        "key": ("event_id",),
+        "values": ("comment_count", "rating_sum", "rating_count"),
+        "source": """
+        SELECT event_id, COUNT(*) AS comment_count, IFNULL(SUM(rating_value), 0) AS rating_sum, COUNT(rating_value) AS rating_count
+        FROM feedbacks WHERE event_id IS NOT NULL GROUP BY event_id
+        """,
+    },
+    "event_registration_stats": {
+        "key": ("event_id",),
+        "values": ("registered_count", "canceled_count"),
+        "source": """
+        SELECT event_id, SUM(status = 'registered') AS registered_count, SUM(status = 'canceled') AS canceled_count
+        FROM registrations WHERE event_id IS NOT NULL GROUP BY event_id
+        """,
+    },
+}
+
+def _upsert_count(cursor, table, key_column, key_value, delta):
+    cursor.execute(f"""
+    INSERT INTO {table} ({key_column}, event_count) VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE event_count = event_count + VALUES(event_count)
+    """, (key_value, delta))
+
+def apply_event_delta(cursor, event, delta):
+    """
+    Suma `delta` (+1 al crear, -1 al borrar) a los conteos por país, organizador y día de un evento.
+
+    Args:
+        event (dict): Debe contener `country`, `organizer_id` y `date`.
+    """
+    _upsert_count(cursor, "event_counts_by_country", "country", event["country"], delta)
+    if event["organizer_id"] is not None:
+        _upsert_count(cursor, "event_counts_by_organizer", "organizer_id", event["organizer_id"], delta)
+    _upsert_count(cursor, "event_counts_by_day", "event_day", event["date"].date(), delta)
+
+def apply_event_deltas(cursor, events, delta=1):
+    """
+    Versión por lotes de `apply_event_delta`: agrega los eventos por país, organizador y día
+    y actualiza cada tabla de resumen con un único INSERT de varias filas.
+    """
+    by_country = Counter(event["country"] for event in events)
+    by_organizer = Counter(event["organizer_id"] for event in events if event["organizer_id"] is not None)
+    by_day = Counter(event["date"].date() for event in events)
+    for table, key_column, counts in (
+        ("event_counts_by_country", "country", by_country),
+        ("event_counts_by_organizer", "organizer_id", by_organizer),
+        ("event_counts_by_day", "event_day", by_day),
+    ):
+        _upsert_counts(cursor, table, key_column, counts, delta)
+
+def _upsert_counts(cursor, table, key_column, counts, delta):
+    if not counts:
+        return
+    cursor.executemany(f"""
+    INSERT INTO {table} ({key_column}, event_count) VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE event_count = event_count + VALUES(event_count)
+    """, [(key, count * delta) for key, count in counts.items()])
+
+def apply_event_change(cursor, old_event, new_event):
+    """Mueve un evento de las facetas de sus valores anteriores a los nuevos, si cambiaron."""
+    if old_event["country"] != new_event["country"]:
+        _upsert_count(cursor, "event_counts_by_country", "country", old_event["country"], -1)
+        _upsert_count(cursor, "event_counts_by_country", "country", new_event["country"], 1)
+    if old_event["organizer_id"] != new_event["organizer_id"]:
+        if old_event["organizer_id"] is not None:
+            _upsert_count(cursor, "event_counts_by_organizer", "organizer_id", old_event["organizer_id"], -1)
+        if new_event["organizer_id"] is not None:
+            _upsert_count(cursor, "event_counts_by_organizer", "organizer_id", new_event["organizer_id"], 1)
+    if old_event["date"].date() != new_event["date"].date():
+        _upsert_count(cursor, "event_counts_by_day", "event_day", old_event["date"].date(), -1)
+        _upsert_count(cursor, "event_counts_by_day", "event_day", new_event["date"].date(), 1)
+
+def apply_category_delta(cursor, category_id, delta):
+    """Suma `delta` al conteo de eventos de una categoría."""
+    _upsert_count(cursor, "event_counts_by_category", "category_id", category_id, delta)
+
+def apply_category_deltas(cursor, category_ids, delta=1):
+    """Versión por lotes de `apply_category_delta` (un id repetido cuenta una vez por aparición)."""
+    _upsert_counts(cursor, "event_counts_by_category", "category_id", Counter(category_ids), delta)
+
+def discount_event_categories(cursor, event_id):
+    """Descuenta un evento de los conteos de sus categorías antes de borrarlo (los vínculos se borran en cascada)."""
+    cursor.execute("""
+    UPDATE event_counts_by_category
+    JOIN event_categories ON event_categories.category_id = event_counts_by_category.category_id
+    SET event_counts_by_category.event_count = event_counts_by_category.event_count - 1
+    WHERE event_categories.event_id = %s
+    """, (event_id,))
+
+def apply_feedback_delta(cursor, event_id, rating_value, delta):
+    """Suma (`delta` = 1) o resta (`delta` = -1) un comentario a las estadísticas de su evento."""
+    if event_id is None:
+        return
+    cursor.execute("""
+    INSERT INTO event_feedback_stats (event_id, comment_count, rating_sum, rating_count) VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        comment_count = comment_count + VALUES(comment_count),
+        rating_sum = rating_sum + VALUES(rating_sum),
+        rating_count = rating_count + VALUES(rating_count),
+        updated_at = CURRENT_TIMESTAMP(6)
+    """, (event_id, delta, (rating_value or 0) * delta, delta if rating_value is not None else 0))
+
+def discount_user_feedbacks(cursor, user_id):
+    """Descuenta los comentarios de un usuario antes de que su borrado los elimine en cascada."""
+    cursor.execute("""
+    UPDATE event_feedback_stats
+    JOIN (
+        SELECT event_id, COUNT(*) AS comments, IFNULL(SUM(rating_value), 0) AS ratings, COUNT(rating_value) AS rated
+        FROM feedbacks
+        WHERE user_id = %s AND event_id IS NOT NULL
+        GROUP BY event_id
+    ) user_feedbacks ON user_feedbacks.event_id = event_feedback_stats.event_id
+    SET event_feedback_stats.comment_count = event_feedback_stats.comment_count - user_feedbacks.comments,
+        event_feedback_stats.rating_sum = event_feedback_stats.rating_sum - user_feedbacks.ratings,
+        event_feedback_stats.rating_count = event_feedback_stats.rating_count - user_feedbacks.rated,
+        event_feedback_stats.updated_at = CURRENT_TIMESTAMP(6)
+    """, (user_id,))
+
+def rebuild_summaries(tables=None):
+    """
+    Reconstruye por completo las tablas de resumen a partir de las tablas base.
+
+    Cada tabla se vacía y se vuelve a llenar con INSERT ... SELECT dentro de una transacción,
+    de modo que los lectores nunca ven una tabla a medio reconstruir.
+    """
+    for table in tables or SUMMARY_TABLES:
+        definition = SUMMARY_TABLES[table]
+        columns = ", ".join(definition["key"] + definition["values"])
+        with transaction() as cursor:
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(f"INSERT INTO {table} ({columns}) {definition['source']}")
+        print(f"Tabla de resumen reconstruida: {table}")
+
+def check_summaries():
+    """
+    Compara cada tabla de resumen con el recálculo desde las tablas base.
+
+    Las filas de resumen con todos sus valores a cero equivalen a filas ausentes.
+
+    Returns:
+        list[dict]: Diferencias encontradas (tabla, clave, valor esperado y valor almacenado).
+    """
+    mismatches = []
+    with pooled_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for table, definition in SUMMARY_TABLES.items():
+                key, values = definition["key"], definition["values"]
+                cursor.execute(definition["source"])
+                expected = {tuple(row[column] for column in key): tuple(int(row[column]) for column in values) for row in cursor.fetchall()}
+                cursor.execute(f"SELECT {', '.join(key + values)} FROM {table}")
+                stored = {tuple(row[column] for column in key): tuple(int(row[column]) for column in values) for row in cursor.fetchall()}
+                zero = tuple(0 for _ in values)
+                for row_key in expected.keys() | stored.keys():
+                    if expected.get(row_key, zero) != stored.get(row_key, zero):
+                        mismatches.append({
+                            "table": table,
+                            "key": dict(zip(key, row_key)),
+                            "expected": dict(zip(values, expected.get(row_key, zero))),
+                            "stored": dict(zip(values, stored.get(row_key, zero))),
+                        })
+        finally:
+            cursor.close()
+    return mismatches
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "rebuild":
+        rebuild_summaries(sys.argv[2:] or None)
+    elif command == "check":
+        differences = check_summaries()
+        for difference in differences:
+            print(f"{difference['table']} {difference['key']}: esperado {difference['expected']}, almacenado {difference['stored']}")
+        if differences:
+            print(f"{len(differences)} diferencia(s) encontradas; ejecute 'python summaries.py rebuild' para repararlas")
+            sys.exit(1)
+        print("Las tablas de resumen son consistentes")
+    else:
+        print(__doc__)
+        sys.exit(2)
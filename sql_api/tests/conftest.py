@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los módulos de la API se importan por su nombre, como en el contenedor (WORKDIR sql_api)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# sessions.py exige un secreto para firmar los tokens
+os.environ.setdefault("SESSION_SECRET", "test-session-secret")
@@ -0,0 +1,35 @@
+"""
+Stub local de la API del modelo para las pruebas del endpoint dinámico de estadísticas.
+
+Imita la parte del cliente `AsyncOpenAI` que usa `dynamic_statistics`
+(`beta.chat.completions.parse`) y devuelve, en orden, las respuestas preparadas: un plan
+(`AnswerChatGPT`), None (el modelo se niega a responder) o una excepción que se lanza.
+"""
+from types import SimpleNamespace
+
+class StubCompletions:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def parse(self, **kwargs):
+        self.calls.append(kwargs)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        refusal = None if response is not None else "I can't help with that"
+        message = SimpleNamespace(parsed=response, refusal=refusal)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class StubModelClient:
+    def __init__(self, *responses):
+        self.completions = StubCompletions(responses)
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=self.completions))
+        self.closed = False
+
+    @property
+    def calls(self):
+        return self.completions.calls
+
+    async def close(self):
+        self.closed = True
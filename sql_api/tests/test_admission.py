@@ -0,0 +1,65 @@
+import asyncio
+import admission
+from admission import AdmissionQueue
+
+def test_resolved_tickets_behind_a_pending_one_are_pruned(monkeypatch):
+    async def scenario():
+        queue = AdmissionQueue(ticket_ttl=900, max_tickets=3)
+        # Sin workers: los tickets se resuelven a mano
+        monkeypatch.setattr(queue, "_run_worker", lambda event_id, batch_size: asyncio.sleep(0))
+        pending = queue.enqueue(1, 1, 10)["ticket_id"]
+        resolved = [queue.enqueue(1, user_id, 10)["ticket_id"] for user_id in (2, 3)]
+        for ticket_id in resolved:
+            queue._resolve(ticket_id, {"status": "confirmed"})
+
+        newest = queue.enqueue(1, 4, 10)["ticket_id"]
+
+        assert queue.get_ticket(pending)["status"] == "pending"
+        assert queue.get_ticket(resolved[0]) is None
+        assert queue.get_ticket(resolved[1])["status"] == "confirmed"
+        assert queue.get_ticket(newest)["status"] == "pending"
+        await queue.close()
+
+    asyncio.run(scenario())
+
+def test_expired_tickets_are_pruned_and_pending_ones_kept(monkeypatch):
+    async def scenario():
+        clock = [100.0]
+        monkeypatch.setattr(admission.time, "monotonic", lambda: clock[0])
+        queue = AdmissionQueue(ticket_ttl=10, max_tickets=100)
+        monkeypatch.setattr(queue, "_run_worker", lambda event_id, batch_size: asyncio.sleep(0))
+        pending = queue.enqueue(1, 1, 10)["ticket_id"]
+        resolved = queue.enqueue(1, 2, 10)["ticket_id"]
+        queue._resolve(resolved, {"status": "rejected", "detail": "Event is full"})
+
+        clock[0] += 11
+        queue.enqueue(1, 3, 10)
+
+        assert queue.get_ticket(resolved) is None
+        assert queue.get_ticket(pending)["status"] == "pending"
+        await queue.close()
+
+    asyncio.run(scenario())
+
+def test_pending_ticket_is_reused_and_reports_its_position(monkeypatch):
+    async def scenario():
+        queue = AdmissionQueue()
+        monkeypatch.setattr(queue, "_run_worker", lambda event_id, batch_size: asyncio.sleep(0))
+        first = queue.enqueue(1, 1, 10)
+        second = queue.enqueue(1, 2, 10)
+        assert queue.enqueue(1, 1, 10)["ticket_id"] == first["ticket_id"]
+        queue._resolve(first["ticket_id"], {"status": "confirmed"})
+        assert queue.get_ticket(second["ticket_id"])["position"] == 1
+        await queue.close()
+
+    asyncio.run(scenario())
+
+def test_close_cancels_running_workers(monkeypatch):
+    async def scenario():
+        queue = AdmissionQueue(batch_window=60)
+        queue.enqueue(1, 1, 10)
+        worker = queue._workers[1]
+        await queue.close()
+        assert worker.cancelled()
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+import pytest
+from mysql.connector import IntegrityError, errorcode
+import bulk
+
+def duplicate_entry():
+    return IntegrityError(msg="Duplicate entry 'jazz' for key 'categories.name'", errno=errorcode.ER_DUP_ENTRY)
+
+class CategoryCursor:
+    """Cursor que simula INSERT INTO categories con un índice único sin distinguir mayúsculas e ids con saltos."""
+
+    def __init__(self, existing=()):
+        self.names = {name.lower(): index + 1 for index, name in enumerate(existing)}
+        self.next_id = 100
+        self.lastrowid = None
+        self.selected = []
+
+    def _insert(self, name):
+        if name.lower() in self.names:
+            raise duplicate_entry()
+        self.next_id += 2  # auto_increment_increment = 2: los ids no son consecutivos
+        self.names[name.lower()] = self.next_id
+        return self.next_id
+
+    def executemany(self, query, rows):
+        if len({name.lower() for name, in rows}) < len(rows) or any(name.lower() in self.names for name, in rows):
+            raise duplicate_entry()  # La sentencia se revierte entera
+        ids = [self._insert(name) for name, in rows]
+        self.lastrowid = ids[0]
+
+    def execute(self, query, params=()):
+        if query.startswith("INSERT"):
+            self.lastrowid = self._insert(params[0])
+        else:
+            *names, first_id = params
+            self.selected = sorted(self.names[name.lower()] for name in names if self.names[name.lower()] >= first_id)
+
+    def fetchall(self):
+        return [{"id": row_id} for row_id in self.selected]
+
+INSERT = "INSERT INTO categories (name) VALUES (%s)"
+ID_QUERY = "SELECT id FROM categories WHERE name IN ({placeholders}) AND id >= %s ORDER BY id"
+
+def test_ids_are_read_back_instead_of_assumed_consecutive():
+    cursor = CategoryCursor()
+    results = bulk._insert_rows(cursor, INSERT, [("rock",), ("jazz",)], "Category already exists", ID_QUERY, ["rock", "jazz"])
+    assert [result["id"] for result in results] == [102, 104]
+
+def test_conflicting_chunk_falls_back_to_row_by_row(monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_CHUNK_SIZE", 2)
+    cursor = CategoryCursor(existing=["Jazz"])
+    rows = [("rock",), ("jazz",), ("pop",), ("POP",), ("folk",)]
+    results = bulk._insert_rows(cursor, INSERT, rows, "Category already exists", ID_QUERY, [name for name, in rows])
+    assert [result["status_code"] for result in results] == [201, 400, 201, 400, 201]
+    assert results[1]["detail"] == "Category already exists"
+    assert all(result["id"] for result in results if result["status"] == "created")
+
+def test_other_integrity_errors_are_not_swallowed():
+    class FailingCursor(CategoryCursor):
+        def executemany(self, query, rows):
+            raise IntegrityError(msg="Column 'name' cannot be null", errno=errorcode.ER_BAD_NULL_ERROR)
+
+    with pytest.raises(IntegrityError):
+        bulk._insert_rows(FailingCursor(), INSERT, [(None,)], "Category already exists", ID_QUERY, [None])
+
+def test_missing_reference_is_a_404():
+    err = IntegrityError(msg="Cannot add or update a child row: a foreign key constraint fails (`db`.`events`, CONSTRAINT `fk` "
+                             "FOREIGN KEY (`organizer_id`) REFERENCES `organizers` (`id`))", errno=errorcode.ER_NO_REFERENCED_ROW_2)
+    assert bulk._rejection(err, "Event already exists") == {"status": "rejected", "status_code": 404, "detail": "Organizer not found"}
@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+from fastapi import HTTPException, Response
+import dynamic_statistics
+from dynamic_statistics import AnswerChatGPT, Question, generate_statistics_endpoint, statistics_plan_cache
+from guarded_sql import RESULT_TRUNCATED_HEADER
+from model_stub import StubModelClient
+
+SQL_PLAN = AnswerChatGPT(response_type="sql", sql_query="SELECT COUNT(*) AS total FROM users")
+CHART_PLAN = AnswerChatGPT(response_type="chart", sql_query="SELECT country, COUNT(*) AS total FROM users GROUP BY country",
+                           chart_type="bar", x_axis="country", y_axis="total")
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    statistics_plan_cache.set_enabled(True)
+    statistics_plan_cache.clear()
+    yield
+    dynamic_statistics.set_openai_client(None)
+    statistics_plan_cache.clear()
+
+@pytest.fixture
+def executed(monkeypatch):
+    """Sustituye la ejecución de las consultas generadas y registra las consultas recibidas."""
+    queries = []
+
+    async def execute_generated_query(sql, columnar=False):
+        queries.append(sql)
+        if columnar:
+            return {"names": ["country", "total"], "types": [253, 8], "values": [["ES"], [3]]}, False
+        return [{"total": 3}], False
+
+    monkeypatch.setattr(dynamic_statistics, "execute_generated_query", execute_generated_query)
+    return queries
+
+def ask(question):
+    response = Response()
+    result = asyncio.run(generate_statistics_endpoint(Question(question=question), response))
+    return result, response
+
+def test_cache_miss_asks_the_model_and_stores_the_plan(executed):
+    model = StubModelClient(SQL_PLAN)
+    dynamic_statistics.set_openai_client(model)
+
+    result, _ = ask("¿Cuántos usuarios hay?")
+
+    assert result == [{"total": 3}]
+    assert len(model.calls) == 1
+    assert executed == [SQL_PLAN.sql_query]
+    assert statistics_plan_cache.stats()["entries"] == 1
+
+def test_cache_hit_skips_the_model_for_an_equivalent_question(executed):
+    model = StubModelClient(SQL_PLAN)
+    dynamic_statistics.set_openai_client(model)
+
+    ask("¿Cuántos usuarios hay?")
+    result, _ = ask("  cuántos   USUARIOS hay ")
+
+    assert result == [{"total": 3}]
+    assert len(model.calls) == 1
+    assert executed == [SQL_PLAN.sql_query] * 2
+    assert statistics_plan_cache.stats()["hits"] == 1
+
+def test_rejected_plan_is_not_cached(monkeypatch):
+    async def execute_generated_query(sql, columnar=False):
+        raise HTTPException(status_code=422, detail="Generated query rejected: only SELECT queries are allowed")
+
+    monkeypatch.setattr(dynamic_statistics, "execute_generated_query", execute_generated_query)
+    model = StubModelClient(SQL_PLAN, SQL_PLAN)
+    dynamic_statistics.set_openai_client(model)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            ask("¿Cuántos usuarios hay?")
+        assert error.value.status_code == 422
+
+    assert len(model.calls) == 2
+    assert statistics_plan_cache.stats()["entries"] == 0
+
+def test_chart_render_failure_is_not_cached(executed, monkeypatch):
+    async def render_chart(sql_query, columns, chart_type, x_axis, y_axis):
+        raise HTTPException(status_code=503, detail="Chart renderer busy, retry later")
+
+    monkeypatch.setattr(dynamic_statistics, "render_chart", render_chart)
+    model = StubModelClient(CHART_PLAN)
+    dynamic_statistics.set_openai_client(model)
+
+    with pytest.raises(HTTPException) as error:
+        ask("Usuarios por país")
+
+    assert error.value.status_code == 503
+    assert statistics_plan_cache.stats()["entries"] == 0
+
+def test_chart_plan_returns_the_image(executed, monkeypatch):
+    async def render_chart(sql_query, columns, chart_type, x_axis, y_axis):
+        assert columns["names"] == ["country", "total"]
+        return "aW1hZ2U="
+
+    monkeypatch.setattr(dynamic_statistics, "render_chart", render_chart)
+    dynamic_statistics.set_openai_client(StubModelClient(CHART_PLAN))
+
+    result, _ = ask("Usuarios por país")
+
+    assert result == {"image_base64": "aW1hZ2U=", "sql_query": CHART_PLAN.sql_query}
+    assert statistics_plan_cache.stats()["entries"] == 1
+
+def test_model_refusal_returns_422_and_is_not_cached(executed):
+    model = StubModelClient(None, SQL_PLAN)
+    dynamic_statistics.set_openai_client(model)
+
+    with pytest.raises(HTTPException) as error:
+        ask("¿Cuántos usuarios hay?")
+    assert error.value.status_code == 422
+
+    result, _ = ask("¿Cuántos usuarios hay?")
+    assert result == [{"total": 3}]
+    assert len(model.calls) == 2
+
+def test_model_error_returns_500(executed):
+    dynamic_statistics.set_openai_client(StubModelClient(RuntimeError("connection reset")))
+
+    with pytest.raises(HTTPException) as error:
+        ask("¿Cuántos usuarios hay?")
+
+    assert error.value.status_code == 500
+    assert executed == []
+
+def test_truncated_result_sets_the_header(monkeypatch):
+    async def execute_generated_query(sql, columnar=False):
+        return [{"id": 1}], True
+
+    monkeypatch.setattr(dynamic_statistics, "execute_generated_query", execute_generated_query)
+    dynamic_statistics.set_openai_client(StubModelClient(SQL_PLAN))
+
+    _, response = ask("Lista de usuarios")
+
+    assert response.headers[RESULT_TRUNCATED_HEADER] == "true"
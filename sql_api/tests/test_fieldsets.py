@@ -0,0 +1,47 @@
+import json
+from datetime import datetime
+from typing import Optional
+import pytest
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from fieldsets import parse_fields, projected_item_response, projected_model, projected_response, select_list
+
+class Item(BaseModel):
+    id: int
+    name: str
+    date: datetime
+    price: Optional[float] = None
+    categories: list = []
+
+def test_no_fields_means_no_projection():
+    assert parse_fields(None, Item) is None
+
+def test_fields_follow_model_order_and_include_required_keys():
+    assert parse_fields(" price ,name", Item, required=("date", "id")) == ("id", "name", "date", "price")
+
+@pytest.mark.parametrize("fields", ["name,password", "", " , ", "categories"])
+def test_unknown_excluded_or_empty_fields_are_a_400(fields):
+    with pytest.raises(HTTPException) as exc:
+        parse_fields(fields, Item, excluded=("categories",))
+    assert exc.value.status_code == 400
+
+def test_select_list_qualifies_and_aliases_columns():
+    assert select_list(("id", "name")) == "id, name"
+    assert select_list(("id", "event_date"), table="registrations", column_map={"event_date": "events.date"}) == "registrations.id, events.date AS event_date"
+
+def test_projected_model_keeps_only_the_selected_fields():
+    model = projected_model(Item, ("id", "price"))
+    assert list(model.model_fields) == ["id", "price"]
+    assert model is projected_model(Item, ("id", "price"))
+    assert model(id=1).price is None
+
+def test_projected_response_keeps_headers_already_set():
+    response = Response()
+    response.headers["X-Next-Cursor"] = "abc"
+    result = projected_response(response, projected_model(Item, ("id", "date")), [{"id": 1, "date": datetime(2024, 5, 1), "name": "ignored"}])
+    assert json.loads(result.body) == [{"id": 1, "date": "2024-05-01T00:00:00"}]
+    assert result.headers["X-Next-Cursor"] == "abc"
+
+def test_projected_item_response_returns_only_present_fields():
+    result = projected_item_response(Item, {"id": 1, "price": 9.5})
+    assert json.loads(result.body) == {"id": 1, "price": 9.5}
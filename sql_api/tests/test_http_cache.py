@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from starlette.requests import Request
+from fastapi import Response
+from http_cache import CACHE_CONTROL_REFERENCE, conditional_response, make_etag
+
+LAST_MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 250000)
+
+def make_request(**headers):
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]})
+
+def test_make_etag_is_weak_and_depends_on_every_marker():
+    etag = make_etag("event", 1, LAST_MODIFIED)
+    assert etag.startswith('W/"')
+    assert etag == make_etag("event", 1, LAST_MODIFIED)
+    assert etag != make_etag("event", 2, LAST_MODIFIED)
+
+def test_sets_validators_and_cache_policy():
+    response = Response()
+    etag = make_etag("category", 1)
+    assert conditional_response(make_request(), response, etag, LAST_MODIFIED, CACHE_CONTROL_REFERENCE) is None
+    assert response.headers["ETag"] == etag
+    assert response.headers["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert response.headers["Cache-Control"] == CACHE_CONTROL_REFERENCE
+
+def test_matching_if_none_match_returns_304():
+    etag = make_etag("category", 1)
+    for header in (etag, etag.removeprefix("W/"), f'W/"other", {etag}', "*"):
+        not_modified = conditional_response(make_request(if_none_match=header), Response(), etag, LAST_MODIFIED)
+        assert not_modified is not None and not_modified.status_code == 304
+        assert not_modified.headers["ETag"] == etag
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = make_request(if_none_match='W/"other"', if_modified_since="Wed, 01 May 2024 12:30:15 GMT")
+    assert conditional_response(request, Response(), make_etag("category", 1), LAST_MODIFIED) is None
+
+def test_if_modified_since_ignores_fractional_seconds():
+    request = make_request(if_modified_since="Wed, 01 May 2024 12:30:15 GMT")
+    assert conditional_response(request, Response(), make_etag("category", 1), LAST_MODIFIED).status_code == 304
+    request = make_request(if_modified_since="Wed, 01 May 2024 12:30:14 GMT")
+    assert conditional_response(request, Response(), make_etag("category", 1), LAST_MODIFIED) is None
+
+def test_if_modified_since_without_zone_is_utc():
+    request = make_request(if_modified_since="Wed, 01 May 2024 12:30:15 -0000")
+    assert conditional_response(request, Response(), make_etag("category", 1), LAST_MODIFIED).status_code == 304
+
+def test_aware_last_modified_is_converted_to_utc():
+    response = Response()
+    conditional_response(make_request(), response, make_etag("category", 1), LAST_MODIFIED.replace(tzinfo=timezone.utc))
+    assert response.headers["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+
+def test_invalid_if_modified_since_is_ignored():
+    request = make_request(if_modified_since="yesterday")
+    assert conditional_response(request, Response(), make_etag("category", 1), LAST_MODIFIED) is None
@@ -0,0 +1,90 @@
+import re
+import pytest
+from mysql.connector import Error
+import migrate
+from migrate import apply_migrations, list_migrations, split_statements
+
+class FakeCursor:
+    """Cursor mínimo que registra las sentencias y simula las tablas de control de las migraciones."""
+
+    def __init__(self, database):
+        self.database = database
+        self.rows = []
+        self.with_rows = False
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        self.rows, self.with_rows = [], False
+        if sql.startswith("SELECT GET_LOCK") or sql.startswith("SELECT RELEASE_LOCK"):
+            self.rows, self.with_rows = [(1,)], True
+        elif sql.startswith("SELECT version FROM schema_migrations"):
+            self.rows, self.with_rows = [(version,) for version in self.database.versions], True
+        elif sql.startswith("SELECT statement_number"):
+            self.rows, self.with_rows = [(number,) for version, number in self.database.statements if version == params[0]], True
+        elif sql.startswith("INSERT INTO schema_migrations "):
+            self.database.versions.append(params[0])
+        elif sql.startswith("INSERT INTO schema_migration_statements"):
+            self.database.statements.add(params)
+        elif sql.startswith("DELETE FROM schema_migration_statements"):
+            self.database.statements = {row for row in self.database.statements if row[0] != params[0]}
+        elif not sql.startswith("CREATE TABLE IF NOT EXISTS schema_migration"):
+            if sql in self.database.failing:
+                self.database.failing.discard(sql)
+                raise Error(msg="Simulated failure")
+            self.database.executed.append(sql)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def close(self):
+        pass
+
+class FakeDatabase:
+    def __init__(self):
+        self.versions, self.statements, self.executed, self.failing = [], set(), [], set()
+
+    def close(self):
+        pass
+
+    def cursor(self):
+        return FakeCursor(self)
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    (tmp_path / "0002_second.sql").write_text("-- Segunda\nALTER TABLE b ADD COLUMN x INT;\nALTER TABLE b ADD INDEX idx_x (x);\n")
+    (tmp_path / "0001_first.sql").write_text("CREATE TABLE a (id INT);")
+    (tmp_path / "0010_tenth.sql").write_text("ALTER TABLE c ADD COLUMN y INT;")
+    (tmp_path / "notes.txt").write_text("no es una migración")
+    monkeypatch.setattr(migrate, "MIGRATIONS_DIR", str(tmp_path))
+    database = FakeDatabase()
+    monkeypatch.setattr(migrate, "get_db_connection", lambda: database)
+    return database
+
+def test_migrations_are_listed_in_version_order(database):
+    assert [version for version, _ in list_migrations()] == ["0001_first", "0002_second", "0010_tenth"]
+
+def test_repository_migrations_have_unique_numbers():
+    numbers = [re.match(r"(\d{4})_\w+$", version).group(1) for version, _ in list_migrations()]
+    assert numbers == sorted(set(numbers))
+
+def test_split_statements_skips_comments_and_empty_statements():
+    assert split_statements("-- comentario\nSELECT 1;\n\n;SELECT 2") == ["SELECT 1", "SELECT 2"]
+
+def test_pending_migrations_are_applied_once_in_order(database):
+    assert apply_migrations() == ["0001_first", "0002_second", "0010_tenth"]
+    assert apply_migrations() == []
+    assert database.executed == ["CREATE TABLE a (id INT)", "ALTER TABLE b ADD COLUMN x INT", "ALTER TABLE b ADD INDEX idx_x (x)", "ALTER TABLE c ADD COLUMN y INT"]
+
+def test_failed_migration_resumes_from_the_failing_statement(database):
+    database.failing.add("ALTER TABLE b ADD INDEX idx_x (x)")
+    with pytest.raises(RuntimeError, match="0002_second"):
+        apply_migrations()
+    assert database.versions == ["0001_first"]
+
+    assert apply_migrations() == ["0002_second", "0010_tenth"]
+    # La sentencia que ya se había aplicado no se repite
+    assert database.executed.count("ALTER TABLE b ADD COLUMN x INT") == 1
+    assert database.statements == set()
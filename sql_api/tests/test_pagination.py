@@ -0,0 +1,35 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException, Response
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_predicate, set_next_cursor
+
+def test_cursor_round_trips_datetimes_and_ids():
+    values = (datetime(2024, 5, 1, 18, 30), 42)
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (datetime, int)) == values
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1]), encode_cursor(["yesterday", 1]), encode_cursor({"id": 1})])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, (datetime, int))
+    assert exc.value.status_code == 400
+
+def test_keyset_predicate_expands_to_index_ranges():
+    sql, params = keyset_predicate(("date", "id"), ("2024-05-01", 42))
+    assert sql == "((date > %s) OR (date = %s AND id > %s))"
+    assert params == ("2024-05-01", "2024-05-01", 42)
+
+def test_descending_keyset_predicate():
+    sql, params = keyset_predicate(("id",), (42,), descending=True)
+    assert sql == "((id < %s))"
+    assert params == (42,)
+
+def test_next_cursor_only_for_full_pages():
+    rows = [{"date": datetime(2024, 5, 1), "id": 1}, {"date": datetime(2024, 5, 2), "id": 2}]
+    response = Response()
+    set_next_cursor(response, rows, ("date", "id"), limit=3)
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+    set_next_cursor(response, rows, ("date", "id"), limit=2)
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER], (datetime, int)) == (datetime(2024, 5, 2), 2)
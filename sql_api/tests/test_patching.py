@@ -0,0 +1,55 @@
+import pytest
+from fastapi import HTTPException
+from patching import apply_patch, reject_nulls
+
+class VersionedCursor:
+    """Cursor que simula una fila de `users` con columna version."""
+
+    def __init__(self, row=None):
+        self.row = row
+        self.queries = []
+        self.rowcount = 0
+        self.lastrowid = None
+        self.result = None
+
+    def execute(self, query, params=()):
+        self.queries.append((query, params))
+        if query.startswith("UPDATE"):
+            matches = self.row is not None and params[-2 if "AND version" in query else -1] == self.row["id"]
+            if matches and "AND version" in query and params[-1] != self.row["version"]:
+                matches = False
+            self.rowcount = 1 if matches else 0
+            if matches:
+                self.row["version"] += 1
+                self.lastrowid = self.row["version"]
+        else:
+            self.result = {"version": self.row["version"]} if self.row is not None else None
+
+    def fetchone(self):
+        return self.result
+
+def test_patch_is_a_single_update_returning_the_new_version():
+    cursor = VersionedCursor({"id": 7, "version": 3})
+    assert apply_patch(cursor, "users", 7, {"full_name": "Ada"}, expected_version=3) == 4
+    query, params = cursor.queries[0]
+    assert len(cursor.queries) == 1
+    assert query == "UPDATE users SET full_name = %s, version = LAST_INSERT_ID(version + 1) WHERE id = %s AND version = %s"
+    assert params == ("Ada", 7, 3)
+
+def test_stale_version_is_a_409():
+    cursor = VersionedCursor({"id": 7, "version": 5})
+    with pytest.raises(HTTPException) as exc:
+        apply_patch(cursor, "users", 7, {"full_name": "Ada"}, expected_version=3)
+    assert exc.value.status_code == 409
+    assert "current version is 5" in exc.value.detail
+
+def test_missing_row_is_a_404():
+    with pytest.raises(HTTPException) as exc:
+        apply_patch(VersionedCursor(), "users", 7, {"full_name": "Ada"}, not_found="User not found")
+    assert exc.value.status_code == 404 and exc.value.detail == "User not found"
+
+def test_explicit_nulls_on_required_fields_are_rejected():
+    reject_nulls({"phone_number": None}, ("username",))
+    with pytest.raises(HTTPException) as exc:
+        reject_nulls({"username": None, "email": None}, ("username", "email"))
+    assert exc.value.status_code == 400
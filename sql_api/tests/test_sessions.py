@@ -0,0 +1,89 @@
+import time
+import pytest
+from fastapi import HTTPException
+import sessions
+from sessions import RevocationList, admin_session, current_session, decode_token, issue_token
+
+class RevocationTable:
+    """Tabla session_revocations en memoria, compartida por varias RevocationList (varios workers)."""
+
+    def __init__(self):
+        self.rows = []
+
+    def execute_query(self, query, params=None):
+        return [row for row in self.rows if row["expires_at"] > params[0]]
+
+    def execute_non_query(self, query, params=None):
+        if query.startswith("DELETE"):
+            self.rows = [row for row in self.rows if row["expires_at"] > params[0]]
+        else:
+            jti, user_id, revoked_at, expires_at = params
+            self.rows.append({"jti": jti, "user_id": user_id, "revoked_at": revoked_at, "expires_at": expires_at})
+
+@pytest.fixture
+def table(monkeypatch):
+    table = RevocationTable()
+    monkeypatch.setattr(sessions, "execute_query", table.execute_query)
+    monkeypatch.setattr(sessions, "execute_non_query", table.execute_non_query)
+    monkeypatch.setattr(sessions, "revocations", RevocationList(refresh_interval=0))
+    return table
+
+def test_issued_token_round_trips(table):
+    token, claims = issue_token(7, "Ada", True)
+    decoded = decode_token(token)
+    assert decoded == claims
+    assert decoded["sub"] == 7 and decoded["adm"] is True
+
+@pytest.mark.parametrize("tamper", [
+    lambda token: token[:-2] + ("AA" if not token.endswith("AA") else "BB"),
+    lambda token: "e30." + token.partition(".")[2],
+    lambda token: token.partition(".")[0],
+    lambda token: token + "ñ",
+])
+def test_tampered_tokens_are_rejected(table, tamper):
+    token, _ = issue_token(7, "Ada", False)
+    with pytest.raises(HTTPException) as exc:
+        decode_token(tamper(token))
+    assert exc.value.status_code == 401
+
+def test_expired_token_is_rejected(table, monkeypatch):
+    token, claims = issue_token(7, "Ada", False)
+    monkeypatch.setattr(sessions.time, "time", lambda: claims["exp"] + 1)
+    with pytest.raises(HTTPException, match="expired"):
+        decode_token(token)
+
+def test_logout_revokes_only_that_token(table):
+    token, claims = issue_token(7, "Ada", False)
+    other, _ = issue_token(7, "Ada", False)
+    sessions.revocations.revoke_token(claims["jti"], claims["exp"], claims["sub"])
+    with pytest.raises(HTTPException, match="revoked"):
+        decode_token(token)
+    assert decode_token(other)["sub"] == 7
+
+def test_revoking_a_user_keeps_later_tokens_valid(table):
+    old, _ = issue_token(7, "Ada", False)
+    sessions.revocations.revoke_user(7)
+    time.sleep(0.001)
+    new, _ = issue_token(7, "Ada", False)
+    with pytest.raises(HTTPException, match="revoked"):
+        decode_token(old)
+    assert decode_token(new)["sub"] == 7
+
+def test_revocations_are_shared_through_the_table(table):
+    token, claims = issue_token(7, "Ada", True)
+    other_worker = RevocationList(refresh_interval=0)
+    assert not other_worker.is_revoked(claims)
+    sessions.revocations.revoke_user(7)
+    # Otro proceso (o este tras reiniciar) lee la revocación de la tabla
+    assert other_worker.is_revoked(claims)
+    assert RevocationList().is_revoked(claims)
+
+def test_bearer_header_and_admin_claim(table):
+    token, _ = issue_token(7, "Ada", False)
+    claims = current_session(f"Bearer {token}")
+    with pytest.raises(HTTPException) as exc:
+        admin_session(claims)
+    assert exc.value.status_code == 403
+    with pytest.raises(HTTPException) as exc:
+        current_session(None)
+    assert exc.value.status_code == 401
@@ -15,11 +15,21 @@ async function fetchAndDisplayStatistics(userQuestion) {
 
         const data = await response.json();
 
+        // La API rechaza (422) las consultas generadas que no cumplen sus límites y explica el motivo
+        if (response.status === 422) {
+            createErrorModal("Consulta rechazada", data.detail);
+            return;
+        }
+
         // Limpiar los contenedores previos
         const answerContainer = document.getElementById('answer-container')
         answerContainer.innerHTML = '';
         const tableContainer = document.getElementById('table-container')
         tableContainer.innerHTML = '';
+
+        if (response.headers.get('X-Result-Truncated')) {
+            answerContainer.innerHTML = '<p>Se muestran solo las primeras filas del resultado.</p>';
+        }
         
         if(data.image_base64) {
             const image = document.createElement('img');
@@ -95,25 +105,18 @@ document.addEventListener('DOMContentLoaded', function () {
     fetchCountries();
     fetchOrganizers();
 
-    const userId = localStorage.getItem("user_id");
-
-    fetch(`${API_BASE_URL}/users/${userId}/is-admin`)
-        .then(response => response.json())
-        .then(data => {
-            if (data.is_admin) {
-                document.body.style.display = "block";
-            } else {
-                window.location.href = "../";
+    // La sesión firmada incluye el nombre y la claim de administrador: la API la valida sin consultar la base de datos
+    fetch(`${API_BASE_URL}/session/admin`, {
+        headers: {
+            'Authorization': `Bearer ${localStorage.getItem('authToken')}`
+        }
+    })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Sesión no válida (${response.status})`);
             }
+            return response.json();
         })
-        .catch(error => {
-            console.error("Error:", error);
-            logError("Error de autenticación", 401, "Autenticación", error.message); // Registro de error
-            window.location.href = "/";
-        });
-
-    fetch(`${API_BASE_URL}/users/${userId}`)
-        .then(response => response.json())
         .then(data => {
             const userName = data.full_name;
             const greetingElement = document.getElementById("greeting");
@@ -132,9 +135,9 @@ document.addEventListener('DOMContentLoaded', function () {
             document.body.style.display = "block";
         })
         .catch(error => {
-            console.error('Error fetching user data:', error);
-            logError("Error al obtener datos del usuario", 500, "API de usuarios", error.message); // Registro de error
-            document.body.style.display = "block";
+            console.error("Error:", error);
+            logError("Error de autenticación", 401, "Autenticación", error.message); // Registro de error
+            window.location.href = "/";
         });
     
     fetchGeneralStatistics();
@@ -193,13 +196,14 @@ document.addEventListener('DOMContentLoaded', function () {
 
                 try {
                     const selectedCategories = getSelectedCategories();
-                    for (const categoryId of selectedCategories) {
-                        await fetch(`${API_BASE_URL}/event_categories`, {
+                    if (selectedCategories.length > 0) {
+                        // Una sola petición vincula todas las categorías seleccionadas
+                        await fetch(`${API_BASE_URL}/event_categories/bulk`, {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
                             },
-                            body: JSON.stringify({ event_id: eventId, category_id: categoryId })
+                            body: JSON.stringify(selectedCategories.map(categoryId => ({ event_id: eventId, category_id: categoryId })))
                         });
                     }
                     createSuccessModal("Evento creado con éxito!");
@@ -20,7 +20,7 @@ function updateAuthLinks() {
         `;
     }
 
-    const isLoggedIn = localStorage.getItem('authToken');
+    const isLoggedIn = getSessionClaims() !== null;
 
     if (isLoggedIn && authLinks) {
         authLinks.innerHTML += `
@@ -50,30 +50,58 @@ function updateAuthLinks() {
     }
 }
 
-// Función para manejar el logout
-function logout() {
+// Claims del token de sesión guardado, o null si no hay sesión o ha caducado.
+// La firma solo la valida la API; aquí basta con leer el payload para decidir qué mostrar.
+function getSessionClaims() {
+    const token = localStorage.getItem('authToken');
+    if (!token || !token.includes('.')) {
+        return null;
+    }
+    try {
+        const payload = token.split('.')[0].replace(/-/g, '+').replace(/_/g, '/');
+        const bytes = Uint8Array.from(atob(payload), c => c.charCodeAt(0));
+        const claims = JSON.parse(new TextDecoder().decode(bytes));
+        if (claims.exp * 1000 <= Date.now()) {
+            clearSession();
+            return null;
+        }
+        return claims;
+    } catch (error) {
+        clearSession();
+        return null;
+    }
+}
+
+function clearSession() {
     localStorage.removeItem('authToken');
     localStorage.removeItem('full_name');
     localStorage.removeItem('user_id');
+}
+
+// Función para manejar el logout
+function logout() {
+    const token = localStorage.getItem('authToken');
+    if (token) {
+        // Revoca el token en la API; la sesión local se borra aunque la petición falle
+        fetch(`${API_SQL_BASE_URL}/session/logout`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${token}` },
+            keepalive: true
+        }).catch(error => console.error("Error:", error));
+    }
+    clearSession();
     window.location.href = "/";
 }
 
 function checkUserRole() {
-    const userId = localStorage.getItem('user_id');
-    fetch(`${API_SQL_BASE_URL}/users/${userId}/is-admin`)
-        .then(response => response.json())
-        .then(data => {
-            if (data.is_admin && !document.querySelector('.nav-item.nav-link[href="../admin-dashboard.html"]')) {
-                const authLinks = document.getElementById('authLinks');
-                if (authLinks) {
-                    authLinks.innerHTML += `
-                    <a href="../admin-dashboard.html" class="nav-item nav-link">Admin Dashboard</a>`;
-                }
-            }
-        })
-        .catch(error => {
-            console.error("Error:", error);
-        });
+    const claims = getSessionClaims();
+    if (claims && claims.adm && !document.querySelector('.nav-item.nav-link[href="../admin-dashboard.html"]')) {
+        const authLinks = document.getElementById('authLinks');
+        if (authLinks) {
+            authLinks.innerHTML += `
+            <a href="../admin-dashboard.html" class="nav-item nav-link">Admin Dashboard</a>`;
+        }
+    }
 }
 
 document.addEventListener('DOMContentLoaded', updateAuthLinks);
\ No newline at end of file
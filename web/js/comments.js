@@ -25,20 +25,14 @@ async function getCommentsSection() {
         // Actualizar el título con el número total de comentarios
         commentsTitle.textContent = `${totalComments} Comentario${totalComments !== 1 ? 's' : ''}`;
 
-        const userPromises = feedbacks.map(async feedback => {
-            const userResponse = await fetch(`${API_BASE_URL}/users/${feedback.user_id}`);
-            if (!userResponse.ok) throw new Error('Usuario no encontrado');
-            const user = await userResponse.json();
-            return { user, feedback };
-        });
-
-        const results = await Promise.all(userPromises);
-        results.forEach(({ user, feedback }) => {
+        // Cada comentario incluye los datos públicos de su autor: no hace falta pedir cada usuario
+        feedbacks.forEach(feedback => {
+            const authorName = feedback.author ? feedback.author.full_name : 'Usuario eliminado';
             const commentHTML = `
                 <div class="media mb-4">
                     <img src="../img/user/${feedback.user_id}.webp" alt="Image" class="img-fluid rounded-circle mr-3 mt-1" style="width: 45px;">
                     <div class="media-body">
-                        <h6>${user.full_name} <small><i>${formatDateToLocal(feedback.timestamp)}</i></small></h6>
+                        <h6>${authorName} <small><i>${formatDateToLocal(feedback.timestamp)}</i></small></h6>
                         <span class="ml-2 text-warning">
                             ${'★'.repeat(feedback.rating_value)}${'☆'.repeat(5 - feedback.rating_value)}
                         </span>
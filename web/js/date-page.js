@@ -31,13 +31,31 @@ function formatDate(dateString) {
 }
 
 
-// Obtener la cantidad de eventos por fechas
-async function fetchCountEventDates() {
-    const response = await fetch(`${API_BASE_URL}/events/count/by-date`);
+// Obtener el mes a mostrar desde la URL (month=YYYY-MM) o el mes actual
+function getCalendarMonthFromUrl() {
+    const urlParams = new URLSearchParams(window.location.search);
+    const month = urlParams.get('month');
+    if (month && /^\d{4}-\d{2}$/.test(month)) {
+        const [year, monthNumber] = month.split('-').map(Number);
+        return { year, month: monthNumber };
+    }
+    const today = new Date();
+    return { year: today.getFullYear(), month: today.getMonth() + 1 };
+}
+
+// Obtener la cantidad de eventos por día de un mes
+async function fetchCountEventDates(year, month) {
+    const response = await fetch(`${API_BASE_URL}/events/calendar/${year}/${month}`);
     const countEventsByDate = await response.json();
     return countEventsByDate;
 }
 
+// Formatear un mes como "YYYY-MM" desplazado `offset` meses
+function shiftMonth(year, month, offset) {
+    const shifted = new Date(year, month - 1 + offset, 1);
+    return `${shifted.getFullYear()}-${String(shifted.getMonth() + 1).padStart(2, '0')}`;
+}
+
 // Hacer la solicitud para obtener los eventos de una fecha
 async function fetchEventsByDate(eventDate, page) {
     const response = await fetch(`${API_BASE_URL}/events/date/${eventDate}?page=${page}&limit=${eventsPerPage}`);
@@ -113,9 +131,25 @@ async function loadEvents(eventDate, page) {
 }
 
 // Mostrar las fechas disponibles para seleccionar
-function displayDateSelection(dates) {
+function displayDateSelection(dates, year, month) {
     eventsContainer.innerHTML = ''; // Limpiar el contenedor de eventos
-    dateHeader.textContent = 'Selecciona una fecha'; // Cambiar el encabezado
+    const monthName = new Date(year, month - 1, 1).toLocaleString('es-ES', { month: 'long' });
+    dateHeader.textContent = `Selecciona una fecha (${monthName.charAt(0).toUpperCase() + monthName.slice(1)} ${year})`; // Cambiar el encabezado
+
+    // Navegación entre meses
+    const monthNavigation = document.createElement('div');
+    monthNavigation.className = 'mb-4';
+    monthNavigation.innerHTML = `
+        <a class="btn btn-sm btn-primary mr-2" href="?month=${shiftMonth(year, month, -1)}">&laquo; Mes anterior</a>
+        <a class="btn btn-sm btn-primary" href="?month=${shiftMonth(year, month, 1)}">Mes siguiente &raquo;</a>`;
+    eventsContainer.appendChild(monthNavigation);
+
+    if (dates.length === 0) {
+        const emptyMessage = document.createElement('p');
+        emptyMessage.textContent = 'No hay eventos programados para este mes.';
+        eventsContainer.appendChild(emptyMessage);
+        return;
+    }
 
     // Crear un contenedor con botones o enlaces para cada fecha
     const dateList = document.createElement('ul');
@@ -147,9 +181,10 @@ document.addEventListener('DOMContentLoaded', async () => {
     eventDate = getEventDateFromUrl(); // Obtener la fecha del evento desde la URL
 
     if (!eventDate) {
-        // Si no hay event_date, mostrar las fechas disponibles
-        const dates = await fetchCountEventDates();
-        displayDateSelection(dates); // Mostrar las fechas
+        // Si no hay event_date, mostrar las fechas con eventos del mes seleccionado
+        const { year, month } = getCalendarMonthFromUrl();
+        const dates = await fetchCountEventDates(year, month);
+        displayDateSelection(dates, year, month); // Mostrar las fechas
     } else {
         // Si hay un event_date, proceder a cargar los eventos
         const formattedDate = formatDate(eventDate); // Formatear la fecha
@@ -14,163 +14,24 @@ function loadEventDetailed() {
         return;
     }
 
-    let event;
+    // Una sola solicitud con el evento, su organizador, categorías, plazas y el estado de inscripción del usuario
+    const userId = localStorage.getItem('user_id');
+    const detailUrl = userId
+        ? `${API_BASE_URL}/events/${eventId}/detail?user_id=${encodeURIComponent(userId)}`
+        : `${API_BASE_URL}/events/${eventId}/detail`;
 
-    // Hacer la solicitud para obtener los detalles del evento
-    fetch(`${API_BASE_URL}/events/${eventId}`)
+    fetch(detailUrl)
         .then(response => {
             if (!response.ok) {
                 throw new Error('Evento no encontrado');
             }
             return response.json();
         })
-        .then(data => {
-            event = data;
-
-            // Llenar el HTML con la información del evento
-            document.getElementById('title-bread').innerText = `Evento #${event.id}`;
-            document.getElementById('id-bread-event').innerText = `Evento #${event.id}`;
-            document.getElementById('event-name').innerText = event.name;
-            const introductionDetailsDiv = document.getElementById('introduction-details');
-            let eventImage = document.querySelector('#introduction-details img');
-            if (!eventImage) {
-                eventImage = document.createElement('img');
-                eventImage.className = 'img-fluid rounded w-50 float-left mr-4 mb-3';
-                eventImage.src = `../img/event/${event.id}.webp`;
-                eventImage.alt = 'Image';
-            }
-            introductionDetailsDiv.insertBefore(eventImage, introductionDetailsDiv.firstChild);
-            document.getElementById('event-description').innerText = event.description;
-            document.getElementById('event-location').innerHTML = `${event.location}, ${event.city}, <a class="text-secondary" href="country.html?country_name=${encodeURIComponent(event.country)}">${event.country}</a>`;
-            document.getElementById('event-date').innerText = new Date(event.date).toLocaleDateString('es-ES', {
-                year: 'numeric', month: 'long', day: 'numeric'
-            }) + '*';
-            const eventDateTime = new Date(event.date);
-            const options = { hour: '2-digit', minute: '2-digit', hour12: false };
-            document.getElementById('event-time').innerText = eventDateTime.toLocaleTimeString('es-ES', options) + '*';     
-            document.getElementById('event-capacity').innerText = `${event.max_capacity} asistentes`;
-
-            // Hacer una solicitud para obtener las inscripciones
-            return fetch(`${API_BASE_URL}/events/${eventId}/registrations`);
-        })
-        .then(response => {
-            if (!response.ok) {
-                return { available_slots: 0 };
-            }
-            return response.json();
-        })
-        .then(registrations => {
-            // Actualizar el HTML con los asientos disponibles
-            document.getElementById('event-available').innerText = registrations.available_slots;
-            document.getElementById('event-price').innerText = event.price === 0 ? 'Gratis' : `$${event.price}`;
-
-            // Verificar si el usuario ya está registrado
-            const userId = localStorage.getItem('user_id');
-            fetch(`${API_BASE_URL}/registrations/check/${userId}/${eventId}`)
-                .then(response => {
-                    if (!response.ok) {
-                        if (response.status === 404) {
-                            return false;
-                        }
-                        throw new Error('Error al verificar el registro');
-                    }
-                    return true;
-                })
-                .then(isRegistered => {
-                    // Actualizar el botón de registro
-                    const registerButtonDiv = document.getElementById('register-button');
-                    if (isRegistered) {
-                        registerButtonDiv.innerHTML = 
-                        `<button class="btn btn-secondary btn-lg mr-2 disabled">Ya estás registrado</button> 
-                        <a href="../my-registers.html" class="btn btn-primary btn-lg mt-2 mt-md-0">Ver Mis Registros</a>`;
-                    } else {
-                        registerButtonDiv.innerHTML = `<a href="#" class="btn btn-secondary btn-lg" onclick="handleRegisterEvent(event, '${eventId}')">Registrarme Ahora</a>`;
-                    }
-                })
-                .catch(error => {
-                    const registerButtonDiv = document.getElementById('register-button');
-                    // En caso de error, asumimos que no está registrado
-                    registerButtonDiv.innerHTML = `<a href="#" class="btn btn-secondary btn-lg" onclick="handleRegisterEvent(event, '${eventId}')">Registrarme Ahora</a>`;
-                });
-
-            // Continuar con la solicitud de categorías y otros detalles...
-            return fetch(`${API_BASE_URL}/events/${eventId}/categories`);
-        })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('No se encontraron categorías para este evento');
-            }
-            return response.json();
-        })
-        .then(categories => {
-            const categoriesDiv = document.querySelector('.d-flex.mb-2');
-            categoriesDiv.innerHTML = ''; // Limpiar contenido previo
-
-            if (categories.length > 0) {
-                categories.forEach((category, index) => {
-                    const categoryLink = document.createElement('a');
-                    categoryLink.className = 'text-secondary text-uppercase font-weight-medium';
-                    categoryLink.href = `category.html?category_id=${category.id}`;
-                    categoryLink.innerText = category.name;
-
-                    categoriesDiv.appendChild(categoryLink);
-
-                    // Añadir separador si no es la última categoría
-                    if (index < categories.length - 1) {
-                        const separator = document.createElement('span');
-                        separator.className = 'text-primary px-2';
-                        separator.innerText = '|';
-                        categoriesDiv.appendChild(separator);
-                    }
-                });
-
-                const separator = document.createElement('span');
-                separator.className = 'text-primary px-2';
-                separator.innerText = '|';
-                categoriesDiv.appendChild(separator);
-
-                // Agregar la fecha del evento al final en el formato deseado
-                const formattedDate = new Date(event.date).toLocaleDateString('es-ES', {
-                    year: 'numeric', month: 'long', day: '2-digit'
-                });
-
-                const dateLink = document.createElement('a');
-                dateLink.className = 'text-secondary text-uppercase font-weight-medium';
-                const formattedEventDateLink = event.date.split('T')[0];
-                dateLink.href = `date.html?event_date=${formattedEventDateLink}`;
-                dateLink.innerText = formattedDate;
-
-                categoriesDiv.appendChild(dateLink);
-            } else {
-                categoriesDiv.innerText = 'Sin categorías disponibles';
-            }
-
-            // Hacer una solicitud para obtener la información del organizador
-            return fetch(`${API_BASE_URL}/organizers/${event.organizer_id}`);
-        })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('Organizador no encontrado');
-            }
-            return response.json();
-        })
-        .then(organizer => {
-            const organizerDiv = document.getElementById('organizer-info');
-            organizerDiv.innerHTML = `
-                <img src="../img/organizer/${organizer.id}.webp" class="img-fluid rounded-circle mx-auto mb-3" style="width: 100px;">
-                <h3 class="text-white mb-3">${organizer.name}</h3>
-                <div class="d-flex justify-content-center mb-3 align-items-center">
-                    <i class="fas fa-envelope text-primary mr-2"></i>
-                    <span class="font-weight-medium text-white email">${organizer.email}</span>
-                </div>
-                <div class="d-flex justify-content-center align-items-center">
-                    <i class="fas fa-phone text-primary mr-2"></i>
-                    <span class="font-weight-medium text-white phone">${organizer.phone}</span>
-                </div>
-                <div class="d-flex justify-content-center mt-3">
-                    <a href="organizer.html?organizer_id=${organizer.id}" class="btn btn-primary">Ver más eventos</a>
-                </div>
-            `;
+        .then(detail => {
+            renderEventInfo(detail.event, detail.availability);
+            renderRegisterButton(eventId, detail.registration !== null);
+            renderEventCategories(detail.event, detail.categories);
+            renderOrganizer(detail.organizer);
         })
         .catch(error => {
             createErrorModal('Error en la solicitud', error.message, '../contacto.html');
@@ -214,9 +75,118 @@ function loadEventDetailed() {
         loadUpcomingEvents();
 }
 
+// Llenar el HTML con la información del evento y las plazas disponibles
+function renderEventInfo(event, availability) {
+    document.getElementById('title-bread').innerText = `Evento #${event.id}`;
+    document.getElementById('id-bread-event').innerText = `Evento #${event.id}`;
+    document.getElementById('event-name').innerText = event.name;
+    const introductionDetailsDiv = document.getElementById('introduction-details');
+    let eventImage = document.querySelector('#introduction-details img');
+    if (!eventImage) {
+        eventImage = document.createElement('img');
+        eventImage.className = 'img-fluid rounded w-50 float-left mr-4 mb-3';
+        eventImage.src = `../img/event/${event.id}.webp`;
+        eventImage.alt = 'Image';
+    }
+    introductionDetailsDiv.insertBefore(eventImage, introductionDetailsDiv.firstChild);
+    document.getElementById('event-description').innerText = event.description;
+    document.getElementById('event-location').innerHTML = `${event.location}, ${event.city}, <a class="text-secondary" href="country.html?country_name=${encodeURIComponent(event.country)}">${event.country}</a>`;
+    document.getElementById('event-date').innerText = new Date(event.date).toLocaleDateString('es-ES', {
+        year: 'numeric', month: 'long', day: 'numeric'
+    }) + '*';
+    const eventDateTime = new Date(event.date);
+    const options = { hour: '2-digit', minute: '2-digit', hour12: false };
+    document.getElementById('event-time').innerText = eventDateTime.toLocaleTimeString('es-ES', options) + '*';
+    document.getElementById('event-capacity').innerText = `${event.max_capacity} asistentes`;
+    document.getElementById('event-available').innerText = availability.available_slots;
+    document.getElementById('event-price').innerText = event.price === 0 ? 'Gratis' : `$${event.price}`;
+}
+
+// Actualizar el botón de registro según el estado de inscripción del usuario
+function renderRegisterButton(eventId, isRegistered) {
+    const registerButtonDiv = document.getElementById('register-button');
+    if (isRegistered) {
+        registerButtonDiv.innerHTML = 
+        `<button class="btn btn-secondary btn-lg mr-2 disabled">Ya estás registrado</button> 
+        <a href="../my-registers.html" class="btn btn-primary btn-lg mt-2 mt-md-0">Ver Mis Registros</a>`;
+    } else {
+        registerButtonDiv.innerHTML = `<a href="#" class="btn btn-secondary btn-lg" onclick="handleRegisterEvent(event, '${eventId}')">Registrarme Ahora</a>`;
+    }
+}
+
+// Mostrar las categorías del evento seguidas de su fecha
+function renderEventCategories(event, categories) {
+    const categoriesDiv = document.querySelector('.d-flex.mb-2');
+    categoriesDiv.innerHTML = ''; // Limpiar contenido previo
+
+    if (categories.length === 0) {
+        categoriesDiv.innerText = 'Sin categorías disponibles';
+        return;
+    }
+
+    categories.forEach((category, index) => {
+        const categoryLink = document.createElement('a');
+        categoryLink.className = 'text-secondary text-uppercase font-weight-medium';
+        categoryLink.href = `category.html?category_id=${category.id}`;
+        categoryLink.innerText = category.name;
+
+        categoriesDiv.appendChild(categoryLink);
+
+        // Añadir separador si no es la última categoría
+        if (index < categories.length - 1) {
+            const separator = document.createElement('span');
+            separator.className = 'text-primary px-2';
+            separator.innerText = '|';
+            categoriesDiv.appendChild(separator);
+        }
+    });
+
+    const separator = document.createElement('span');
+    separator.className = 'text-primary px-2';
+    separator.innerText = '|';
+    categoriesDiv.appendChild(separator);
+
+    // Agregar la fecha del evento al final en el formato deseado
+    const formattedDate = new Date(event.date).toLocaleDateString('es-ES', {
+        year: 'numeric', month: 'long', day: '2-digit'
+    });
+
+    const dateLink = document.createElement('a');
+    dateLink.className = 'text-secondary text-uppercase font-weight-medium';
+    const formattedEventDateLink = event.date.split('T')[0];
+    dateLink.href = `date.html?event_date=${formattedEventDateLink}`;
+    dateLink.innerText = formattedDate;
+
+    categoriesDiv.appendChild(dateLink);
+}
+
+// Mostrar la información del organizador
+function renderOrganizer(organizer) {
+    const organizerDiv = document.getElementById('organizer-info');
+    if (!organizer) {
+        organizerDiv.innerHTML = '<p class="text-white">Organizador no disponible</p>';
+        return;
+    }
+    organizerDiv.innerHTML = `
+        <img src="../img/organizer/${organizer.id}.webp" class="img-fluid rounded-circle mx-auto mb-3" style="width: 100px;">
+        <h3 class="text-white mb-3">${organizer.name}</h3>
+        <div class="d-flex justify-content-center mb-3 align-items-center">
+            <i class="fas fa-envelope text-primary mr-2"></i>
+            <span class="font-weight-medium text-white email">${organizer.email}</span>
+        </div>
+        <div class="d-flex justify-content-center align-items-center">
+            <i class="fas fa-phone text-primary mr-2"></i>
+            <span class="font-weight-medium text-white phone">${organizer.phone}</span>
+        </div>
+        <div class="d-flex justify-content-center mt-3">
+            <a href="organizer.html?organizer_id=${organizer.id}" class="btn btn-primary">Ver más eventos</a>
+        </div>
+    `;
+}
+
 function loadUpcomingEvents() {
     // Solicitud para obtener los eventos próximos
-    fetch(`${API_BASE_URL}/upcoming-events`)
+    fetch(`${API_BASE_URL}/upcoming-events?include=categories`)
         .then(response => {
             if (!response.ok) {
                 throw new Error('No se encontraron eventos próximos');
@@ -250,7 +220,7 @@ function loadUpcomingEvents() {
                 eventLink.innerText = event.name;
 
                 textDiv.appendChild(eventLink);
-                loadEventCategories(event.id, textDiv);
+                renderUpcomingEventCategories(event.categories || [], textDiv);
                 eventDiv.appendChild(eventImage);
                 eventDiv.appendChild(textDiv);
                 upcomingEventsContainer.appendChild(eventDiv);
@@ -261,39 +231,31 @@ function loadUpcomingEvents() {
         });
 }
 
-async function loadEventCategories(eventId, textDiv) {
-    try {
-        const response = await fetch(`${API_BASE_URL}/events/${eventId}/categories`);
-        if (!response.ok) {
-            throw new Error('No se encontraron categorías para este evento');
-        }
-        const categories = await response.json();
-        const categoryContainer = document.createElement('div');
-        categoryContainer.className = 'd-flex';
-
-        if (categories.length > 0) {
-            categories.forEach((category, index) => {
-                const categoryLink = document.createElement('small');
-                categoryLink.innerHTML = `<a class="text-secondary text-uppercase font-weight-medium" href="category.html?category_id=${category.id}">${category.name}</a>`;
-                categoryContainer.appendChild(categoryLink);
-
-                if (index < categories.length - 1) {
-                    const separator = document.createElement('small');
-                    separator.className = 'text-primary px-2';
-                    separator.innerText = '|';
-                    categoryContainer.appendChild(separator);
-                }
-            });
-        } else {
-            const noCategory = document.createElement('small');
-            noCategory.innerHTML = '<a class="text-secondary text-uppercase font-weight-medium" href="">Sin categorías</a>';
-            categoryContainer.appendChild(noCategory);
-        }
+// Mostrar las categorías (incluidas en la respuesta de /upcoming-events) de un evento del sidebar
+function renderUpcomingEventCategories(categories, textDiv) {
+    const categoryContainer = document.createElement('div');
+    categoryContainer.className = 'd-flex';
 
-        textDiv.appendChild(categoryContainer);
-    } catch (error) {
-        console.error('Error al obtener categorías:', error);
+    if (categories.length > 0) {
+        categories.forEach((category, index) => {
+            const categoryLink = document.createElement('small');
+            categoryLink.innerHTML = `<a class="text-secondary text-uppercase font-weight-medium" href="category.html?category_id=${category.id}">${category.name}</a>`;
+            categoryContainer.appendChild(categoryLink);
+
+            if (index < categories.length - 1) {
+                const separator = document.createElement('small');
+                separator.className = 'text-primary px-2';
+                separator.innerText = '|';
+                categoryContainer.appendChild(separator);
+            }
+        });
+    } else {
+        const noCategory = document.createElement('small');
+        noCategory.innerHTML = '<a class="text-secondary text-uppercase font-weight-medium" href="">Sin categorías</a>';
+        categoryContainer.appendChild(noCategory);
     }
+
+    textDiv.appendChild(categoryContainer);
 }
 
 async function createRegistrationModal(eventId) {
@@ -352,6 +314,12 @@ async function registerForEvent(eventId) {
             throw new Error(errorData.detail || 'Error desconocido');
         }
 
+        // Evento de alta demanda: la inscripción queda en cola y se consulta el ticket hasta confirmarse
+        if (response.status === 202) {
+            const ticket = await response.json();
+            await waitForRegistrationTicket(ticket);
+        }
+
         const eventResponse = await fetch(`${API_BASE_URL}/events/${eventId}`);
         if (!eventResponse.ok) {
             throw new Error('Error al obtener detalles del evento');
@@ -376,6 +344,26 @@ async function registerForEvent(eventId) {
     }
 }
 
+// Consulta periódicamente el estado de un ticket de la cola de admisión hasta que se resuelva
+async function waitForRegistrationTicket(ticket) {
+    const registerButtonDiv = document.getElementById('register-button');
+    while (ticket.status === 'pending') {
+        registerButtonDiv.innerHTML = `<button class="btn btn-secondary btn-lg disabled">En cola (posición ${ticket.position})...</button>`;
+        await new Promise(resolve => setTimeout(resolve, 1000));
+
+        const response = await fetch(`${API_BASE_URL}/registrations/tickets/${ticket.ticket_id}`);
+        if (!response.ok) {
+            throw new Error('No se pudo consultar el estado de su inscripción');
+        }
+        ticket = await response.json();
+    }
+
+    if (ticket.status === 'rejected') {
+        throw new Error(ticket.detail || 'Su inscripción no pudo completarse');
+    }
+    return ticket;
+}
+
 function createLoginAlertModal() {
     const currentUrl = window.location.pathname;
     const currentParams = window.location.search;
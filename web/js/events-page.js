@@ -7,7 +7,7 @@ let currentPage = 1;
 let totalEvents = 0;
 
 async function fetchEvents(page) {
-    const response = await fetch(`${API_BASE_URL}/events-desc?page=${page}&limit=${eventsPerPage}`);
+    const response = await fetch(`${API_BASE_URL}/events-desc?page=${page}&limit=${eventsPerPage}&include=categories`);
     const events = await response.json();
     return events;
 }
@@ -23,8 +23,7 @@ async function loadEvents(page) {
     eventsContainer.innerHTML = '';
 
     for (const event of events) {
-        const categories = await fetchCategories(event.id);
-        const categoriesHtml = categories.map((cat, index) => {
+        const categoriesHtml = (event.categories || []).map((cat, index) => {
             const separator = index > 0 ? `<span class="text-primary px-2">|</span>` : '';
             return `${separator}<a class="text-secondary text-uppercase font-weight-medium" href="events/category.html?category_id=${cat.id}">${cat.name}</a>`;
         }).join('');
@@ -57,11 +56,6 @@ async function loadEvents(page) {
     setupPagination(page);
 }
 
-async function fetchCategories(eventId) {
-    const response = await fetch(`${API_BASE_URL}/events/${eventId}/categories`);
-    return response.json();
-}
-
 async function setupPagination(currentPage) {
     paginationContainer.innerHTML = ''; // Limpiar la paginación
     const totalPages = Math.ceil(totalEvents / eventsPerPage);
@@ -7,7 +7,7 @@ const eventsContainer = document.getElementById('events-container');
 async function fetchUpcomingEvents() {
     try {
         // Realizamos la solicitud a la API para obtener los próximos eventos
-        const response = await fetch(`${API_BASE_URL}/upcoming-events?limit=3`);
+        const response = await fetch(`${API_BASE_URL}/upcoming-events?limit=3&include=categories`);
         const events = await response.json();
 
         return events;
@@ -16,26 +16,14 @@ async function fetchUpcomingEvents() {
     }
 }
 
-// Función para obtener las categorías de un evento
-async function fetchCategories(eventId) {
-    try {
-        const response = await fetch(`http://localhost:8010/events/${eventId}/categories`);
-        const categories = await response.json();
-        return categories;
-    } catch (error) {
-        console.error("Error al cargar las categorías: ", error);
-        return [];
-    }
-}
 // Función para cargar los eventos en el contenedor
 async function loadEvents() {
     const events = await fetchUpcomingEvents();
     eventsContainer.innerHTML = '';
     
     for (const event of events) {
-        // Obtener las categorías del evento
-        const categories = await fetchCategories(event.id);
-        const categoriesHtml = categories.map((cat, index) => {
+        // Las categorías vienen incluidas en cada evento (include=categories)
+        const categoriesHtml = (event.categories || []).map((cat, index) => {
             const separator = index > 0 ? `<span class="text-primary px-2">|</span>` : '';
             return `${separator}<a class="text-primary text-uppercase font-weight-medium" href="#">${cat.name}</a>`;
         }).join('');
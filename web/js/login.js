@@ -21,9 +21,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
             const data = await response.json();
 
-            // Guarda el token de autenticación si se provee
+            // Guarda el token de sesión firmado (incluye id, nombre, rol de administrador y caducidad)
             localStorage.setItem('authToken', data.token);
             localStorage.setItem('user_id', data.user_id);
+            localStorage.setItem('full_name', data.full_name);
 
             createSuccessModal('¡Inicio de sesión exitoso! Redirigiendo en breves'); // Modal de éxito
 
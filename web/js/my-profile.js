@@ -3,6 +3,7 @@ import { createSuccessModal, createErrorModal } from './modals.js';
 
 document.addEventListener("DOMContentLoaded", function () {
     const userId = localStorage.getItem('user_id');
+    let currentUser = null; // Últimos datos conocidos del usuario (incluye su versión para PATCH)
 
     // Función para obtener la lista de países
     async function getCountries() {
@@ -37,6 +38,7 @@ document.addEventListener("DOMContentLoaded", function () {
             
             if (response.ok) {
                 const user = await response.json();
+                currentUser = user;
 
                 // Mostrar la foto de perfil
                 const profilePhoto = `img/user/${user.id}.webp`;
@@ -109,15 +111,18 @@ document.addEventListener("DOMContentLoaded", function () {
 
         try {
             const response = await fetch(`${API_BASE_URL}/users/${userId}`, {
-                method: 'PUT',
+                method: 'PATCH',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(updatedUser), // Enviar solo los campos modificados
+                // Enviar solo los campos modificados y la versión leída (si otra sesión la cambió, la API responde 409)
+                body: JSON.stringify({ ...updatedUser, version: currentUser ? currentUser.version : undefined }),
             });
 
             if (response.ok) {
-                const updatedData = await response.json();
+                // La respuesta solo trae los campos modificados y la nueva versión
+                const updatedData = { ...currentUser, ...(await response.json()) };
+                currentUser = updatedData;
 
                 // Crear el mensaje de éxito que indica los campos modificados
                 const fieldsMessage = modifiedFields.length > 0 
@@ -129,6 +134,9 @@ document.addEventListener("DOMContentLoaded", function () {
                 displayUserData(updatedData) // Actualizar los datos del usuario en la página
                 document.getElementById("profile-name").innerText = updatedData.full_name;
 
+            } else if (response.status === 409) {
+                createErrorModal("Datos desactualizados", "Tus datos se modificaron desde otra sesión. Se han recargado; revisa los cambios e inténtalo de nuevo.");
+                getUserData();
             } else {
                 createErrorModal("Error al actualizar los datos", "Hubo un problema al actualizar la información.");
             }
@@ -212,7 +220,7 @@ document.addEventListener("DOMContentLoaded", function () {
 
             // Paso 2: Si la contraseña actual es válida, proceder a actualizar la contraseña
             const updateResponse = await fetch(`${API_BASE_URL}/users/${userId}`, {
-                method: 'PUT',
+                method: 'PATCH',
                 headers: {
                     'Content-Type': 'application/json',
                 },
@@ -222,10 +230,17 @@ document.addEventListener("DOMContentLoaded", function () {
             });
 
             if (updateResponse.ok) {
-                createSuccessModal("Contraseña actualizada correctamente");
+                const updatedData = await updateResponse.json();
+                if (currentUser) {
+                    currentUser = { ...currentUser, ...updatedData };
+                }
                 document.getElementById("current-password").value = '';
                 document.getElementById("new-password").value = '';
                 document.getElementById("confirm-password").value = '';
+                // El cambio de contraseña revoca las sesiones abiertas, incluida esta: hay que volver a entrar
+                clearSession();
+                createSuccessModal("Contraseña actualizada correctamente. Inicia sesión de nuevo con tu nueva contraseña.");
+                $('#successModal').on('hidden.bs.modal', () => { window.location.href = '/login.html'; });
             } else {
                 createErrorModal("Error al cambiar la contraseña", error.detail);
             }
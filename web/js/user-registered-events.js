@@ -3,13 +3,15 @@ import { createSuccessModal, createErrorModal } from './modals.js';
 
 const eventsContainer = document.getElementById('events-container');
 const paginationContainer = document.getElementById('pagination');
+// Campos que muestran las tarjetas (sin la descripción del evento)
+const registrationCardFields = 'event_id,name,location,event_date,price,registration_id,registration_date,status';
 const eventsPerPage = 12;
 let currentPage = 1;
 let totalEvents = 0;
 const userId = localStorage.getItem('user_id');
 
 async function fetchEvents(page) {
-    const response = await fetch(`${API_BASE_URL}/users/${userId}/registration-events?page=${page}&limit=${eventsPerPage}`);
+    const response = await fetch(`${API_BASE_URL}/users/${userId}/registration-events?page=${page}&limit=${eventsPerPage}&fields=${registrationCardFields}`);
     const events = await response.json();
     return events;
 }